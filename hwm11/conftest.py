@@ -1,13 +1,17 @@
 import datetime
+import os
 
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+os.environ.setdefault("CACHE_BACKEND", "memory")
+
 from main import app
 from src.database.models import Base
 from src.database.connect import get_db
+from src.services.cache import get_cache
 
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -30,6 +34,13 @@ def session():
         db.close()
 
 
+@pytest.fixture(autouse=True)
+def cache():
+    cache = get_cache()
+    cache.clear()
+    return cache
+
+
 @pytest.fixture(scope="module")
 def client(session):
     def override_get_db():
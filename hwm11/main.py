@@ -1,18 +1,34 @@
+import asyncio
 import time
 
-import redis.asyncio as redis
-from datetime import date, timedelta
 from typing import List
-from fastapi import FastAPI, Depends, HTTPException, Request, status
+from fastapi import FastAPI, Depends, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi_limiter import FastAPILimiter
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
-from src.database.connect import get_db
-from src.database.models import Contact
-from src.routes import contacts, auth
+from src.conf.config import settings
+from src.database.connect import (
+    SessionLocal,
+    get_db,
+    checkout_metrics,
+    start_checkout_tracking,
+    finish_checkout_tracking,
+)
+from src.database.models import Roles
+from src.database.redis_pool import init_redis, close_redis, redis_metrics
+from src.routes import contacts, auth, changes
 from src.schemas import ContactDb
+from src.services.auth import auth_service
+from src.services.birthdays import upcoming_birthdays
+from src.services.changes import contact_changes
+from src.services.live import live_changes
+from src.services.idempotency import IDEMPOTENT_PATHS, IdempotencyMiddleware
+from src.services.importer import shutdown_hash_pool
+from src.services.response_cache import response_cache
+from src.services.revocation import revocation_list
+from src.services.roles import RolesChecker
+from src.services.stats import contact_stats
 
 app = FastAPI()
 
@@ -26,23 +42,49 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    IdempotencyMiddleware,
+    paths=IDEMPOTENT_PATHS,
+    ttl=settings.idempotency_ttl,
+    lock_ttl=settings.idempotency_lock_ttl,
+)
 
 
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
     start_time = time.time()
+    checkouts = start_checkout_tracking()
     response = await call_next(request)
     process_time = time.time() - start_time
     response.headers["Process-Time"] = str(process_time)
+    response.headers["DB-Checkouts"] = str(finish_checkout_tracking(checkouts))
     return response
 
 
 @app.on_event("startup")
 async def startup():
-    r = await redis.Redis(
-        host="localhost", port=6379, db=0, encoding="utf-8", decode_responses=True
+    if settings.cache_backend == "none":
+        # Logging out revokes the token in the cache backend: without one,
+        # logged out tokens would keep working.
+        raise RuntimeError(
+            "CACHE_BACKEND=none cannot keep token revocations, use redis or memory"
+        )
+    if settings.cache_backend == "redis":
+        init_redis()
+    await revocation_list.rebuild()
+    app.state.revocation_follower = asyncio.create_task(revocation_list.follow())
+    app.state.stats_reconciler = asyncio.create_task(
+        contact_stats.reconcile_forever(SessionLocal)
     )
-    await FastAPILimiter.init(r)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.revocation_follower.cancel()
+    app.state.stats_reconciler.cancel()
+    live_changes.stop()
+    shutdown_hash_pool()
+    await close_redis()
 
 
 @app.get("/api/healthchecker")
@@ -63,6 +105,50 @@ def healthchecker(db: Session = Depends(get_db)):
         )
 
 
+@app.get(
+    "/api/metrics",
+    name="Metrics",
+    dependencies=[Depends(RolesChecker([Roles.admin]))],
+)
+async def metrics():
+    return {
+        "database": checkout_metrics,
+        "redis_pool": redis_metrics() if settings.cache_backend == "redis" else None,
+        "user_cache": {
+            **auth_service.cache_metrics,
+            **auth_service.user_loads.metrics,
+        },
+        "revocation": revocation_list.metrics,
+        "passwords": auth_service.password_report(),
+        "response_cache": response_cache.report(),
+        "birthdays": upcoming_birthdays.metrics,
+        "stats": contact_stats.metrics,
+        "changes": contact_changes.metrics,
+        "live_changes": {
+            "subscribers": len(live_changes.subscribers),
+            **live_changes.metrics,
+        },
+    }
+
+
+@app.get(
+    "/api/stats",
+    name="Contact statistics",
+    dependencies=[Depends(RolesChecker([Roles.admin]))],
+)
+async def stats(db: Session = Depends(get_db)):
+    return await contact_stats.read(db)
+
+
+@app.post(
+    "/api/stats/reconcile",
+    name="Recount contact statistics",
+    dependencies=[Depends(RolesChecker([Roles.admin]))],
+)
+async def reconcile_stats(db: Session = Depends(get_db)):
+    return {"corrections": await contact_stats.reconcile(db)}
+
+
 @app.get("/", name="Info page")
 def info():
     return {"message": "Welcome to Address Book"}
@@ -75,19 +161,24 @@ def info():
     tags=["search"],
 )
 async def show_bdays(db: Session = Depends(get_db)):
-    current_date = date.today()
-    delta = timedelta(days=7)
-    contacts = db.query(Contact).all()
-
-    bdays_in_next_days = [
-        contact for contact in contacts if contact.birthday - current_date <= delta
-    ]
-
-    if bdays_in_next_days == False:
+    contacts = await upcoming_birthdays.upcoming(db)
+    if not contacts:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    return Response(
+        content=b"[" + b",".join(contacts) + b"]", media_type="application/json"
+    )
+
 
-    return bdays_in_next_days
+@app.post(
+    "/api/bdays/rebuild",
+    name="Rebuild upcoming bdays",
+    tags=["search"],
+    dependencies=[Depends(RolesChecker([Roles.admin]))],
+)
+async def rebuild_bdays(db: Session = Depends(get_db)):
+    return {"contacts": await upcoming_birthdays.build(db)}
 
 
 app.include_router(auth.router, prefix="/api")
 app.include_router(contacts.router, prefix="/api")
+app.include_router(changes.router, prefix="/api")
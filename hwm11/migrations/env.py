@@ -6,7 +6,7 @@ from sqlalchemy import pool
 from alembic import context
 
 from src.database.connect import SQL_ALCHEMY_DATABASE_URL
-from src.database.models import Base
+from src.database.models import Base, SEARCH_VECTOR_COLUMN
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -22,6 +22,16 @@ if config.config_file_name is not None:
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    # The full-text search column and its index are created by DDL, not mapped.
+    if reflected and compare_to is None:
+        if type_ == "column" and name == SEARCH_VECTOR_COLUMN:
+            return False
+        if type_ == "index" and name == "ix_contacts_search_vector":
+            return False
+    return True
 config.set_main_option("sqlalchemy.url", SQL_ALCHEMY_DATABASE_URL)
 
 # other values from the config, defined by the needs of env.py,
@@ -46,6 +56,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -68,7 +79,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
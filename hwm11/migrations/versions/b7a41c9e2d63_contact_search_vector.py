@@ -0,0 +1,46 @@
+"""Contact search vector
+
+Revision ID: b7a41c9e2d63
+Revises: 9e3d2b7c4a10
+Create Date: 2026-10-19 14:05:47.192836
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7a41c9e2d63'
+down_revision = '9e3d2b7c4a10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(
+        """
+        ALTER TABLE contacts ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(first_name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(last_name, '')), 'A') ||
+            setweight(to_tsvector('simple', regexp_replace(
+                split_part(coalesce(email, ''), '@', 1), '[._+-]+', ' ', 'g'
+            )), 'B')
+        ) STORED
+        """
+    )
+    op.create_index(
+        'ix_contacts_search_vector',
+        'contacts',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index('ix_contacts_search_vector', table_name='contacts')
+    op.drop_column('contacts', 'search_vector')
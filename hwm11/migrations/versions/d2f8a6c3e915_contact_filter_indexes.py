@@ -0,0 +1,42 @@
+"""Contact filter indexes
+
+Revision ID: d2f8a6c3e915
+Revises: b7a41c9e2d63
+Create Date: 2026-10-19 16:22:08.503117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f8a6c3e915'
+down_revision = 'b7a41c9e2d63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_contacts_role_created_at', 'contacts', ['role', 'created_at'], unique=False)
+    op.create_index('ix_contacts_created_at', 'contacts', ['created_at'], unique=False)
+    op.create_index(
+        'ix_contacts_unconfirmed_role_created_at',
+        'contacts',
+        ['role', 'created_at'],
+        unique=False,
+        postgresql_where=sa.text('confirmed = false'),
+        sqlite_where=sa.text('confirmed = 0'),
+    )
+    op.create_index(
+        'ix_contacts_birthday_month',
+        'contacts',
+        [sa.extract('month', sa.column('birthday'))],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contacts_birthday_month', table_name='contacts')
+    op.drop_index('ix_contacts_unconfirmed_role_created_at', table_name='contacts')
+    op.drop_index('ix_contacts_created_at', table_name='contacts')
+    op.drop_index('ix_contacts_role_created_at', table_name='contacts')
@@ -1,4 +1,6 @@
-from pydantic import BaseSettings
+from typing import Literal
+
+from pydantic import BaseSettings, Field
 
 
 class Settings(BaseSettings):
@@ -15,11 +17,45 @@ class Settings(BaseSettings):
 
     redis_host: str = "localhost"
     redis: int = 6379
+    redis_max_connections: int = 50
+    redis_blocking_connections: int = 10
+    redis_blocking_timeout: int = 5
+
+    cache_backend: Literal["redis", "memory", "none"] = "redis"
+    cache_max_entries: int = 10000
+
+    user_cache_ttl: int = 900
+    user_cache_stale_ttl: int = 300
+    user_cache_jitter: float = 0.1
+
+    response_cache_ttl: int = 60
+
+    autocomplete_rebuild_interval: int = 86400
+
+    stats_days: int = 30
+    stats_reconcile_interval: int = 3600
+
+    contact_changes_maxlen: int = 100000
+    live_changes_heartbeat: int = 15
+    live_changes_queue_size: int = 100
+
+    idempotency_ttl: int = 86400
+    idempotency_lock_ttl: int = 30
+
+    bcrypt_rounds: int = Field(12, ge=4, le=31)
+    bcrypt_target_ms: int = 250
+
+    access_token_max_ttl: int = 7200
+    revocation_capacity: int = 100000
 
     cloudinary_name: str = "name"
     cloudinary_api_key: int = 512194773231647
     cloudinary_secret: str = "secret"
 
+    import_chunk_size: int = 1000
+    import_hash_workers: int = 0
+    import_max_errors: int = 1000
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,8 +1,9 @@
 import configparser
 import pathlib
+from contextvars import ContextVar
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
 
 from src.conf.config import settings
 
@@ -11,9 +12,78 @@ SQL_ALCHEMY_DATABASE_URL = settings.sqlalchemy_database_url
 engine = create_engine(SQL_ALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+checkout_metrics = {"requests": 0, "requests_with_checkout": 0, "checkouts": 0}
+_request_checkouts: ContextVar[list | None] = ContextVar(
+    "request_checkouts", default=None
+)
+
+
+@event.listens_for(engine, "checkout")
+def _count_checkout(dbapi_connection, connection_record, connection_proxy):
+    checkout_metrics["checkouts"] += 1
+    counter = _request_checkouts.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def start_checkout_tracking() -> list:
+    """
+    Starts counting pool checkouts made while handling the current request.
+
+    :return: A one element list holding the number of checkouts so far.
+    :rtype: list
+    """
+    counter = [0]
+    _request_checkouts.set(counter)
+    return counter
+
+
+def finish_checkout_tracking(counter: list) -> int:
+    """
+    Adds the checkouts of a finished request to ``checkout_metrics``.
+
+    :param counter: The counter returned by ``start_checkout_tracking``.
+    :type counter: list
+    :return: The number of checkouts made by the request.
+    :rtype: int
+    """
+    checkout_metrics["requests"] += 1
+    if counter[0]:
+        checkout_metrics["requests_with_checkout"] += 1
+    return counter[0]
+
+
+class LazySession:
+    """
+    Session proxy which creates the real ``Session`` on first use.
+
+    Requests that declare ``get_db`` but never query (e.g. when the current
+    user is served from cache) don't build a session and never check out a
+    pooled connection.
+    """
+
+    __slots__ = ("_session",)
+
+    def __init__(self):
+        self._session: Session | None = None
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    def __getattr__(self, name):
+        if self._session is None:
+            self._session = SessionLocal()
+        return getattr(self._session, name)
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
 
 def get_db():
-    db = SessionLocal()
+    db = LazySession()
     try:
         yield db
     finally:
@@ -1,6 +1,21 @@
 import enum
 
-from sqlalchemy import Column, Integer, String, Date, DateTime, func, Enum, Boolean
+from sqlalchemy import (
+    DDL,
+    Column,
+    Integer,
+    String,
+    Date,
+    DateTime,
+    func,
+    Enum,
+    Boolean,
+    ForeignKey,
+    Index,
+    event,
+    extract,
+    text,
+)
 from sqlalchemy.ext.declarative import declarative_base
 
 
@@ -29,7 +44,142 @@ class Contact(Base):
     roles = Column("role", Enum(Roles), default=Roles.user)
     confirmed = Column(Boolean, default=False)
     marital_status = Column(Boolean, default=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    # Indexes for the list filters, see filter_contacts().
+    __table_args__ = (
+        Index("ix_contacts_role_created_at", "role", "created_at"),
+        Index("ix_contacts_created_at", "created_at"),
+        Index(
+            "ix_contacts_unconfirmed_role_created_at",
+            "role",
+            "created_at",
+            postgresql_where=text("confirmed = false"),
+            sqlite_where=text("confirmed = 0"),
+        ),
+        Index("ix_contacts_birthday_month", extract("month", birthday)),
+    )
+
+
+# Full-text search over names and the e-mail's local part. Postgres keeps a
+# generated tsvector column with a GIN index; it is not mapped, so reads never
+# load it. SQLite keeps an FTS5 table in sync through triggers.
+SEARCH_VECTOR_COLUMN = "search_vector"
+
+POSTGRES_SEARCH_DDL = [
+    """
+    ALTER TABLE contacts ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(first_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(last_name, '')), 'A') ||
+        setweight(to_tsvector('simple', regexp_replace(
+            split_part(coalesce(email, ''), '@', 1), '[._+-]+', ' ', 'g'
+        )), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX ix_contacts_search_vector ON contacts USING GIN (search_vector)",
+]
+
+SQLITE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE contacts_fts USING fts5(
+        first_name, last_name, email_local, tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER contacts_fts_insert AFTER INSERT ON contacts BEGIN
+        INSERT INTO contacts_fts (rowid, first_name, last_name, email_local)
+        VALUES (new.id, new.first_name, new.last_name,
+                substr(new.email, 1, instr(new.email, '@') - 1));
+    END
+    """,
+    """
+    CREATE TRIGGER contacts_fts_update AFTER UPDATE OF first_name, last_name, email
+    ON contacts BEGIN
+        UPDATE contacts_fts SET first_name = new.first_name,
+            last_name = new.last_name,
+            email_local = substr(new.email, 1, instr(new.email, '@') - 1)
+        WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER contacts_fts_delete AFTER DELETE ON contacts BEGIN
+        DELETE FROM contacts_fts WHERE rowid = old.id;
+    END
+    """,
+]
+
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(
+        Contact.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(
+        Contact.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+event.listen(
+    Contact.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS contacts_fts").execute_if(dialect="sqlite"),
+)
 
 
 # create type roles as enum ('admin', 'moderator', 'user');
 # Script for Postgres
+
+
+class RefreshSession(Base):
+    __tablename__ = "refresh_sessions"
+    id = Column(String(32), primary_key=True)
+    contact_id = Column(
+        Integer, ForeignKey("contacts.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    token_id = Column(String(32), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=func.now())
+
+
+class ContactRow:
+    """
+    Lightweight read-only projection of a contact.
+
+    Holds only the columns exposed by ``ContactDb`` and the row version, so
+    read paths can select them directly instead of hydrating full ``Contact``
+    entities (with password hashes and tokens) that the session would track in
+    its identity map.
+    """
+
+    __slots__ = (
+        "id",
+        "first_name",
+        "last_name",
+        "email",
+        "created_at",
+        "avatar",
+        "version",
+    )
+    fields = __slots__
+
+    def __init__(self, row):
+        for field in self.fields:
+            setattr(self, field, getattr(row, field))
+
+    @classmethod
+    def columns(cls):
+        """
+        Returns the ``Contact`` columns to select for this projection.
+
+        :return: The mapped columns in the order of ``fields``.
+        :rtype: List[Column]
+        """
+        return [getattr(Contact, field) for field in cls.fields]
+
+
+class ContactExportRow(ContactRow):
+    """
+    ``ContactRow`` extended with the columns included in address book exports.
+    """
+
+    __slots__ = ("phone", "birthday", "roles", "confirmed")
+    fields = ContactRow.fields + __slots__
@@ -0,0 +1,126 @@
+import redis.asyncio as redis
+
+from src.conf.config import settings
+
+
+class MeteredConnectionPool(redis.ConnectionPool):
+    """
+    Redis connection pool which counts checkouts and connections in use.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = {"created": 0, "checkouts": 0, "in_use": 0, "peak_in_use": 0}
+
+    def make_connection(self):
+        self.metrics["created"] += 1
+        return super().make_connection()
+
+    async def get_connection(self, command_name, *keys, **options):
+        connection = await super().get_connection(command_name, *keys, **options)
+        self.metrics["checkouts"] += 1
+        self.metrics["in_use"] += 1
+        self.metrics["peak_in_use"] = max(
+            self.metrics["peak_in_use"], self.metrics["in_use"]
+        )
+        return connection
+
+    async def release(self, connection):
+        await super().release(connection)
+        self.metrics["in_use"] -= 1
+
+
+class MeteredBlockingConnectionPool(
+    MeteredConnectionPool, redis.BlockingConnectionPool
+):
+    """
+    ``MeteredConnectionPool`` which waits up to ``timeout`` seconds for a
+    free connection instead of failing at once.
+    """
+
+
+_client: redis.Redis | None = None
+_blocking_client: redis.Redis | None = None
+
+
+def init_redis() -> redis.Redis:
+    """
+    Creates the shared async Redis client and its connection pool.
+
+    :return: The shared client.
+    :rtype: redis.Redis
+    """
+    global _client
+    if _client is None:
+        pool = MeteredConnectionPool(
+            host=settings.redis_host,
+            port=settings.redis,
+            db=0,
+            max_connections=settings.redis_max_connections,
+        )
+        _client = redis.Redis(connection_pool=pool)
+    return _client
+
+
+def get_redis() -> redis.Redis:
+    """
+    Returns the shared async Redis client, creating it on first use.
+
+    :return: The shared client.
+    :rtype: redis.Redis
+    """
+    return _client or init_redis()
+
+
+def get_blocking_redis() -> redis.Redis:
+    """
+    Returns the async Redis client for blocking stream reads, creating it on
+    first use.
+
+    A blocking read holds its connection for as long as it waits, so these
+    reads get a small pool of their own: however many of them wait, the
+    shared pool stays free for the cache, rate limits and auth.
+
+    :return: The client for blocking reads.
+    :rtype: redis.Redis
+    """
+    global _blocking_client
+    if _blocking_client is None:
+        pool = MeteredBlockingConnectionPool(
+            host=settings.redis_host,
+            port=settings.redis,
+            db=0,
+            max_connections=settings.redis_blocking_connections,
+            timeout=settings.redis_blocking_timeout,
+        )
+        _blocking_client = redis.Redis(connection_pool=pool)
+    return _blocking_client
+
+
+async def close_redis() -> None:
+    """
+    Closes every connection of the shared client and of the client for
+    blocking reads.
+    """
+    global _client, _blocking_client
+    for client in (_client, _blocking_client):
+        if client is not None:
+            await client.connection_pool.disconnect()
+    _client = _blocking_client = None
+
+
+def redis_metrics() -> dict:
+    """
+    Reports usage of the shared connection pool.
+
+    :return: Connections created, checkouts, connections in use (now and at
+        peak) and the pool limit, and the same for blocking reads.
+    :rtype: dict
+    """
+    pool = get_redis().connection_pool
+    blocking = get_blocking_redis().connection_pool
+    return {
+        **pool.metrics,
+        "max_connections": pool.max_connections,
+        "blocking": {**blocking.metrics, "max_connections": blocking.max_connections},
+    }
@@ -1,26 +1,259 @@
+import re
+from datetime import datetime
+from typing import Callable, List
+
 from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
 from libgravatar import Gravatar
 
+from sqlalchemy import (
+    column,
+    delete,
+    extract,
+    false,
+    func,
+    literal_column,
+    or_,
+    select,
+    table,
+    true,
+    update,
+)
 from sqlalchemy.orm import Session
 from src.database.connect import get_db
-from src.database.models import Contact
+from src.database.models import (
+    Contact,
+    ContactRow,
+    ContactExportRow,
+    Roles,
+)
 from src.schemas import ContactModel, UpdateContactRoleModel
+from src.services.events import ContactEvent, publish
+
+
+def _project(query, row_cls=ContactRow):
+    """
+    Materializes projected rows into untracked row objects.
+
+    :param query: A query selecting ``row_cls.columns()``.
+    :type query: Query
+    :param row_cls: The row class to build.
+    :type row_cls: type
+    :return: A list of row objects.
+    :rtype: List[ContactRow]
+    """
+    return [row_cls(row) for row in query.all()]
 
 
-async def get_contacts(db: Session):
+def _select(db: Session, fields: List[str] | None):
+    """
+    Starts a query for whole contact rows or only for some of their fields.
+
+    :param db: The database session.
+    :type db: Session
+    :param fields: Names of the ``Contact`` columns to select, or None.
+    :type fields: List[str] | None
+    :return: The query.
+    :rtype: Query
+    """
+    if fields is None:
+        return db.query(*ContactRow.columns())
+    return db.query(*(getattr(Contact, field) for field in fields))
+
+
+def _fetch(query, fields: List[str] | None) -> list:
+    """
+    Runs a query from ``_select``.
+
+    :return: ``ContactRow`` objects, or plain rows of the selected fields.
+    :rtype: list
+    """
+    return _project(query) if fields is None else query.all()
+
+
+def filter_contacts(
+    query,
+    role: Roles | None = None,
+    confirmed: bool | None = None,
+    marital_status: bool | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    birthday_month: int | None = None,
+):
+    """
+    Narrows a contacts query down to the given filters.
+
+    Booleans are compared with SQL literals rather than parameters, so the
+    planner can match the partial index on unconfirmed contacts, and the
+    birthday month with the same expression as its index.
+
+    :param query: A query over contacts.
+    :type query: Query
+    :param role: Only contacts with this role.
+    :type role: Roles | None
+    :param confirmed: Only contacts with this confirmation state.
+    :type confirmed: bool | None
+    :param marital_status: Only contacts with this marital status.
+    :type marital_status: bool | None
+    :param created_from: Only contacts created at or after this moment.
+    :type created_from: datetime | None
+    :param created_to: Only contacts created before this moment.
+    :type created_to: datetime | None
+    :param birthday_month: Only contacts born in this month, 1 to 12.
+    :type birthday_month: int | None
+    :return: The filtered query.
+    :rtype: Query
+    """
+    if role is not None:
+        query = query.filter(Contact.roles == role)
+    if confirmed is not None:
+        query = query.filter(Contact.confirmed == (true() if confirmed else false()))
+    if marital_status is not None:
+        query = query.filter(
+            Contact.marital_status == (true() if marital_status else false())
+        )
+    if created_from is not None:
+        query = query.filter(Contact.created_at >= created_from)
+    if created_to is not None:
+        query = query.filter(Contact.created_at < created_to)
+    if birthday_month is not None:
+        query = query.filter(extract("month", Contact.birthday) == birthday_month)
+    return query
+
+
+async def get_contacts(db: Session, fields: List[str] | None = None, **filters):
     """
     Retrieves a list of all contacts in database.
 
     :param db: The database session
     :type db: Session
+    :param fields: Only select these columns.
+    :type fields: List[str] | None
+    :param filters: Only contacts matching these ``filter_contacts`` filters.
     :return: A list all contacts
-    :rtype: List[Contact]
+    :rtype: List[ContactRow]
     """
-    contacts = db.query(Contact).all()
+    contacts = _fetch(filter_contacts(_select(db, fields), **filters), fields)
     return contacts
 
 
-async def get_contact(contact_id: int, db: Session):
+async def get_contacts_version(db: Session) -> tuple:
+    """
+    Summarizes the contacts table for list ETags without loading any rows.
+
+    Creates change the count and the highest ID, deletes the count, and every
+    other write bumps a contact's version and so the sum of versions.
+
+    :param db: The database session.
+    :type db: Session
+    :return: The number of contacts, the highest ID and the sum of versions.
+    :rtype: tuple
+    """
+    count, max_id, versions = db.query(
+        func.count(Contact.id),
+        func.coalesce(func.max(Contact.id), 0),
+        func.coalesce(func.sum(Contact.version), 0),
+    ).one()
+    return count, max_id, versions
+
+
+def get_contacts_stats(db: Session, since: datetime) -> dict:
+    """
+    Counts contacts by role, confirmed contacts and signups per day.
+
+    Synchronous: the three aggregates scan the table, so callers run it in
+    the threadpool.
+
+    :param db: The database session.
+    :type db: Session
+    :param since: Count signups from this moment on.
+    :type since: datetime
+    :return: ``roles`` as a mapping of role to count, ``confirmed`` and
+        ``signups`` as a mapping of ISO date to count.
+    :rtype: dict
+    """
+    roles = db.query(Contact.roles, func.count(Contact.id)).group_by(Contact.roles)
+    confirmed = db.query(func.count(Contact.id)).filter(Contact.confirmed == true())
+    day = func.date(Contact.created_at)
+    signups = (
+        db.query(day, func.count(Contact.id))
+        .filter(Contact.created_at >= since)
+        .group_by(day)
+    )
+    return {
+        "roles": {role: count for role, count in roles.all()},
+        "confirmed": confirmed.scalar(),
+        "signups": {str(date): count for date, count in signups.all()},
+    }
+
+
+async def get_contacts_batch(ids: List[int], emails: List[str], db: Session):
+    """
+    Retrieves many contacts by IDs and e-mails with a single query.
+
+    :param ids: IDs of the contacts.
+    :type ids: List[int]
+    :param emails: E-mails of the contacts.
+    :type emails: List[str]
+    :param db: The database session
+    :type db: Session
+    :return: The contacts found, in no particular order.
+    :rtype: List[ContactRow]
+    """
+    conditions = []
+    if ids:
+        conditions.append(Contact.id.in_(set(ids)))
+    if emails:
+        conditions.append(Contact.email.in_(set(emails)))
+    if not conditions:
+        return []
+    contacts = _project(db.query(*ContactRow.columns()).filter(or_(*conditions)))
+    return contacts
+
+
+def stream_contacts(
+    db: Session,
+    role: Roles | None = None,
+    confirmed: bool | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    batch_size: int = 1000,
+):
+    """
+    Streams contacts for export through a server-side cursor.
+
+    Rows are fetched ``batch_size`` at a time, so memory use does not depend
+    on the size of the table.
+
+    :param db: The database session.
+    :type db: Session
+    :param role: Only export contacts with this role.
+    :type role: Roles | None
+    :param confirmed: Only export contacts with this confirmation state.
+    :type confirmed: bool | None
+    :param created_from: Only export contacts created at or after this moment.
+    :type created_from: datetime | None
+    :param created_to: Only export contacts created before this moment.
+    :type created_to: datetime | None
+    :param batch_size: Number of rows fetched per round trip.
+    :type batch_size: int
+    :return: A generator of exported contacts ordered by ID.
+    :rtype: Iterator[ContactExportRow]
+    """
+    query = filter_contacts(
+        db.query(*ContactExportRow.columns()),
+        role=role,
+        confirmed=confirmed,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    for row in query.order_by(Contact.id).yield_per(batch_size):
+        yield ContactExportRow(row)
+
+
+async def get_contact(
+    contact_id: int, db: Session, fields: List[str] | None = None
+):
     """
     Retrieves a single note with the specified ID for a specific contact.
 
@@ -28,23 +261,93 @@ async def get_contact(contact_id: int, db: Session):
     :type contact_id: int
     :param db: The database session
     :type db: Session
+    :param fields: Only select these columns and the version.
+    :type fields: List[str] | None
     :return: The contact with the specified ID, or None if it doesn't exist.
     :rtype: Contact
     """
+    if fields is not None:
+        query = _select(db, [*fields, "version"])
+        return query.filter(Contact.id == contact_id).first()
     contact = db.query(Contact).filter_by(id=contact_id).first()
     return contact
 
 
-async def create_contact(body: ContactModel, db: Session = Depends(get_db)):
+def _insert_ignore(db: Session):
+    """
+    Builds an ``INSERT ... ON CONFLICT DO NOTHING`` for the session's dialect.
+
+    :param db: The database session.
+    :type db: Session
+    :return: An insert statement into contacts which skips rows violating a
+        unique index (email or phone).
+    :rtype: Insert
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(Contact).on_conflict_do_nothing()
+
+
+class ContactConflict(Exception):
+    """
+    Raised when a new contact's email or phone is already registered.
+
+    :param field: The conflicting field, ``email`` or ``phone``.
+    :type field: str
+    """
+
+    def __init__(self, field: str):
+        super().__init__(field)
+        self.field = field
+
+
+def _conflicting_field(body: ContactModel, db: Session) -> str:
+    """
+    Finds which unique field of a rejected contact is already registered.
+
+    :param body: The rejected contact data.
+    :type body: ContactModel
+    :param db: The database session.
+    :type db: Session
+    :return: ``email`` or ``phone``.
+    :rtype: str
+    """
+    existing = (
+        db.query(Contact.email)
+        .filter(or_(Contact.email == body.email, Contact.phone == body.phone))
+        .first()
+    )
+    if existing is not None and existing.email != body.email:
+        return "phone"
+    return "email"
+
+
+async def create_contact(
+    body: ContactModel,
+    db: Session = Depends(get_db),
+    hash_password: Callable[[str], str] | None = None,
+):
     """
     Creates a new contact.
 
+    The row is inserted with ``INSERT ... ON CONFLICT DO NOTHING RETURNING``,
+    relying on the unique indexes instead of checking the email beforehand.
+    When ``hash_password`` is given, the password is hashed in the threadpool
+    only after the insert succeeded and stored in the same transaction, so
+    duplicates never pay for hashing.
+
     :param body: The data for the contact to create.
     :type body: ContactModel
     :param db: The database session.
     :type db: Session
+    :param hash_password: Hashes the plain password of ``body``; if omitted
+        the password is stored as given.
+    :type hash_password: Callable[[str], str] | None
     :return: The newly created contact
-    :rtype: Contact
+    :rtype: ContactExportRow
+    :raises ContactConflict: If the email or phone is already registered.
     """
     avatar = None
     try:
@@ -52,45 +355,244 @@ async def create_contact(body: ContactModel, db: Session = Depends(get_db)):
         avatar = g.get_image()
     except Exception as e:
         print(e)
-    contact = Contact(**body.dict(), avatar=avatar)
-    db.add(contact)
-    db.commit()
-    db.refresh(contact)
+    values = body.dict()
+    password = values.pop("password")
+    stmt = (
+        _insert_ignore(db)
+        .values(
+            **values,
+            password="!" if hash_password else password,
+            avatar=avatar,
+        )
+        .returning(*ContactExportRow.columns())
+    )
+    try:
+        row = db.execute(stmt).first()
+        if row is None:
+            raise ContactConflict(_conflicting_field(body, db))
+        if hash_password:
+            hashed = await run_in_threadpool(hash_password, password)
+            db.execute(
+                update(Contact).where(Contact.id == row.id).values(password=hashed),
+                execution_options={"synchronize_session": False},
+            )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    contact = ContactExportRow(row)
+    await publish([ContactEvent(ContactEvent.CREATE, contact)])
     return contact
 
 
-def check_exist_mail(body: ContactModel, db: Session = Depends(get_db)):
+async def insert_contacts(rows: List[dict], db: Session) -> List[ContactExportRow]:
     """
-    Retrieves a contact with a specific email.
+    Inserts a batch of contacts in a single statement.
 
-    :param body: The contact data to be checked.
-    :type body: ContactModel
-    :param db: The database session
+    Rows whose email or phone is already registered (in the database or
+    earlier in the same batch) are skipped instead of failing the batch.
+
+    :param rows: Column values of the contacts, with hashed passwords.
+    :type rows: List[dict]
+    :param db: The database session.
     :type db: Session
-    :return: Contact, if it's email is in database, or None if the email wasn't found.
-    :rtype: Contact
+    :return: The contacts which were actually inserted.
+    :rtype: List[ContactExportRow]
+    """
+    if not rows:
+        return []
+    stmt = _insert_ignore(db).returning(*ContactExportRow.columns())
+    try:
+        inserted = [ContactExportRow(row) for row in db.execute(stmt, rows)]
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    await publish([ContactEvent(ContactEvent.CREATE, row) for row in inserted])
+    return inserted
+
+
+async def update_password_hash(
+    contact_id: int, old_hash: str, new_hash: str, db: Session
+) -> bool:
+    """
+    Replaces a password hash with one of the same password at another cost.
+
+    The hash is only replaced if it is still ``old_hash``, so a password
+    changed in the meantime is kept.
+
+    :param contact_id: The ID of the contact.
+    :type contact_id: int
+    :param old_hash: The hash the new one was computed to replace.
+    :type old_hash: str
+    :param new_hash: The new hash.
+    :type new_hash: str
+    :param db: The database session.
+    :type db: Session
+    :return: True if the hash was replaced.
+    :rtype: bool
     """
-    check_mail = db.query(Contact).filter_by(email=body.email).first()
-    return check_mail
+    result = db.execute(
+        update(Contact)
+        .where(Contact.id == contact_id, Contact.password == old_hash)
+        .values(password=new_hash)
+    )
+    db.commit()
+    return result.rowcount == 1
 
 
-async def update_token(contact: Contact, token: str | None, db: Session) -> None:
+class ContactVersionConflict(Exception):
+    """
+    Raised when a contact was changed since the version the client has seen.
     """
-    Updates contact's token if is invalid.
 
-    :param contact: The data of the existing contact.
-    :type contact: Contact
-    :param token: New refresh token to be put in the system.
-    :type token: str | None
+
+def _returns_joined_columns(db: Session) -> bool:
+    """
+    :return: True if an ``UPDATE ... FROM`` may return the columns of the
+        joined table, which PostgreSQL allows and SQLite doesn't.
+    :rtype: bool
+    """
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _update_statement(
+    condition, values: dict, version: int | None = None, previous_columns=()
+):
+    """
+    Builds the ``UPDATE ... RETURNING`` of ``_update_returning``.
+
+    Replaced values are read in the same statement, by joining the contact to
+    a locking subquery of itself: the subquery locks the row before it is
+    updated, so it returns the values the update replaces. They are returned
+    as ``previous_<column>``.
+
+    :param condition: The WHERE clause selecting the contact.
+    :param values: The new column values.
+    :type values: dict
+    :param version: The version the contact must still have, if any.
+    :type version: int | None
+    :param previous_columns: The columns whose replaced values to return.
+    :type previous_columns: Sequence[Column]
+    :return: The statement.
+    :rtype: Update
+    """
+    stmt = update(Contact).where(condition)
+    if version is not None:
+        stmt = stmt.where(Contact.version == version)
+    stmt = stmt.values(**values, version=Contact.version + 1).returning(
+        *ContactExportRow.columns()
+    )
+    if previous_columns:
+        old = (
+            select(Contact.id, *previous_columns)
+            .where(condition)
+            .with_for_update()
+            .subquery("old")
+        )
+        stmt = stmt.where(Contact.id == old.c.id).returning(
+            *[
+                old.c[column.key].label(f"previous_{column.key}")
+                for column in previous_columns
+            ]
+        )
+    return stmt
+
+
+async def _update_returning(
+    op: str,
+    condition,
+    values: dict,
+    db: Session,
+    version: int | None = None,
+    previous: dict | None = None,
+    previous_columns=(),
+) -> ContactExportRow | None:
+    """
+    Updates a contact with a single ``UPDATE ... RETURNING`` statement, bumps
+    its version and publishes the change.
+
+    :param op: The ``ContactEvent`` kind of the change.
+    :type op: str
+    :param condition: The WHERE clause selecting the contact.
+    :param values: The new column values.
+    :type values: dict
     :param db: The database session.
     :type db: Session
+    :param version: The version the contact must still have, if any.
+    :type version: int | None
+    :param previous: The replaced values, passed on with the event.
+    :type previous: dict | None
+    :param previous_columns: Columns whose replaced values are passed on with
+        the event, read by the update itself.
+    :type previous_columns: Sequence[Column]
+    :return: The updated contact, or None if it doesn't exist.
+    :rtype: ContactExportRow | None
+    :raises ContactVersionConflict: If the contact has another version.
     """
-    contact.refresh_token = token
+    if previous_columns and not _returns_joined_columns(db):
+        return await _compare_and_set(
+            op, condition, values, db, version, previous_columns
+        )
+    stmt = _update_statement(condition, values, version, previous_columns)
+    row = db.execute(stmt, execution_options={"synchronize_session": False}).first()
     db.commit()
+    if row is None and version is not None:
+        if db.query(Contact.id).filter(condition).first() is not None:
+            raise ContactVersionConflict()
+    if row is None:
+        return None
+    contact = ContactExportRow(row)
+    if previous_columns:
+        previous = {
+            column.key: getattr(row, f"previous_{column.key}")
+            for column in previous_columns
+        }
+    await publish([ContactEvent(op, contact, previous)])
+    return contact
+
+
+async def _compare_and_set(
+    op: str,
+    condition,
+    values: dict,
+    db: Session,
+    version: int | None,
+    previous_columns,
+) -> ContactExportRow | None:
+    """
+    ``_update_returning`` for databases whose updates can't return the values
+    they replace: reads them along with the row version, without a lock, and
+    updates only if the version hasn't changed since, reading again if it has.
+
+    :return: The updated contact, or None if it doesn't exist.
+    :rtype: ContactExportRow | None
+    :raises ContactVersionConflict: If the contact has another version than
+        ``version``.
+    """
+    while True:
+        seen = db.query(Contact.version, *previous_columns).filter(condition).first()
+        if seen is None:
+            return None
+        if version is not None and seen.version != version:
+            raise ContactVersionConflict()
+        previous = {
+            column.key: getattr(seen, column.key) for column in previous_columns
+        }
+        try:
+            return await _update_returning(
+                op, condition, values, db, seen.version, previous
+            )
+        except ContactVersionConflict:
+            if version is not None:
+                raise
 
 
 async def update_contact(
-    body: ContactModel, contact_id: int, db: Session = Depends(get_db)
+    body: ContactModel,
+    contact_id: int,
+    db: Session = Depends(get_db),
+    version: int | None = None,
 ):
     """
     Updates data of a contact by specific ID.
@@ -101,22 +603,33 @@ async def update_contact(
     :type contact_id: int
     :param db: The database session.
     :type db: Session
-    :return: Updated contact.
-    :rtype: Contact
+    :param version: The version the contact must still have, if any.
+    :type version: int | None
+    :return: Updated contact, or None if it doesn't exist.
+    :rtype: ContactExportRow
+    :raises ContactVersionConflict: If the contact has another version.
     """
-    contact = db.query(Contact).filter_by(id=contact_id).first()
-    if contact:
-        contact.first_name = body.first_name
-        contact.last_name = body.last_name
-        contact.email = body.email
-        contact.phone = body.phone
-        contact.birthday = body.birthday
-        db.commit()
+    contact = await _update_returning(
+        ContactEvent.UPDATE,
+        Contact.id == contact_id,
+        {
+            "first_name": body.first_name,
+            "last_name": body.last_name,
+            "email": body.email,
+            "phone": body.phone,
+            "birthday": body.birthday,
+        },
+        db,
+        version,
+    )
     return contact
 
 
 async def change_contact_role(
-    body: UpdateContactRoleModel, contact_id: int, db: Session = Depends(get_db)
+    body: UpdateContactRoleModel,
+    contact_id: int,
+    db: Session = Depends(get_db),
+    version: int | None = None,
 ):
     """
     Changes contact's role.
@@ -127,13 +640,20 @@ async def change_contact_role(
     :type contact_id: int
     :param db: The database session.
     :type db: Session, optional
-    :return: A contact with a new role.
-    :rtype: Contact
+    :param version: The version the contact must still have, if any.
+    :type version: int | None
+    :return: A contact with a new role, or None if it doesn't exist.
+    :rtype: ContactExportRow
+    :raises ContactVersionConflict: If the contact has another version.
     """
-    contact = db.query(Contact).filter_by(id=contact_id).first()
-    if contact:
-        contact.roles = body.roles
-        db.commit()
+    contact = await _update_returning(
+        ContactEvent.ROLE,
+        Contact.id == contact_id,
+        {"roles": body.roles},
+        db,
+        version,
+        previous_columns=[Contact.roles],
+    )
     return contact
 
 
@@ -145,17 +665,26 @@ async def delete_contact(contact_id: int, db: Session = Depends(get_db)):
     :type contact_id: int
     :param db: The database session.
     :type db: Session
-    :return: Deleted contact.
-    :rtype: Contact
+    :return: Deleted contact, or None if it doesn't exist.
+    :rtype: ContactExportRow
     """
-    contact = db.query(Contact).filter_by(id=contact_id).first()
-    if contact:
-        db.delete(contact)
-        db.commit()
+    stmt = (
+        delete(Contact)
+        .where(Contact.id == contact_id)
+        .returning(*ContactExportRow.columns())
+    )
+    row = db.execute(stmt, execution_options={"synchronize_session": False}).first()
+    db.commit()
+    if row is None:
+        return None
+    contact = ContactExportRow(row)
+    await publish([ContactEvent(ContactEvent.DELETE, contact)])
     return contact
 
 
-async def search_first_name(inquiry: str, db: Session = Depends(get_db)):
+async def search_first_name(
+    inquiry: str, db: Session = Depends(get_db), fields: List[str] | None = None
+):
     """
     Retrieves a list of contacts which are found by first name.
 
@@ -163,14 +692,20 @@ async def search_first_name(inquiry: str, db: Session = Depends(get_db)):
     :type inquiry: str
     :param db: The database session
     :type db: Session
+    :param fields: Only select these columns.
+    :type fields: List[str] | None
     :return: A list of all contact which are found by first name.
-    :rtype: List[Contact]
+    :rtype: List[ContactRow]
     """
-    contacts = db.query(Contact).filter_by(first_name=inquiry).all()
+    contacts = _fetch(
+        _select(db, fields).filter(Contact.first_name == inquiry), fields
+    )
     return contacts
 
 
-async def search_last_name(inquiry: str, db: Session = Depends(get_db)):
+async def search_last_name(
+    inquiry: str, db: Session = Depends(get_db), fields: List[str] | None = None
+):
     """
     Retrieves a list of contacts which are found by last name.
 
@@ -178,14 +713,34 @@ async def search_last_name(inquiry: str, db: Session = Depends(get_db)):
     :type inquiry: str
     :param db: The database session
     :type db: Session, optional
+    :param fields: Only select these columns.
+    :type fields: List[str] | None
     :return: A list of all contact which are found by last name.
-    :rtype: List[Contact]
+    :rtype: List[ContactRow]
     """
-    contacts = db.query(Contact).filter_by(last_name=inquiry).all()
+    contacts = _fetch(
+        _select(db, fields).filter(Contact.last_name == inquiry), fields
+    )
     return contacts
 
 
-async def search_by_mail(inquiry: str, db: Session = Depends(get_db)):
+def find_by_mail(inquiry: str, db: Session):
+    """
+    Synchronous variant of ``search_by_mail`` for use from worker threads.
+
+    :param inquiry: E-mail to be searched.
+    :type inquiry: str
+    :param db: The database session.
+    :type db: Session
+    :return: A contact which is found by specific e-mail.
+    :rtype: Contact
+    """
+    return db.query(Contact).filter_by(email=inquiry).first()
+
+
+async def search_by_mail(
+    inquiry: str, db: Session = Depends(get_db), fields: List[str] | None = None
+):
     """
     Returns a single contact which was found by specific e-mail.
 
@@ -193,14 +748,20 @@ async def search_by_mail(inquiry: str, db: Session = Depends(get_db)):
     :type inquiry: str
     :param db: The database session.
     :type db: Session
+    :param fields: Only select these columns.
+    :type fields: List[str] | None
     :return: A contact which is found by specific e-mail.
     :rtype: Contact
     """
-    contacts = db.query(Contact).filter_by(email=inquiry).first()
+    if fields is not None:
+        return _select(db, fields).filter(Contact.email == inquiry).first()
+    contacts = find_by_mail(inquiry, db)
     return contacts
 
 
-async def search_by_mail_ilike_method(inquiry: str, db: Session = Depends(get_db)):
+async def search_by_mail_ilike_method(
+    inquiry: str, db: Session = Depends(get_db), fields: List[str] | None = None
+):
     """
     Returns a list of contacts by matches founded in all contacts' e-mails.
 
@@ -208,28 +769,36 @@ async def search_by_mail_ilike_method(inquiry: str, db: Session = Depends(get_db
     :type inquiry: str
     :param db: The database session.
     :type db: Session
+    :param fields: Only select these columns.
+    :type fields: List[str] | None
     :return: A list of contacts by matches founded in all contacts' e-mails.
-    :rtype: List[Contact]
+    :rtype: List[ContactRow]
     """
-    contacts = db.query(Contact).filter(Contact.email.ilike(f"%{inquiry}%")).all()
+    contacts = _fetch(
+        _select(db, fields).filter(Contact.email.ilike(f"%{inquiry}%")), fields
+    )
     return contacts
 
 
 async def confirmed_email(email: str, db: Session):
     """
-    Confirms contact's e-mail.
+    Confirms contact's e-mail. Contacts already confirmed are left alone, so
+    the change is only published once.
 
     :param email: Contact's email to be confirmed.
     :type email: str
     :param db: The database session.
     :type db: Session
     """
-    user = await search_by_mail(email, db)
-    user.confirmed = True
-    db.commit()
+    await _update_returning(
+        ContactEvent.CONFIRM,
+        (Contact.email == email) & Contact.confirmed.is_not(True),
+        {"confirmed": True},
+        db,
+    )
 
 
-async def update_avatar(email: str, url: str, db: Session) -> Contact:
+async def update_avatar(email: str, url: str, db: Session) -> ContactExportRow:
     """
     Updates contact's avatar.
 
@@ -240,9 +809,60 @@ async def update_avatar(email: str, url: str, db: Session) -> Contact:
     :param db: The database session
     :type db: Session
     :return: A contact with it's new avatar.
-    :rtype: Contact
+    :rtype: ContactExportRow
     """
-    contact = await search_by_mail(email, db)
-    contact.avatar = url
-    db.commit()
+    contact = await _update_returning(
+        ContactEvent.AVATAR, Contact.email == email, {"avatar": url}, db
+    )
     return contact
+
+
+async def search_contacts(
+    inquiry: str, db: Session, limit: int = 20, offset: int = 0
+) -> List[ContactRow]:
+    """
+    Full-text search over first names, last names and e-mail local parts,
+    best matches first.
+
+    Every word of the inquiry must prefix a word of the contact. Postgres
+    ranks with ``ts_rank`` over the ``search_vector`` column, SQLite with
+    ``bm25`` over the ``contacts_fts`` table; names weigh more than e-mails.
+
+    :param inquiry: User's input to be searched.
+    :type inquiry: str
+    :param db: The database session.
+    :type db: Session
+    :param limit: The maximum number of contacts.
+    :type limit: int
+    :param offset: The number of best matches to skip.
+    :type offset: int
+    :return: A page of matching contacts.
+    :rtype: List[ContactRow]
+    """
+    words = re.findall(r"\w+", inquiry.lower())[:8]
+    if not words:
+        return []
+    query = db.query(*ContactRow.columns())
+    if db.get_bind().dialect.name == "postgresql":
+        vector = literal_column("contacts.search_vector")
+        ts_query = func.to_tsquery(
+            literal_column("'simple'"), " & ".join(f"{word}:*" for word in words)
+        )
+        query = query.filter(vector.op("@@")(ts_query)).order_by(
+            func.ts_rank(vector, ts_query).desc(), Contact.id
+        )
+    else:
+        fts = table("contacts_fts", column("rowid"))
+        query = (
+            query.join(fts, fts.c.rowid == Contact.id)
+            .filter(
+                literal_column("contacts_fts").op("MATCH")(
+                    " AND ".join(f'"{word}"*' for word in words)
+                )
+            )
+            .order_by(
+                literal_column("bm25(contacts_fts, 10.0, 10.0, 5.0)"), Contact.id
+            )
+        )
+    contacts = _project(query.limit(limit).offset(offset))
+    return contacts
@@ -0,0 +1,102 @@
+from datetime import datetime
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+
+from src.database.models import RefreshSession
+
+
+async def create_session(
+    session_id: str,
+    contact_id: int,
+    token_id: str,
+    expires_at: datetime,
+    db: Session,
+) -> None:
+    """
+    Opens a refresh session for a device of a contact.
+
+    Expired sessions of the contact are purged in the same transaction.
+
+    :param session_id: The ID of the new session.
+    :type session_id: str
+    :param contact_id: The ID of the contact who logged in.
+    :type contact_id: int
+    :param token_id: The ``jti`` of the refresh token issued for the session.
+    :type token_id: str
+    :param expires_at: When the session expires.
+    :type expires_at: datetime
+    :param db: The database session.
+    :type db: Session
+    """
+    db.execute(
+        delete(RefreshSession).where(
+            RefreshSession.contact_id == contact_id,
+            RefreshSession.expires_at < datetime.utcnow(),
+        )
+    )
+    db.execute(
+        insert(RefreshSession).values(
+            id=session_id,
+            contact_id=contact_id,
+            token_id=token_id,
+            expires_at=expires_at,
+        )
+    )
+    db.commit()
+
+
+async def rotate_session(
+    session_id: str,
+    token_id: str,
+    new_token_id: str,
+    expires_at: datetime,
+    db: Session,
+) -> bool:
+    """
+    Replaces the refresh token of a session with a single keyed UPDATE.
+
+    If the presented token is not the current one of the session, the token
+    was already used (or stolen), so the whole session is revoked.
+
+    :param session_id: The ID of the session.
+    :type session_id: str
+    :param token_id: The ``jti`` of the presented refresh token.
+    :type token_id: str
+    :param new_token_id: The ``jti`` of the refresh token replacing it.
+    :type new_token_id: str
+    :param expires_at: The new expiry of the session.
+    :type expires_at: datetime
+    :param db: The database session.
+    :type db: Session
+    :return: True if the session was rotated, False if it was missing,
+        expired or the token was reused.
+    :rtype: bool
+    """
+    rotated = db.execute(
+        update(RefreshSession)
+        .where(
+            RefreshSession.id == session_id,
+            RefreshSession.token_id == token_id,
+            RefreshSession.expires_at > datetime.utcnow(),
+        )
+        .values(token_id=new_token_id, expires_at=expires_at)
+        .returning(RefreshSession.id)
+    ).first()
+    if rotated is None:
+        db.execute(delete(RefreshSession).where(RefreshSession.id == session_id))
+    db.commit()
+    return rotated is not None
+
+
+async def delete_session(session_id: str, db: Session) -> None:
+    """
+    Revokes a refresh session.
+
+    :param session_id: The ID of the session.
+    :type session_id: str
+    :param db: The database session.
+    :type db: Session
+    """
+    db.execute(delete(RefreshSession).where(RefreshSession.id == session_id))
+    db.commit()
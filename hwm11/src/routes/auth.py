@@ -1,5 +1,6 @@
 import uuid
 
+from datetime import datetime
 from typing import List
 
 from fastapi import (
@@ -16,10 +17,11 @@ from fastapi.security import (
     HTTPAuthorizationCredentials,
     HTTPBearer,
 )
-from fastapi_limiter.depends import RateLimiter
+from src.services.rate_limit import RateLimiter
 from sqlalchemy.orm import Session
 
 from src.database.connect import get_db
+from src.database.models import Contact
 from src.schemas import (
     ContactModel,
     ContactDb,
@@ -30,6 +32,7 @@ from src.schemas import (
     ForgotPasswordModel,
 )
 from src.repository import contacts as repository_contacts
+from src.repository import sessions as repository_sessions
 from src.services.auth import auth_service
 from src.services.email import send_email, send_email_reset_password_token
 
@@ -46,13 +49,15 @@ async def signup(
     request: Request,
     db: Session = Depends(get_db),
 ):
-    exist_contact = await repository_contacts.search_by_mail(body.email, db)
-    if exist_contact:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT, detail="Account already exists"
+    try:
+        contact = await repository_contacts.create_contact(
+            body, db, hash_password=auth_service.get_password_hash
         )
-    body.password = auth_service.get_password_hash(body.password)
-    contact = await repository_contacts.create_contact(body, db)
+    except repository_contacts.ContactConflict as e:
+        detail = "Account already exists"
+        if e.field == "phone":
+            detail = "Phone already registered"
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
     background_tasks.add_task(
         send_email, contact.email, contact.first_name, request.base_url
     )
@@ -64,7 +69,9 @@ async def signup(
 
 @router.post("/login", response_model=TokenModel)
 async def login(
-    body: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    body: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db),
 ):
     contact = await repository_contacts.search_by_mail(body.username, db)
     if contact is None:
@@ -75,16 +82,36 @@ async def login(
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Email not confirmed"
         )
-    if not auth_service.verify_password(body.password, contact.password):
+    valid, needs_rehash = await auth_service.check_password(
+        body.password, contact.password
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid password"
         )
+    if needs_rehash:
+        background_tasks.add_task(
+            auth_service.rehash_password,
+            contact.id,
+            body.password,
+            contact.password,
+            db,
+        )
     # Generate JWT
+    session_id, token_id = uuid.uuid4().hex, uuid.uuid4().hex
     access_token = await auth_service.create_access_token(
-        data={"sub": contact.email}, expires_delta=7200
+        data={"sub": contact.email, "sid": session_id}, expires_delta=7200
+    )
+    refresh_token = await auth_service.create_refresh_token(
+        data={"sub": contact.email, "sid": session_id, "jti": token_id}
+    )
+    await repository_sessions.create_session(
+        session_id,
+        contact.id,
+        token_id,
+        datetime.utcnow() + auth_service.REFRESH_TOKEN_TTL,
+        db,
     )
-    refresh_token = await auth_service.create_refresh_token(data={"sub": contact.email})
-    await repository_contacts.update_token(contact, refresh_token, db)
     return {
         "access_token": access_token,
         "refresh_token": refresh_token,
@@ -98,17 +125,27 @@ async def refresh_token(
     db: Session = Depends(get_db),
 ):
     token = credentials.credentials
-    email = await auth_service.decode_refresh_token(token)
-    contact = await repository_contacts.search_by_mail(email, db)
-    if contact.refresh_token != token:
-        await repository_contacts.update_token(contact, None, db)
+    payload = await auth_service.decode_refresh_token(token)
+    email, session_id = payload["sub"], payload.get("sid")
+    token_id = uuid.uuid4().hex
+    rotated = session_id is not None and await repository_sessions.rotate_session(
+        session_id,
+        payload.get("jti"),
+        token_id,
+        datetime.utcnow() + auth_service.REFRESH_TOKEN_TTL,
+        db,
+    )
+    if not rotated:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
         )
 
-    access_token = await auth_service.create_access_token(data={"sub": email})
-    refresh_token = await auth_service.create_refresh_token(data={"sub": email})
-    await repository_contacts.update_token(contact, refresh_token, db)
+    access_token = await auth_service.create_access_token(
+        data={"sub": email, "sid": session_id}
+    )
+    refresh_token = await auth_service.create_refresh_token(
+        data={"sub": email, "sid": session_id, "jti": token_id}
+    )
     return {
         "access_token": access_token,
         "refresh_token": refresh_token,
@@ -116,6 +153,18 @@ async def refresh_token(
     }
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    token: str = Depends(auth_service.oauth2_scheme),
+    current_contact: Contact = Depends(auth_service.get_current_user),
+    db: Session = Depends(get_db),
+):
+    payload = await auth_service.decode_access_token(token)
+    await auth_service.revoke_access_token(payload)
+    if "sid" in payload:
+        await repository_sessions.delete_session(payload["sid"], db)
+
+
 @router.get("/confirmed_email/{token}")
 async def confirmed_email(token: str, db: Session = Depends(get_db)):
     email = await auth_service.get_email_from_token(token)
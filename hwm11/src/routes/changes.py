@@ -0,0 +1,157 @@
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from src.services.rate_limit import RateLimiter
+from sqlalchemy.orm import Session
+
+from src.database.connect import get_db
+from src.database.models import Contact, Roles
+from src.schemas import ContactChanges, ContactChangesAck
+from src.services.auth import auth_service
+from src.services.cache import NoSuchGroup, StreamReadersBusy
+from src.services.changes import contact_changes, is_stream_id
+from src.services.live import live_changes
+from src.services.roles import RolesChecker
+
+router = APIRouter(prefix="/changes", tags=["changes"])
+
+allowed_read_changes = RolesChecker([Roles.admin])
+allowed_manage_groups = RolesChecker([Roles.admin])
+allowed_live_changes = RolesChecker([Roles.admin, Roles.moderator, Roles.user])
+
+group_path = Path(..., regex=r"^[\w.-]{1,64}$")
+
+
+def stream_id(value: str, name: str) -> str:
+    if not is_stream_id(value):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{name} must be a stream entry ID such as 1700000000000-0",
+        )
+    return value
+
+
+def changes_page(changes: list, after: str) -> ContactChanges:
+    return ContactChanges(
+        changes=changes, last_id=changes[-1]["id"] if changes else after
+    )
+
+
+@router.get(
+    "/",
+    response_model=ContactChanges,
+    name="Replay contact changes",
+    dependencies=[
+        Depends(allowed_read_changes),
+        Depends(RateLimiter(times=10, seconds=5)),
+    ],
+)
+async def replay_changes(
+    after: str = Query("0", description="The last change ID seen"),
+    count: int = Query(100, ge=1, le=1000),
+):
+    after = stream_id(after, "after")
+    return changes_page(await contact_changes.replay(after, count), after)
+
+
+@router.get(
+    "/live",
+    name="Live contact changes",
+    response_class=StreamingResponse,
+    dependencies=[
+        Depends(allowed_live_changes),
+        Depends(RateLimiter(times=2, seconds=5)),
+    ],
+)
+async def live(
+    last_event_id: str | None = Header(None),
+    db: Session = Depends(get_db),
+    current_contact: Contact = Depends(auth_service.get_current_user),
+):
+    """
+    Server-Sent Events of contact changes the caller's role may see. Browsers
+    reconnect with ``Last-Event-ID`` and receive what they missed.
+    """
+    # The stream outlives the request's dependencies: give the connection
+    # back now rather than when the client disconnects.
+    db.close()
+    if last_event_id is not None and not is_stream_id(last_event_id):
+        last_event_id = None
+    subscriber = live_changes.subscribe(current_contact.roles)
+    return StreamingResponse(
+        live_changes.stream(subscriber, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.put(
+    "/groups/{group}",
+    name="Create consumer group",
+    dependencies=[
+        Depends(allowed_manage_groups),
+        Depends(RateLimiter(times=2, seconds=5)),
+    ],
+)
+async def create_group(
+    response: Response,
+    group: str = group_path,
+    start: str = Query("$", description="$ for new changes only, 0 for all"),
+):
+    if start != "$":
+        start = stream_id(start, "start")
+    if await contact_changes.create_group(group, start):
+        response.status_code = status.HTTP_201_CREATED
+        return {"message": f"Group {group} created"}
+    return {"message": f"Group {group} already exists"}
+
+
+@router.get(
+    "/groups/{group}",
+    response_model=ContactChanges,
+    name="Read contact changes as a group consumer",
+    dependencies=[
+        Depends(allowed_read_changes),
+        Depends(RateLimiter(times=10, seconds=5)),
+    ],
+)
+async def read_group(
+    group: str = group_path,
+    consumer: str = Query(..., regex=r"^[\w.-]{1,64}$"),
+    count: int = Query(100, ge=1, le=1000),
+    block: int = Query(0, ge=0, le=10000, description="Milliseconds to wait"),
+    pending: bool = Query(False, description="Redeliver unacknowledged changes"),
+):
+    try:
+        changes = await contact_changes.read_group(
+            group, consumer, count, block=block or None, pending=pending
+        )
+    except NoSuchGroup:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    except StreamReadersBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many consumers waiting, retry later",
+        )
+    return changes_page(changes, "0")
+
+
+@router.post(
+    "/groups/{group}/ack",
+    name="Acknowledge contact changes",
+    dependencies=[
+        Depends(allowed_read_changes),
+        Depends(RateLimiter(times=10, seconds=5)),
+    ],
+)
+async def ack_changes(body: ContactChangesAck, group: str = group_path):
+    ids = [stream_id(entry_id, "ids") for entry_id in body.ids]
+    return {"acknowledged": await contact_changes.ack(group, ids)}
@@ -1,15 +1,54 @@
 import cloudinary
 import cloudinary.uploader
+from datetime import datetime
 from typing import List
-from fastapi import APIRouter, Depends, File, HTTPException, Path, UploadFile, status
-from fastapi_limiter.depends import RateLimiter
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import parse_obj_as
+from src.services.rate_limit import RateLimiter
 from sqlalchemy.orm import Session
 
 from src.database.connect import get_db
 from src.database.models import Contact, Roles
-from src.schemas import ContactModel, ResponseContact, ContactDb, UpdateContactRoleModel
+from src.schemas import (
+    ContactModel,
+    ResponseContact,
+    ContactDb,
+    ContactSuggestion,
+    UpdateContactRoleModel,
+    ImportReport,
+    DuplicateReport,
+    BatchContactsRequest,
+    BatchContactsResponse,
+)
 from src.repository import contacts as repository_contacts
 from src.services.auth import auth_service
+from src.services.autocomplete import autocomplete_index
+from src.services.duplicates import find_duplicates
+from src.services.etag import (
+    is_not_modified,
+    make_etag,
+    make_list_etag,
+    not_modified,
+    parse_if_match,
+)
+from src.services.export import EXPORT_FORMATS, export_contacts
+from src.services.fields import fields_response, sparse_fields
+from src.services.importer import import_contacts
+from src.services.response_cache import normalize_inquiry, response_cache
 from src.services.roles import RolesChecker
 from src.conf.config import settings
 
@@ -18,6 +57,7 @@ router = APIRouter(prefix="/contacts", tags=["contacts"])
 allowed_get_contacts = RolesChecker([Roles.admin, Roles.moderator, Roles.user])
 allowed_create_contact = RolesChecker([Roles.admin, Roles.moderator, Roles.user])
 allowed_get_contact_by_id = RolesChecker([Roles.admin, Roles.moderator, Roles.user])
+allowed_get_contacts_batch = RolesChecker([Roles.admin, Roles.moderator, Roles.user])
 allowed_update_contact = RolesChecker([Roles.admin, Roles.moderator])
 allowed_change_contact_role = RolesChecker([Roles.admin, Roles.moderator])
 allowed_delete_contact = RolesChecker([Roles.admin])
@@ -25,6 +65,68 @@ allowed_search_first_name = RolesChecker([Roles.admin, Roles.moderator, Roles.us
 allowed_search_last_name = RolesChecker([Roles.admin, Roles.moderator, Roles.user])
 allowed_search_email = RolesChecker([Roles.admin, Roles.moderator, Roles.user])
 allowed_search = RolesChecker([Roles.admin, Roles.moderator, Roles.user])
+allowed_autocomplete = RolesChecker([Roles.admin, Roles.moderator, Roles.user])
+allowed_full_text_search = RolesChecker([Roles.admin, Roles.moderator, Roles.user])
+allowed_export_contacts = RolesChecker([Roles.admin])
+allowed_import_contacts = RolesChecker([Roles.admin])
+allowed_find_duplicates = RolesChecker([Roles.admin])
+
+
+def render_search(
+    found, response_model, fields: List[str] | None = None
+) -> tuple:
+    """
+    Serializes a search result the way FastAPI would for ``response_model``.
+
+    :param found: The contacts found.
+    :param response_model: The route's response model.
+    :param fields: Only encode these fields.
+    :type fields: List[str] | None
+    :return: The status code and the JSON body.
+    :rtype: tuple
+    """
+    if not found:
+        response = JSONResponse(
+            {"detail": "Not found"}, status_code=status.HTTP_404_NOT_FOUND
+        )
+    elif fields is not None:
+        response = fields_response(found, fields)
+    else:
+        response = JSONResponse(jsonable_encoder(parse_obj_as(response_model, found)))
+    return response.status_code, response.body
+
+
+async def cached_search(
+    route: str,
+    inquiry: str,
+    current_contact: Contact,
+    search,
+    response_model,
+    fields: List[str] | None = None,
+):
+    """
+    Answers a search from the response cache, running ``search`` on a miss.
+
+    :param route: Name of the route.
+    :type route: str
+    :param inquiry: The normalized inquiry.
+    :type inquiry: str
+    :param current_contact: The caller.
+    :type current_contact: Contact
+    :param search: Coroutine function running the search.
+    :param response_model: The route's response model.
+    :param fields: Only return these fields.
+    :type fields: List[str] | None
+    :return: The response.
+    :rtype: Response
+    """
+
+    async def render():
+        return render_search(await search(), response_model, fields)
+
+    role = getattr(current_contact.roles, "value", current_contact.roles)
+    variant = ",".join(fields) if fields is not None else ""
+    return await response_cache.fetch(route, role, inquiry, render, variant)
 
 
 @router.post(
@@ -38,17 +140,35 @@ allowed_search = RolesChecker([Roles.admin, Roles.moderator, Roles.user])
     ],
 )
 async def create_contact(body: ContactModel, db: Session = Depends(get_db)):
-    check_mail = repository_contacts.check_exist_mail(body, db)
-    if check_mail:
+    try:
+        contact = await repository_contacts.create_contact(
+            body, db, hash_password=auth_service.get_password_hash
+        )
+    except repository_contacts.ContactConflict as e:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
-            detail="Such mail already registered",
+            detail=f"Such {e.field} already registered",
         )
-    body.password = auth_service.get_password_hash(body.password)
-    contact = await repository_contacts.create_contact(body, db)
     return {"contact": contact, "detail": "Contact was created"}
 
 
+@router.post(
+    "/import",
+    response_model=ImportReport,
+    name="Import contacts",
+    dependencies=[
+        Depends(allowed_import_contacts),
+        Depends(RateLimiter(times=2, seconds=5)),
+    ],
+)
+async def import_contacts_route(
+    file: UploadFile = File(),
+    db: Session = Depends(get_db),
+    current_contact: Contact = Depends(auth_service.get_current_user),
+):
+    return await import_contacts(file.file, db)
+
+
 @router.get(
     "/",
     response_model=List[ContactDb],
@@ -59,13 +179,136 @@ async def create_contact(body: ContactModel, db: Session = Depends(get_db)):
     ],
 )
 async def get_contacts(
+    response: Response,
+    role: Roles | None = None,
+    confirmed: bool | None = None,
+    marital_status: bool | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    birthday_month: int | None = Query(None, ge=1, le=12),
+    if_none_match: str | None = Header(None),
+    fields: List[str] | None = Depends(sparse_fields),
+    db: Session = Depends(get_db),
+    current_contact: Contact = Depends(auth_service.get_current_user),
+):
+    etag = make_list_etag(*await repository_contacts.get_contacts_version(db))
+    if is_not_modified(if_none_match, etag):
+        return not_modified(etag)
+    contacts = await repository_contacts.get_contacts(
+        db,
+        fields,
+        role=role,
+        confirmed=confirmed,
+        marital_status=marital_status,
+        created_from=created_from,
+        created_to=created_to,
+        birthday_month=birthday_month,
+    )
+    if fields is not None:
+        return fields_response(contacts, fields, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return contacts
+
+
+@router.get(
+    "/export",
+    name="Export contacts",
+    response_class=StreamingResponse,
+    dependencies=[
+        Depends(allowed_export_contacts),
+        Depends(RateLimiter(times=2, seconds=5)),
+    ],
+)
+async def export_contacts_route(
+    export_format: str = Query("ndjson", alias="format", regex="^(ndjson|csv)$"),
+    gzip: bool = False,
+    role: Roles | None = None,
+    confirmed: bool | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    db: Session = Depends(get_db),
+    current_contact: Contact = Depends(auth_service.get_current_user),
+):
+    rows = repository_contacts.stream_contacts(
+        db,
+        role=role,
+        confirmed=confirmed,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    filename = f"contacts.{export_format}"
+    media_type = EXPORT_FORMATS[export_format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        export_contacts(rows, export_format, compress=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get(
+    "/autocomplete",
+    response_model=List[ContactSuggestion],
+    name="Autocomplete",
+    dependencies=[
+        Depends(allowed_autocomplete),
+        Depends(RateLimiter(times=20, seconds=5)),
+    ],
+)
+async def autocomplete(
+    q: str = Query(min_length=1, max_length=50),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_contact: Contact = Depends(auth_service.get_current_user),
+):
+    suggestions = await autocomplete_index.suggest(q, limit, db)
+    return Response(
+        content=b"[" + b",".join(suggestions) + b"]", media_type="application/json"
+    )
+
+
+@router.get(
+    "/search",
+    response_model=List[ContactDb],
+    name="Full-text search",
+    dependencies=[
+        Depends(allowed_full_text_search),
+        Depends(RateLimiter(times=2, seconds=5)),
+    ],
+)
+async def full_text_search(
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
     db: Session = Depends(get_db),
     current_contact: Contact = Depends(auth_service.get_current_user),
 ):
-    contacts = await repository_contacts.get_contacts(db)
+    contacts = await repository_contacts.search_contacts(q, db, limit, offset)
     return contacts
 
 
+@router.get(
+    "/duplicates",
+    response_model=DuplicateReport,
+    name="Find duplicates",
+    dependencies=[
+        Depends(allowed_find_duplicates),
+        Depends(RateLimiter(times=2, seconds=5)),
+    ],
+)
+async def find_duplicates_route(
+    min_score: float = Query(0.6, gt=0, le=1),
+    db: Session = Depends(get_db),
+    current_contact: Contact = Depends(auth_service.get_current_user),
+):
+    # Both the table scan and the matching would block the event loop.
+    return await run_in_threadpool(
+        lambda: find_duplicates(repository_contacts.stream_contacts(db), min_score)
+    )
+
+
 @router.get(
     "/{contact_id}",
     response_model=ContactDb,
@@ -76,17 +319,53 @@ async def get_contacts(
     ],
 )
 async def get_contact_by_id(
+    response: Response,
     contact_id: int = Path(1, ge=1),
+    if_none_match: str | None = Header(None),
+    fields: List[str] | None = Depends(sparse_fields),
     db: Session = Depends(get_db),
     current_contact: Contact = Depends(auth_service.get_current_user),
 ):
-    contact = await repository_contacts.get_contact(contact_id, db)
+    contact = await repository_contacts.get_contact(contact_id, db, fields)
     if contact is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-
+    etag = make_etag(contact.version)
+    if is_not_modified(if_none_match, etag):
+        return not_modified(etag)
+    if fields is not None:
+        return fields_response(contact, fields, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     return contact
 
 
+@router.post(
+    "/batch",
+    response_model=BatchContactsResponse,
+    name="Get contacts batch",
+    dependencies=[
+        Depends(allowed_get_contacts_batch),
+        Depends(RateLimiter(times=2, seconds=5)),
+    ],
+)
+async def get_contacts_batch(
+    body: BatchContactsRequest,
+    db: Session = Depends(get_db),
+    current_contact: Contact = Depends(auth_service.get_current_user),
+):
+    contacts = await repository_contacts.get_contacts_batch(body.ids, body.emails, db)
+    by_id = {contact.id: contact for contact in contacts}
+    by_email = {contact.email: contact for contact in contacts}
+    results = [
+        {"id": contact_id, "found": contact_id in by_id, "contact": by_id.get(contact_id)}
+        for contact_id in body.ids
+    ] + [
+        {"email": email, "found": email in by_email, "contact": by_email.get(email)}
+        for email in body.emails
+    ]
+    missing = sum(not result["found"] for result in results)
+    return {"results": results, "missing": missing}
+
+
 @router.put(
     "/update/{contact_id}",
     response_model=ContactDb,
@@ -98,13 +377,24 @@ async def get_contact_by_id(
 )
 async def update_contact(
     body: ContactModel,
+    response: Response,
     contact_id: int = Path(1, ge=1),
+    if_match: str | None = Header(None),
     db: Session = Depends(get_db),
     current_contact: Contact = Depends(auth_service.get_current_user),
 ):
-    contact = await repository_contacts.update_contact(body, contact_id, db)
+    try:
+        contact = await repository_contacts.update_contact(
+            body, contact_id, db, version=parse_if_match(if_match)
+        )
+    except repository_contacts.ContactVersionConflict:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Contact was modified",
+        )
     if contact is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    response.headers["ETag"] = make_etag(contact.version)
     return contact
 
 
@@ -119,13 +409,24 @@ async def update_contact(
 )
 async def change_contact_role(
     body: UpdateContactRoleModel,
+    response: Response,
     contact_id: int = Path(1, ge=1),
+    if_match: str | None = Header(None),
     db: Session = Depends(get_db),
     current_contact: Contact = Depends(auth_service.get_current_user),
 ):
-    contact = await repository_contacts.change_contact_role(body, contact_id, db)
+    try:
+        contact = await repository_contacts.change_contact_role(
+            body, contact_id, db, version=parse_if_match(if_match)
+        )
+    except repository_contacts.ContactVersionConflict:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Contact was modified",
+        )
     if contact is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    response.headers["ETag"] = make_etag(contact.version)
     return contact
 
 
@@ -160,13 +461,19 @@ async def delete_contact(
 )
 async def search_first_name(
     inquiry: str = Path(min_length=1),
+    fields: List[str] | None = Depends(sparse_fields),
     db: Session = Depends(get_db),
     current_contact: Contact = Depends(auth_service.get_current_user),
 ):
-    contacts = await repository_contacts.search_first_name(inquiry, db)
-    if bool(contacts) == False:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-    return contacts
+    inquiry = normalize_inquiry(inquiry)
+    return await cached_search(
+        "search_first_name",
+        inquiry,
+        current_contact,
+        lambda: repository_contacts.search_first_name(inquiry, db, fields),
+        List[ContactDb],
+        fields,
+    )
 
 
 @router.get(
@@ -180,13 +487,19 @@ async def search_first_name(
 )
 async def search_last_name(
     inquiry: str = Path(min_length=1),
+    fields: List[str] | None = Depends(sparse_fields),
     db: Session = Depends(get_db),
     current_contact: Contact = Depends(auth_service.get_current_user),
 ):
-    contacts = await repository_contacts.search_last_name(inquiry, db)
-    if bool(contacts) == False:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-    return contacts
+    inquiry = normalize_inquiry(inquiry)
+    return await cached_search(
+        "search_last_name",
+        inquiry,
+        current_contact,
+        lambda: repository_contacts.search_last_name(inquiry, db, fields),
+        List[ContactDb],
+        fields,
+    )
 
 
 @router.get(
@@ -200,13 +513,19 @@ async def search_last_name(
 )
 async def search_email(
     inquiry: str = Path(min_length=1),
+    fields: List[str] | None = Depends(sparse_fields),
     db: Session = Depends(get_db),
     current_contact: Contact = Depends(auth_service.get_current_user),
 ):
-    contacts = await repository_contacts.search_by_mail(inquiry, db)
-    if bool(contacts) == False:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-    return contacts
+    inquiry = normalize_inquiry(inquiry)
+    return await cached_search(
+        "search_email",
+        inquiry,
+        current_contact,
+        lambda: repository_contacts.search_by_mail(inquiry, db, fields),
+        ContactDb,
+        fields,
+    )
 
 
 @router.get(
@@ -217,19 +536,34 @@ async def search_email(
 )
 async def search(
     inquiry: str = Path(min_length=1),
+    fields: List[str] | None = Depends(sparse_fields),
     db: Session = Depends(get_db),
     current_contact: Contact = Depends(auth_service.get_current_user),
 ):
-    contacts = await repository_contacts.search_by_mail_ilike_method(inquiry, db)
-    if bool(contacts) == False:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-    return contacts
+    inquiry = normalize_inquiry(inquiry, ignore_case=True)
+    return await cached_search(
+        "search",
+        inquiry,
+        current_contact,
+        lambda: repository_contacts.search_by_mail_ilike_method(inquiry, db, fields),
+        List[ContactDb],
+        fields,
+    )
 
 
 @router.get("/me/", response_model=ContactDb)
 async def read_users_me(
+    response: Response,
+    if_none_match: str | None = Header(None),
+    fields: List[str] | None = Depends(sparse_fields),
     current_user: ContactModel = Depends(auth_service.get_current_user),
 ):
+    etag = make_etag(current_user.version)
+    if is_not_modified(if_none_match, etag):
+        return not_modified(etag)
+    if fields is not None:
+        return fields_response(current_user, fields, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     return current_user
 
 
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, root_validator
 from datetime import date, datetime
+from typing import List
 
 
 class ContactModel(BaseModel):
@@ -27,11 +28,104 @@ class ContactDb(BaseModel):
         orm_mode = True
 
 
+class ContactSuggestion(BaseModel):
+    id: int
+    first_name: str
+    last_name: str
+    email: str
+
+
 class ResponseContact(BaseModel):
     contact: ContactDb
     detail: str = "User was created successfully"
 
 
+class BatchContactsRequest(BaseModel):
+    ids: List[int] = Field([], max_items=500)
+    emails: List[str] = Field([], max_items=500)
+
+    @root_validator(skip_on_failure=True)
+    def check_size(cls, values):
+        size = len(values["ids"]) + len(values["emails"])
+        if size == 0:
+            raise ValueError("At least one id or email is required")
+        if size > 500:
+            raise ValueError("No more than 500 ids and emails in total")
+        return values
+
+
+class BatchContactResult(BaseModel):
+    id: int | None = None
+    email: str | None = None
+    found: bool
+    contact: ContactDb | None = None
+
+
+class BatchContactsResponse(BaseModel):
+    results: List[BatchContactResult]
+    missing: int
+
+
+class ImportRowError(BaseModel):
+    row: int
+    email: str | None = None
+    detail: str
+
+
+class ImportReport(BaseModel):
+    received: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
+
+
+class DuplicateCandidate(BaseModel):
+    id: int
+    first_name: str
+    last_name: str
+    email: str | None = None
+    phone: int | None = None
+    confirmed: bool | None = None
+
+    class Config:
+        orm_mode = True
+
+
+class DuplicateCluster(BaseModel):
+    score: float
+    reasons: List[str]
+    contacts: List[DuplicateCandidate]
+    keep: int
+    merge: List[int]
+
+
+class DuplicateReport(BaseModel):
+    contacts_scanned: int
+    candidate_pairs: int
+    clusters: List[DuplicateCluster]
+    elapsed_seconds: float
+
+
+class ContactChange(BaseModel):
+    id: str
+    op: str
+    contact_id: int
+    version: int
+    roles: str | None = None
+    previous_roles: str | None = None
+
+
+class ContactChanges(BaseModel):
+    changes: List[ContactChange]
+    last_id: str
+
+
+class ContactChangesAck(BaseModel):
+    ids: List[str] = Field(max_items=1000)
+
+
 class TokenModel(BaseModel):
     access_token: str
     refresh_token: str
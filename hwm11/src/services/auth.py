@@ -1,25 +1,50 @@
+import asyncio
 import pickle
-from typing import Optional
+import time
+import uuid
+from typing import Optional, Tuple
 
-import redis
 from jose import JWTError, jwt
 from fastapi import HTTPException, status, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 
-from src.database.connect import get_db
+from src.database.connect import get_db, SessionLocal
 from src.repository import contacts as repository_contacts
 from src.conf.config import settings
+from src.services.cache import SingleFlight, get_cache, jittered_ttl
+from src.services.revocation import revocation_list
+
+
+def hash_cost(hashed_password: str) -> int | None:
+    """
+    :return: The cost (log2 rounds) of a bcrypt hash, e.g. 12 for
+        ``$2b$12$...``, or None if it is not a bcrypt hash.
+    :rtype: int | None
+    """
+    try:
+        return int(hashed_password.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
 
 
 class Auth:
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    # Hashes at another cost than bcrypt_rounds "need update" and are redone
+    # on the next successful login.
+    pwd_context = CryptContext(
+        schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds
+    )
     SECRET_KEY = settings.secret_key_jwt
     ALGORITHM = settings.algorithm
+    REFRESH_TOKEN_TTL = timedelta(days=7)
     oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
-    redis_db = redis.Redis(host="localhost", port=6379, db=0)
+    user_loads = SingleFlight()
+    cache_metrics = {"hits": 0, "misses": 0, "stale": 0}
+    password_metrics = {"rehashed": 0, "costs": {}}
+    _refreshes = set()
 
     def verify_password(self, plain_password, hashed_password):
         return self.pwd_context.verify(plain_password, hashed_password)
@@ -27,6 +52,81 @@ class Auth:
     def get_password_hash(self, password: str):
         return self.pwd_context.hash(password)
 
+    async def check_password(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, bool]:
+        """
+        Verifies a password in a worker thread, recording how long it took
+        at the hash's cost.
+
+        :param plain_password: The password given.
+        :type plain_password: str
+        :param hashed_password: The stored hash.
+        :type hashed_password: str
+        :return: Whether the password matches, and whether its hash should be
+            redone at the configured cost.
+        :rtype: Tuple[bool, bool]
+        """
+        start = time.perf_counter()
+        valid = await run_in_threadpool(
+            self.verify_password, plain_password, hashed_password
+        )
+        cost = self.password_metrics["costs"].setdefault(
+            hash_cost(hashed_password), {"verifications": 0, "seconds": 0.0}
+        )
+        cost["verifications"] += 1
+        cost["seconds"] += time.perf_counter() - start
+        return valid, valid and self.pwd_context.needs_update(hashed_password)
+
+    async def rehash_password(
+        self, contact_id: int, plain_password: str, hashed_password: str, db: Session
+    ) -> None:
+        """
+        Hashes a password again at the configured cost and stores it, unless
+        the password changed meanwhile. Meant to run as a background task,
+        after the response and before the request's session is closed.
+
+        :param contact_id: The ID of the contact.
+        :type contact_id: int
+        :param plain_password: The verified password.
+        :type plain_password: str
+        :param hashed_password: The hash being replaced.
+        :type hashed_password: str
+        :param db: The database session.
+        :type db: Session
+        """
+        try:
+            new_hash = await run_in_threadpool(self.get_password_hash, plain_password)
+            if await repository_contacts.update_password_hash(
+                contact_id, hashed_password, new_hash, db
+            ):
+                self.password_metrics["rehashed"] += 1
+        except Exception as e:
+            print(e)
+
+    def password_report(self) -> dict:
+        """
+        :return: The number of rehashed passwords and, per hash cost, the
+            number of verifications and their average latency.
+        :rtype: dict
+        """
+        return {
+            "rounds": settings.bcrypt_rounds,
+            "rehashed": self.password_metrics["rehashed"],
+            "costs": {
+                str(cost): {
+                    "verifications": stats["verifications"],
+                    "average_ms": round(
+                        stats["seconds"] / stats["verifications"] * 1000, 1
+                    ),
+                }
+                for cost, stats in sorted(
+                    self.password_metrics["costs"].items(),
+                    key=lambda item: item[0] or 0,
+                )
+            },
+        }
+
     async def create_access_token(
         self, data: dict, expires_delta: Optional[float] = None
     ):
@@ -36,7 +136,12 @@ class Auth:
         else:
             expire = datetime.utcnow() + timedelta(minutes=10)
         to_encode.update(
-            {"iat": datetime.utcnow(), "exp": expire, "scope": "access_token"}
+            {
+                "iat": datetime.utcnow(),
+                "exp": expire,
+                "scope": "access_token",
+                "jti": uuid.uuid4().hex,
+            }
         )
         encoded_access_token = jwt.encode(
             to_encode, self.SECRET_KEY, algorithm=self.ALGORITHM
@@ -50,7 +155,7 @@ class Auth:
         if expires_delta:
             expire = datetime.utcnow() + timedelta(seconds=expires_delta)
         else:
-            expire = datetime.utcnow() + timedelta(days=7)
+            expire = datetime.utcnow() + self.REFRESH_TOKEN_TTL
         to_encode.update(
             {"iat": datetime.utcnow(), "exp": expire, "scope": "refresh_token"}
         )
@@ -65,8 +170,7 @@ class Auth:
                 refresh_token, self.SECRET_KEY, algorithms=[self.ALGORITHM]
             )
             if payload["scope"] == "refresh_token":
-                email = payload["sub"]
-                return email
+                return payload
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid scope for token",
@@ -95,22 +199,86 @@ class Auth:
                 raise credentials_exception
         except JWTError as e:
             raise credentials_exception
+        if "jti" in payload and await revocation_list.is_revoked(payload["jti"]):
+            raise credentials_exception
 
-        user = self.redis_db.get(f"user:{email}")
-        if user is None:
+        key = f"user:{email}"
+        entry = await get_cache().get(key)
+        if entry is None:
             print("GET USER FROM POSTGRES")
             # GET USER FROM POSTGRES
-            user = await repository_contacts.search_by_mail(email, db)
-            if user is None:
+            self.cache_metrics["misses"] += 1
+            # Requests joining the load share its bytes, not the loading
+            # request's ORM object, and each unpickle a user of their own.
+            entry = await self.user_loads.do(key, lambda: self._load_user(email, db))
+            if entry is None:
                 raise credentials_exception
-            self.redis_db.set(f"user:{email}", pickle.dumps(user))
-            self.redis_db.expire(f"user:{email}", 900)
-        else:
-            print("GET USER FROM CASH")
-            # GET USER FROM CASH
-            user = pickle.loads(user)
+            _, user = pickle.loads(entry)
+            return user
+
+        print("GET USER FROM CASH")
+        # GET USER FROM CASH
+        self.cache_metrics["hits"] += 1
+        cached = pickle.loads(entry)
+        fresh_until, user = cached if isinstance(cached, tuple) else (0, cached)
+        if fresh_until < time.time():
+            # Serve the stale user and refresh it in the background.
+            self.cache_metrics["stale"] += 1
+            if not self.user_loads.in_flight(key):
+                task = asyncio.create_task(
+                    self.user_loads.do(key, lambda: self._load_user(email, None))
+                )
+                self._refreshes.add(task)
+                task.add_done_callback(self._refreshes.discard)
         return user
 
+    async def _load_user(self, email: str, db: Session | None):
+        """
+        Loads a user from the database in a worker thread and caches it.
+
+        :param email: The user's e-mail.
+        :type email: str
+        :param db: The session to query with; if None (background refreshes,
+            which outlive the request) a new session is used.
+        :type db: Session | None
+        :return: The cache entry, ``(fresh_until, user)`` pickled, or None if
+            the user doesn't exist.
+        :rtype: bytes | None
+        """
+        ttl = jittered_ttl(settings.user_cache_ttl, settings.user_cache_jitter)
+
+        def load():
+            if db is not None:
+                user = repository_contacts.find_by_mail(email, db)
+            else:
+                with SessionLocal() as session:
+                    user = repository_contacts.find_by_mail(email, session)
+            return pickle.dumps((time.time() + ttl, user)) if user is not None else None
+
+        entry = await run_in_threadpool(load)
+        if entry is not None:
+            await get_cache().set(
+                f"user:{email}", entry, ex=ttl + settings.user_cache_stale_ttl
+            )
+        return entry
+
+    async def decode_access_token(self, token: str):
+        credentials_exception = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+        )
+        try:
+            payload = jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
+        except JWTError:
+            raise credentials_exception
+        if payload.get("scope") != "access_token":
+            raise credentials_exception
+        return payload
+
+    async def revoke_access_token(self, payload: dict):
+        if "jti" in payload:
+            await revocation_list.revoke(payload["jti"], payload["exp"])
+
     def create_email_token(self, data: dict):
         to_encode = data.copy()
         expire = datetime.utcnow() + timedelta(days=7)
@@ -132,3 +300,17 @@ class Auth:
 
 
 auth_service = Auth()
+
+
+def hash_password(password: str) -> str:
+    """
+    Hashes a password with the ``Auth`` context.
+
+    A module level function, so it can be shipped to worker processes.
+
+    :param password: The plain password.
+    :type password: str
+    :return: The password hash.
+    :rtype: str
+    """
+    return Auth.pwd_context.hash(password)
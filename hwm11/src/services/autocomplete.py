@@ -0,0 +1,255 @@
+import json
+import unicodedata
+import uuid
+from typing import List, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from src.conf.config import settings
+from src.repository import contacts as repository_contacts
+from src.services.cache import CacheBackend, SingleFlight, get_cache
+from src.services.events import ContactEvent, subscribe
+
+
+def normalize_term(term: str) -> str:
+    """
+    :return: The term in the form it is indexed and looked up in.
+    :rtype: str
+    """
+    return unicodedata.normalize("NFC", term).lower()
+
+
+def render_suggestion(contact) -> bytes:
+    """
+    :return: The JSON document suggested for a contact.
+    :rtype: bytes
+    """
+    return json.dumps(
+        {
+            "id": contact.id,
+            "first_name": contact.first_name,
+            "last_name": contact.last_name,
+            "email": contact.email,
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode()
+
+
+def suggestion_members(document: bytes) -> List[bytes]:
+    """
+    :return: The index members of a suggestion, one per searchable term.
+    :rtype: List[bytes]
+    """
+    suggestion = json.loads(document)
+    terms = {
+        normalize_term(suggestion[field] or "")
+        for field in ("first_name", "last_name", "email")
+    }
+    return [term.encode() + b"\x00" + document for term in terms if term]
+
+
+class AutocompleteIndex:
+    """
+    Prefix index over contacts' first names, last names and e-mails.
+
+    Each build of the index gets its own version. ``autocomplete:<version>``
+    is a sorted set whose members are ``<term>\\0<suggestion>``, all with
+    score 0, so the contacts with a term starting with a prefix are one
+    ``ZRANGEBYLEX`` range. ``autocomplete:<version>:contacts`` holds
+    ``<id>\\0<suggestion>`` for each contact, which is how a change finds the
+    members to replace.
+
+    A build writes a new version while the current one keeps serving and
+    being patched, then makes it current. Contacts changed while a build
+    runs are recorded in ``autocomplete:<version>:dirty`` and read again
+    once the build is current. A build is fresh for ``ttl`` seconds; the
+    first request after that rebuilds the index, correcting whatever a
+    change could still have missed.
+
+    :param ttl: Seconds a build stays fresh.
+    :type ttl: int
+    """
+
+    current_key = "autocomplete:current"
+    fresh_key = "autocomplete:fresh"
+    building_key = "autocomplete:building"
+    batch_size = 1000
+
+    def __init__(self, ttl: int = 86400, cache: CacheBackend | None = None):
+        self._cache = cache
+        self.ttl = ttl
+        self.builds = SingleFlight()
+        self.metrics = {"builds": 0, "patches": 0}
+
+    @property
+    def cache(self) -> CacheBackend:
+        return self._cache or get_cache()
+
+    async def build(self, db: Session) -> int:
+        """
+        Indexes every contact into a new version and makes it current.
+
+        :param db: The database session.
+        :type db: Session
+        :return: The number of contacts indexed.
+        :rtype: int
+        """
+        version = uuid.uuid4().hex
+        key = f"autocomplete:{version}"
+        await self.cache.set(self.building_key, version.encode(), ex=self.ttl)
+
+        def load() -> List[Tuple[int, bytes]]:
+            return [
+                (contact.id, render_suggestion(contact))
+                for contact in repository_contacts.stream_contacts(db)
+            ]
+
+        # The scan and the serialization stay off the event loop.
+        documents = await run_in_threadpool(load)
+        for start in range(0, len(documents), self.batch_size):
+            members, entries = {}, {}
+            for contact_id, document in documents[start : start + self.batch_size]:
+                entries[b"%d\x00%s" % (contact_id, document)] = 0
+                members.update(dict.fromkeys(suggestion_members(document), 0))
+            await self.cache.zadd(key, members)
+            await self.cache.zadd(f"{key}:contacts", entries)
+
+        previous = await self.cache.get(self.current_key)
+        await self.cache.set(self.current_key, version.encode())
+        await self.cache.set(self.fresh_key, b"1", ex=self.ttl)
+        await self.cache.delete(self.building_key)
+        if previous is not None and previous.decode() != version:
+            old_key = f"autocomplete:{previous.decode()}"
+            await self.cache.delete(old_key, f"{old_key}:contacts", f"{old_key}:dirty")
+        await self.refresh_dirty(version, db)
+        self.metrics["builds"] += 1
+        return len(documents)
+
+    async def refresh_dirty(self, version: str, db: Session) -> None:
+        """
+        Reads the contacts changed during the build of ``version`` again.
+
+        :param version: The version built.
+        :type version: str
+        :param db: The database session.
+        :type db: Session
+        """
+        dirty_key = f"autocomplete:{version}:dirty"
+        ids = [
+            int(member)
+            for member in await self.cache.zrangebyscore(
+                dirty_key, float("-inf"), float("inf")
+            )
+        ]
+        await self.cache.delete(dirty_key)
+        if not ids:
+            return
+        found = {
+            contact.id: contact
+            for contact in await repository_contacts.get_contacts_batch(ids, [], db)
+        }
+        for contact_id in ids:
+            contact = found.get(contact_id)
+            await self.replace(
+                version,
+                contact_id,
+                render_suggestion(contact) if contact is not None else None,
+            )
+
+    async def replace(
+        self, version: str, contact_id: int, document: bytes | None
+    ) -> None:
+        """
+        Replaces the suggestion of a contact in a version of the index.
+
+        :param version: The version.
+        :type version: str
+        :param contact_id: The contact's ID.
+        :type contact_id: int
+        :param document: The new suggestion, or None to remove the contact.
+        :type document: bytes | None
+        """
+        key = f"autocomplete:{version}"
+        prefix = b"%d\x00" % contact_id
+        for entry in await self.cache.zrangebylex(
+            f"{key}:contacts", b"[" + prefix, b"[" + prefix + b"\xff"
+        ):
+            await self.cache.zrem(key, *suggestion_members(entry[len(prefix) :]))
+            await self.cache.zrem(f"{key}:contacts", entry)
+        if document is not None:
+            await self.cache.zadd(key, dict.fromkeys(suggestion_members(document), 0))
+            await self.cache.zadd(f"{key}:contacts", {prefix + document: 0})
+
+    async def patch(self, events: List[ContactEvent]) -> None:
+        """
+        Replaces the suggestions of changed contacts.
+
+        :param events: The changes.
+        :type events: List[ContactEvent]
+        """
+        events = [
+            event
+            for event in events
+            if event.op
+            in (ContactEvent.CREATE, ContactEvent.UPDATE, ContactEvent.DELETE)
+        ]
+        if not events:
+            return
+        building = await self.cache.get(self.building_key)
+        if building is not None:
+            await self.cache.zadd(
+                f"autocomplete:{building.decode()}:dirty",
+                {str(event.contact.id).encode(): 0 for event in events},
+            )
+        current = await self.cache.get(self.current_key)
+        if current is None:
+            return
+        for event in events:
+            await self.replace(
+                current.decode(),
+                event.contact.id,
+                None
+                if event.op == ContactEvent.DELETE
+                else render_suggestion(event.contact),
+            )
+            self.metrics["patches"] += 1
+
+    async def suggest(self, prefix: str, limit: int, db: Session) -> List[bytes]:
+        """
+        Finds contacts with a name or e-mail starting with ``prefix``,
+        building the index first if it is missing.
+
+        :param prefix: What the user typed so far.
+        :type prefix: str
+        :param limit: The maximum number of contacts.
+        :type limit: int
+        :param db: The database session.
+        :type db: Session
+        :return: Suggestions in order of the matching term.
+        :rtype: List[bytes]
+        """
+        current = await self.cache.get(self.current_key)
+        if current is None or not await self.cache.exists(self.fresh_key):
+            await self.builds.do("autocomplete", lambda: self.build(db))
+            current = await self.cache.get(self.current_key)
+        if current is None:
+            return []
+        term = normalize_term(prefix).encode()
+        # A contact matches with at most three terms.
+        members = await self.cache.zrangebylex(
+            f"autocomplete:{current.decode()}",
+            b"[" + term,
+            b"[" + term + b"\xff",
+            0,
+            limit * 3,
+        )
+        suggestions = dict.fromkeys(member.split(b"\x00", 1)[1] for member in members)
+        return list(suggestions)[:limit]
+
+
+autocomplete_index = AutocompleteIndex(
+    ttl=settings.autocomplete_rebuild_interval
+)
+subscribe(autocomplete_index.patch)
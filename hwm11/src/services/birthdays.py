@@ -0,0 +1,187 @@
+import json
+import uuid
+from datetime import date, timedelta
+from typing import List, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from src.database.models import ContactExportRow
+from src.repository import contacts as repository_contacts
+from src.schemas import ContactDb
+from src.services.cache import CacheBackend, SingleFlight, get_cache
+from src.services.events import ContactEvent, subscribe
+
+
+def day_score(day: date) -> int:
+    """
+    Scores a date by its month and day, e.g. 1231 for December 31st.
+
+    :param day: The date.
+    :type day: date
+    :return: The score.
+    :rtype: int
+    """
+    return day.month * 100 + day.day
+
+
+def render_contact(contact) -> bytes:
+    """
+    Serializes a contact the way the ``ContactDb`` response model does.
+
+    :param contact: The contact.
+    :return: The JSON document.
+    :rtype: bytes
+    """
+    return json.dumps(
+        jsonable_encoder(ContactDb.from_orm(contact)),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode()
+
+
+class UpcomingBirthdays:
+    """
+    Contacts by birthday, materialized in the cache backend.
+
+    Every contact with a birthday is a member of one sorted set, scored by
+    ``day_score`` of the birthday, so the contacts celebrating in the next
+    days are one range of scores (two around New Year). Members are the
+    serialized contacts, and the response is just those members joined.
+
+    The set is built once a day, on the first request, and patched from
+    contact events in between; a hash next to it maps contact IDs to their
+    members, which is how a patch finds the member to replace. Each build,
+    including a rebuild on the same day, goes to new keys
+    (``birthdays:<day>:<uuid>``) and only then becomes current, so readers
+    keep the previous set meanwhile. A patch racing a build can at worst be
+    lost until the next build.
+
+    :param days: How many days ahead are upcoming.
+    :type days: int
+    """
+
+    current_key = "birthdays:current"
+    batch_size = 1000
+
+    def __init__(self, days: int = 7, cache: CacheBackend | None = None):
+        self._cache = cache
+        self.days = days
+        self.builds = SingleFlight()
+        self.metrics = {"builds": 0, "patches": 0}
+
+    @property
+    def cache(self) -> CacheBackend:
+        return self._cache or get_cache()
+
+    def windows(self, today: date) -> List[Tuple[int, int]]:
+        """
+        Score ranges of the upcoming days, in calendar order.
+
+        :param today: The first upcoming day.
+        :type today: date
+        :return: One ``(min, max)`` range, or two if the days span New Year.
+        :rtype: List[Tuple[int, int]]
+        """
+        end = today + timedelta(days=self.days)
+        if end.year == today.year:
+            return [(day_score(today), day_score(end))]
+        return [(day_score(today), 1231), (101, day_score(end))]
+
+    async def build(self, db: Session, today: date | None = None) -> int:
+        """
+        Materializes the set from the database and makes it current.
+
+        :param db: The database session.
+        :type db: Session
+        :param today: The day the build is for.
+        :type today: date | None
+        :return: The number of contacts with a birthday.
+        :rtype: int
+        """
+        version = f"{(today or date.today()).isoformat()}:{uuid.uuid4().hex}"
+        key = f"birthdays:{version}"
+
+        def load() -> List[Tuple[str, bytes, int]]:
+            return [
+                (str(contact.id), render_contact(contact), day_score(contact.birthday))
+                for contact in repository_contacts.stream_contacts(db)
+                if contact.birthday is not None
+            ]
+
+        # The scan and the serialization stay off the event loop.
+        rows = await run_in_threadpool(load)
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start : start + self.batch_size]
+            await self.cache.zadd(key, {member: score for _, member, score in batch})
+            await self.cache.hset(
+                f"{key}:members",
+                {contact_id: member for contact_id, member, _ in batch},
+            )
+        count = len(rows)
+
+        previous = await self.cache.get(self.current_key)
+        await self.cache.set(self.current_key, version.encode())
+        if previous is not None and previous.decode() != version:
+            old_key = f"birthdays:{previous.decode()}"
+            await self.cache.delete(old_key, f"{old_key}:members")
+        self.metrics["builds"] += 1
+        return count
+
+    async def patch(self, events: List[ContactEvent]) -> None:
+        """
+        Applies contact changes to the current set.
+
+        Only changes visible in ``ContactDb`` matter; without a current set
+        there is nothing to patch, the next request builds one.
+
+        :param events: The changes.
+        :type events: List[ContactEvent]
+        """
+        version = await self.cache.get(self.current_key)
+        if version is None:
+            return
+        key = f"birthdays:{version.decode()}"
+        for event in events:
+            if event.op in (ContactEvent.ROLE, ContactEvent.CONFIRM):
+                continue
+            contact: ContactExportRow = event.contact
+            contact_id = str(contact.id)
+            previous = await self.cache.hget(f"{key}:members", contact_id)
+            if previous is not None:
+                await self.cache.zrem(key, previous)
+            if event.op == ContactEvent.DELETE or contact.birthday is None:
+                await self.cache.hdel(f"{key}:members", contact_id)
+                continue
+            member = render_contact(contact)
+            await self.cache.zadd(key, {member: day_score(contact.birthday)})
+            await self.cache.hset(f"{key}:members", {contact_id: member})
+            self.metrics["patches"] += 1
+
+    async def upcoming(self, db: Session) -> List[bytes]:
+        """
+        Returns the contacts with a birthday today or in the next days,
+        building today's set first if needed.
+
+        :param db: The database session.
+        :type db: Session
+        :return: Serialized contacts in birthday order.
+        :rtype: List[bytes]
+        """
+        today = date.today()
+        version = await self.cache.get(self.current_key)
+        if version is None or not version.decode().startswith(f"{today}:"):
+            await self.builds.do("birthdays", lambda: self.build(db, today))
+            version = await self.cache.get(self.current_key)
+        if version is None:
+            return []
+        key = f"birthdays:{version.decode()}"
+        members = []
+        for low, high in self.windows(today):
+            members += await self.cache.zrangebyscore(key, low, high)
+        return members
+
+
+upcoming_birthdays = UpcomingBirthdays(days=7)
+subscribe(upcoming_birthdays.patch)
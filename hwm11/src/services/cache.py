@@ -0,0 +1,860 @@
+import abc
+import asyncio
+import bisect
+import math
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from redis.exceptions import ConnectionError, ResponseError
+
+from src.conf.config import settings
+from src.database.redis_pool import get_blocking_redis, get_redis
+
+
+class NoSuchGroup(Exception):
+    """
+    Raised when reading a stream through a consumer group that doesn't exist.
+    """
+
+
+class StreamReadersBusy(Exception):
+    """
+    Raised when a blocking stream read finds every connection reserved for
+    blocking reads taken.
+    """
+
+
+def jittered_ttl(ttl: int, jitter: float) -> int:
+    """
+    Spreads a TTL by up to ``jitter`` in both directions, so keys written
+    together don't all expire together.
+
+    :param ttl: The base TTL in seconds.
+    :type ttl: int
+    :param jitter: Relative spread, e.g. 0.1 for +-10%.
+    :type jitter: float
+    :return: The jittered TTL, at least one second.
+    :rtype: int
+    """
+    return max(1, round(ttl * random.uniform(1 - jitter, 1 + jitter)))
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent loads of the same key.
+
+    The first caller for a key starts the loader in a task of its own;
+    callers arriving while it is in flight await the same task instead of
+    running the loader again. Each caller awaits it through a shield, so a
+    cancelled caller, e.g. a client that disconnected, stops waiting without
+    failing the load for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.metrics = {"loads": 0, "coalesced": 0}
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._calls
+
+    async def do(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs ``loader`` for ``key`` unless a load of ``key`` is in flight.
+
+        :param key: The key being loaded.
+        :type key: str
+        :param loader: Coroutine function producing the value.
+        :type loader: Callable[[], Awaitable[Any]]
+        :return: The loaded value.
+        """
+        call = self._calls.get(key)
+        if call is not None:
+            self.metrics["coalesced"] += 1
+        else:
+            call = asyncio.create_task(loader())
+            self._calls[key] = call
+            call.add_done_callback(lambda done: self._finish(key, done))
+            self.metrics["loads"] += 1
+        return await asyncio.shield(call)
+
+    def _finish(self, key: str, call: asyncio.Task) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Mark the exception as retrieved when every caller was cancelled.
+        if not call.cancelled():
+            call.exception()
+
+
+def _stream_id(entry_id: str) -> Tuple[int, int]:
+    milliseconds, _, sequence = entry_id.partition("-")
+    return int(milliseconds), int(sequence or 0)
+
+
+class CacheBackend(abc.ABC):
+    """
+    Key-value cache used for auth caching, rate limiting and response caching.
+
+    Values are bytes. Sorted sets map ``bytes`` members to float scores.
+    Streams are append-only logs of small ``str`` mappings identified by Redis
+    style ``<milliseconds>-<sequence>`` IDs.
+    """
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        ...
+
+    @abc.abstractmethod
+    async def set(
+        self, key: str, value: bytes, ex: int | None = None, nx: bool = False
+    ) -> bool:
+        """
+        Stores a value.
+
+        :param key: The key.
+        :type key: str
+        :param value: The value.
+        :type value: bytes
+        :param ex: Expiry in seconds, if any.
+        :type ex: int | None
+        :param nx: Only store the value if the key doesn't exist.
+        :type nx: bool
+        :return: True if the value was stored.
+        :rtype: bool
+        """
+        ...
+
+    @abc.abstractmethod
+    async def delete(self, *keys: str) -> int:
+        ...
+
+    @abc.abstractmethod
+    async def exists(self, key: str) -> bool:
+        ...
+
+    @abc.abstractmethod
+    async def mget(self, *keys: str) -> List[bytes | None]:
+        ...
+
+    @abc.abstractmethod
+    async def incr(self, key: str, ex: int | None = None, amount: int = 1) -> int:
+        """
+        Increments a counter, creating it with expiry ``ex`` if it is missing.
+
+        :param key: The counter key.
+        :type key: str
+        :param ex: Expiry in seconds applied when the counter is created.
+        :type ex: int | None
+        :param amount: The increment, negative to decrement.
+        :type amount: int
+        :return: The new value of the counter.
+        :rtype: int
+        """
+        ...
+
+    @abc.abstractmethod
+    async def ttl(self, key: str) -> int:
+        """
+        :return: Seconds until the key expires, -1 if it doesn't expire and -2
+            if it doesn't exist.
+        :rtype: int
+        """
+        ...
+
+    @abc.abstractmethod
+    async def hset(self, key: str, mapping: Dict[str, bytes]) -> int:
+        """
+        Sets fields of a hash.
+
+        :return: The number of new fields.
+        :rtype: int
+        """
+        ...
+
+    @abc.abstractmethod
+    async def hget(self, key: str, field: str) -> bytes | None:
+        ...
+
+    @abc.abstractmethod
+    async def hdel(self, key: str, *fields: str) -> int:
+        ...
+
+    @abc.abstractmethod
+    async def zadd(self, key: str, mapping: Dict[bytes, float]) -> int:
+        """
+        Adds members to a sorted set, updating the scores of existing ones.
+
+        :return: The number of new members.
+        :rtype: int
+        """
+        ...
+
+    @abc.abstractmethod
+    async def zrem(self, key: str, *members: bytes) -> int:
+        ...
+
+    @abc.abstractmethod
+    async def zrangebyscore(self, key: str, min: float, max: float) -> List[bytes]:
+        """
+        Returns the members scored between ``min`` and ``max`` inclusive,
+        ordered by score and then by member.
+        """
+        ...
+
+    @abc.abstractmethod
+    async def zrangebylex(
+        self, key: str, min: bytes, max: bytes, start: int = 0, num: int | None = None
+    ) -> List[bytes]:
+        """
+        Returns up to ``num`` members between ``min`` and ``max`` of a sorted
+        set whose members all have the same score, skipping ``start``.
+
+        Bounds follow Redis: ``[`` includes the member after it, ``(``
+        excludes it, and ``-`` and ``+`` are the ends of the set.
+        """
+        ...
+
+    @abc.abstractmethod
+    async def xadd(
+        self,
+        stream: str,
+        fields: Dict[str, str],
+        maxlen: int | None = None,
+        minid: int | None = None,
+    ) -> str:
+        """
+        Appends an entry to a stream, trimming it to ``maxlen`` entries or to
+        entries newer than ``minid`` milliseconds.
+
+        :return: The ID of the new entry.
+        :rtype: str
+        """
+        ...
+
+    @abc.abstractmethod
+    async def xadd_many(
+        self, stream: str, entries: List[Dict[str, str]], maxlen: int | None = None
+    ) -> List[str]:
+        """
+        Appends entries to a stream in one round trip, trimming it to
+        ``maxlen`` entries.
+
+        :return: The IDs of the new entries.
+        :rtype: List[str]
+        """
+        ...
+
+    @abc.abstractmethod
+    async def xrange(
+        self, stream: str, start: str = "-", count: int | None = None
+    ) -> List[Tuple[str, Dict[str, str]]]:
+        """
+        Returns stream entries with IDs from ``start`` on.
+        """
+        ...
+
+    @abc.abstractmethod
+    async def xread(
+        self, stream: str, last_id: str, block: int | None = None, count: int | None = None
+    ) -> List[Tuple[str, Dict[str, str]]]:
+        """
+        Returns stream entries after ``last_id``, waiting up to ``block``
+        milliseconds for new ones.
+        """
+        ...
+
+    @abc.abstractmethod
+    async def xgroup_create(self, stream: str, group: str, start: str = "$") -> bool:
+        """
+        Creates a consumer group reading the stream after ``start``: ``$`` for
+        new entries only, ``0`` for every retained entry. Creates the stream
+        if needed.
+
+        :return: False if the group already exists.
+        :rtype: bool
+        """
+        ...
+
+    @abc.abstractmethod
+    async def xreadgroup(
+        self,
+        stream: str,
+        group: str,
+        consumer: str,
+        count: int | None = None,
+        block: int | None = None,
+        pending: bool = False,
+    ) -> List[Tuple[str, Dict[str, str]]]:
+        """
+        Returns entries not yet delivered to the group, waiting up to
+        ``block`` milliseconds for new ones. They stay pending for
+        ``consumer`` until acknowledged; with ``pending`` the consumer's
+        pending entries are returned again instead.
+
+        :raises NoSuchGroup: If the group doesn't exist.
+        """
+        ...
+
+    @abc.abstractmethod
+    async def xack(self, stream: str, group: str, *entry_ids: str) -> int:
+        """
+        Acknowledges entries delivered to the group.
+
+        :return: The number of entries which were pending.
+        :rtype: int
+        """
+        ...
+
+
+def _decode_entries(entries) -> List[Tuple[str, Dict[str, str]]]:
+    return [
+        (
+            entry_id.decode(),
+            {key.decode(): value.decode() for key, value in fields.items()},
+        )
+        for entry_id, fields in entries
+        # Pending entries trimmed from the stream come back without fields.
+        if fields
+    ]
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    ``CacheBackend`` on the shared async Redis client.
+    """
+
+    @property
+    def client(self):
+        return get_redis()
+
+    async def get(self, key):
+        return await self.client.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        return bool(await self.client.set(key, value, ex=ex, nx=nx))
+
+    async def delete(self, *keys):
+        return await self.client.delete(*keys) if keys else 0
+
+    async def exists(self, key):
+        return bool(await self.client.exists(key))
+
+    async def mget(self, *keys):
+        return await self.client.mget(keys) if keys else []
+
+    async def incr(self, key, ex=None, amount=1):
+        async with self.client.pipeline(transaction=True) as pipe:
+            if ex is not None:
+                pipe.set(key, 0, ex=ex, nx=True)
+            pipe.incrby(key, amount)
+            result = await pipe.execute()
+        return result[-1]
+
+    async def ttl(self, key):
+        return await self.client.ttl(key)
+
+    async def hset(self, key, mapping):
+        return await self.client.hset(key, mapping=mapping) if mapping else 0
+
+    async def hget(self, key, field):
+        return await self.client.hget(key, field)
+
+    async def hdel(self, key, *fields):
+        return await self.client.hdel(key, *fields) if fields else 0
+
+    async def zadd(self, key, mapping):
+        return await self.client.zadd(key, mapping) if mapping else 0
+
+    async def zrem(self, key, *members):
+        return await self.client.zrem(key, *members) if members else 0
+
+    async def zrangebyscore(self, key, min, max):
+        return await self.client.zrangebyscore(key, min, max)
+
+    async def zrangebylex(self, key, min, max, start=0, num=None):
+        if num is None:
+            return await self.client.zrangebylex(key, min, max)
+        return await self.client.zrangebylex(key, min, max, start, num)
+
+    async def xadd(self, stream, fields, maxlen=None, minid=None):
+        entry_id = await self.client.xadd(
+            stream, fields, maxlen=maxlen, minid=minid, approximate=True
+        )
+        return entry_id.decode()
+
+    async def xadd_many(self, stream, entries, maxlen=None):
+        async with self.client.pipeline(transaction=False) as pipe:
+            for fields in entries:
+                pipe.xadd(stream, fields, maxlen=maxlen, approximate=True)
+            return [entry_id.decode() for entry_id in await pipe.execute()]
+
+    async def xrange(self, stream, start="-", count=None):
+        return _decode_entries(
+            await self.client.xrange(stream, min=start, max="+", count=count)
+        )
+
+    def reader(self, block: int | None):
+        """
+        :return: The client for a stream read; blocking reads, which hold
+            their connection while they wait, get their own pool.
+        """
+        return get_blocking_redis() if block else self.client
+
+    async def xread(self, stream, last_id, block=None, count=None):
+        try:
+            response = await self.reader(block).xread(
+                {stream: last_id}, count=count, block=block
+            )
+        except ConnectionError as e:
+            if block and _no_connection(e):
+                raise StreamReadersBusy() from e
+            raise
+        return _decode_entries(response[0][1]) if response else []
+
+    async def xgroup_create(self, stream, group, start="$"):
+        try:
+            await self.client.xgroup_create(stream, group, id=start, mkstream=True)
+        except ResponseError as e:
+            if str(e).startswith("BUSYGROUP"):
+                return False
+            raise
+        return True
+
+    async def xreadgroup(
+        self, stream, group, consumer, count=None, block=None, pending=False
+    ):
+        block = None if pending else block
+        try:
+            response = await self.reader(block).xreadgroup(
+                group,
+                consumer,
+                {stream: "0" if pending else ">"},
+                count=count,
+                block=block,
+            )
+        except ResponseError as e:
+            if str(e).startswith("NOGROUP"):
+                raise NoSuchGroup(group) from e
+            raise
+        except ConnectionError as e:
+            if block and _no_connection(e):
+                raise StreamReadersBusy() from e
+            raise
+        return _decode_entries(response[0][1]) if response else []
+
+    async def xack(self, stream, group, *entry_ids):
+        return await self.client.xack(stream, group, *entry_ids) if entry_ids else 0
+
+
+def _no_connection(error: ConnectionError) -> bool:
+    # How the blocking pool reports that none of its connections came free.
+    return str(error) == "No connection available."
+
+
+class SortedSet:
+    """
+    In-process sorted set: a member to score mapping plus a list of
+    ``(score, member)`` pairs kept in order, so range reads are bisections.
+    """
+
+    def __init__(self):
+        self.scores: Dict[bytes, float] = {}
+        self.items: List[Tuple[float, bytes]] = []
+
+    def __len__(self):
+        return len(self.scores)
+
+    def add(self, mapping: Dict[bytes, float]) -> int:
+        added = sum(member not in self.scores for member in mapping)
+        if len(mapping) > 64:
+            self.scores.update(mapping)
+            self.items = sorted(
+                (score, member) for member, score in self.scores.items()
+            )
+            return added
+        for member, score in mapping.items():
+            if member in self.scores:
+                self._discard(member)
+            self.scores[member] = score
+            bisect.insort(self.items, (score, member))
+        return added
+
+    def _discard(self, member: bytes) -> None:
+        score = self.scores.pop(member)
+        del self.items[bisect.bisect_left(self.items, (score, member))]
+
+    def remove(self, members) -> int:
+        removed = 0
+        for member in members:
+            if member in self.scores:
+                self._discard(member)
+                removed += 1
+        return removed
+
+    def range_by_score(self, lower: float, upper: float) -> List[bytes]:
+        low = bisect.bisect_left(self.items, lower, key=lambda item: item[0])
+        high = bisect.bisect_right(self.items, upper, key=lambda item: item[0])
+        return [member for _, member in self.items[low:high]]
+
+    def _lex_index(self, bound: bytes, upper: bool) -> int:
+        if bound == b"-":
+            return 0
+        if bound == b"+":
+            return len(self.items)
+        inclusive, value = bound[:1] == b"[", bound[1:]
+        find = bisect.bisect_right if inclusive == upper else bisect.bisect_left
+        return find(self.items, value, key=lambda item: item[1])
+
+    def range_by_lex(
+        self, lower: bytes, upper: bytes, start: int = 0, num: int | None = None
+    ) -> List[bytes]:
+        low = self._lex_index(lower, upper=False) + start
+        high = self._lex_index(upper, upper=True)
+        if num is not None:
+            high = min(high, low + num)
+        return [member for _, member in self.items[low:high]]
+
+
+# Keys the app can recompute or do without. Every other key (revocations,
+# counters, locks, materialized sets) is state and is never evicted.
+EVICTABLE_PREFIXES = ("user:", "response:", "rate:")
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process ``CacheBackend`` with per-key TTLs.
+
+    Keys starting with one of ``evictable_prefixes`` are cache entries, kept
+    in an LRU of ``max_entries`` keys. Other keys are app state, which an
+    eviction would silently lose (a revoked token working again), so they are
+    kept until they expire or are deleted.
+
+    Meant for single-node deployments and tests: nothing is shared between
+    processes.
+
+    :param max_entries: Number of cache entries kept before the least
+        recently used ones are evicted.
+    :type max_entries: int
+    :param evictable_prefixes: Prefixes of the keys which may be evicted.
+    :type evictable_prefixes: Tuple[str, ...]
+    """
+
+    # Expired state keys nobody reads again are swept every so many writes.
+    sweep_every = 1000
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        evictable_prefixes: Tuple[str, ...] = EVICTABLE_PREFIXES,
+    ):
+        self.max_entries = max_entries
+        self.evictable_prefixes = evictable_prefixes
+        self._data: OrderedDict[str, Tuple[Any, float | None]] = OrderedDict()
+        self._state: Dict[str, Tuple[Any, float | None]] = {}
+        self._state_writes = 0
+        self._streams: Dict[str, List[Tuple[str, Dict[str, str]]]] = {}
+        self._last_stream_id = (0, 0)
+        self._groups: Dict[Tuple[str, str], dict] = {}
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._state.clear()
+        self._streams.clear()
+        self._groups.clear()
+
+    def _table(self, key) -> Dict[str, Tuple[Any, float | None]]:
+        return self._data if key.startswith(self.evictable_prefixes) else self._state
+
+    def _lookup(self, key):
+        table = self._table(key)
+        item = table.get(key)
+        if item is None:
+            return None
+        if item[1] is not None and item[1] <= time.monotonic():
+            del table[key]
+            return None
+        if table is self._data:
+            self._data.move_to_end(key)
+        return item
+
+    def _store(self, key, value, ex=None, expires_at=None):
+        if ex is not None:
+            expires_at = time.monotonic() + ex
+        table = self._table(key)
+        table[key] = (value, expires_at)
+        if table is self._data:
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            return
+        self._state_writes += 1
+        if self._state_writes % self.sweep_every == 0:
+            now = time.monotonic()
+            for expired in [
+                k for k, (_, at) in self._state.items() if at is not None and at <= now
+            ]:
+                del self._state[expired]
+
+    async def get(self, key):
+        item = self._lookup(key)
+        return item[0] if item is not None else None
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and self._lookup(key) is not None:
+            return False
+        self._store(key, value, ex)
+        return True
+
+    async def delete(self, *keys):
+        return sum(self._table(key).pop(key, None) is not None for key in keys)
+
+    async def exists(self, key):
+        return self._lookup(key) is not None
+
+    async def mget(self, *keys):
+        return [await self.get(key) for key in keys]
+
+    async def incr(self, key, ex=None, amount=1):
+        item = self._lookup(key)
+        if item is None:
+            value = amount
+            self._store(key, str(value).encode(), ex)
+        else:
+            value = int(item[0]) + amount
+            self._store(key, str(value).encode(), expires_at=item[1])
+        return value
+
+    async def ttl(self, key):
+        item = self._lookup(key)
+        if item is None:
+            return -2
+        if item[1] is None:
+            return -1
+        return math.ceil(item[1] - time.monotonic())
+
+    def _sorted_set(self, key, create=False):
+        item = self._lookup(key)
+        if item is not None:
+            return item[0]
+        if create:
+            sorted_set = SortedSet()
+            self._store(key, sorted_set)
+            return sorted_set
+        return None
+
+    async def hset(self, key, mapping):
+        item = self._lookup(key)
+        if item is None:
+            item = ({}, None)
+            self._store(key, item[0])
+        added = sum(field not in item[0] for field in mapping)
+        item[0].update(mapping)
+        return added
+
+    async def hget(self, key, field):
+        item = self._lookup(key)
+        return item[0].get(field) if item is not None else None
+
+    async def hdel(self, key, *fields):
+        item = self._lookup(key)
+        if item is None:
+            return 0
+        return sum(item[0].pop(field, None) is not None for field in fields)
+
+    async def zadd(self, key, mapping):
+        return self._sorted_set(key, create=True).add(mapping)
+
+    async def zrem(self, key, *members):
+        sorted_set = self._sorted_set(key)
+        return sorted_set.remove(members) if sorted_set is not None else 0
+
+    async def zrangebyscore(self, key, min, max):
+        sorted_set = self._sorted_set(key)
+        return sorted_set.range_by_score(min, max) if sorted_set is not None else []
+
+    async def zrangebylex(self, key, min, max, start=0, num=None):
+        sorted_set = self._sorted_set(key)
+        if sorted_set is None:
+            return []
+        return sorted_set.range_by_lex(min, max, start, num)
+
+    async def xadd(self, stream, fields, maxlen=None, minid=None):
+        milliseconds = int(time.time() * 1000)
+        last = self._last_stream_id
+        sequence = last[1] + 1 if milliseconds <= last[0] else 0
+        self._last_stream_id = (max(milliseconds, last[0]), sequence)
+        entry_id = "%d-%d" % self._last_stream_id
+        entries = self._streams.setdefault(stream, [])
+        entries.append((entry_id, {key: str(value) for key, value in fields.items()}))
+        if minid is not None:
+            entries[:] = [e for e in entries if _stream_id(e[0])[0] >= minid]
+        if maxlen is not None and len(entries) > maxlen:
+            del entries[: len(entries) - maxlen]
+        return entry_id
+
+    async def xadd_many(self, stream, entries, maxlen=None):
+        return [await self.xadd(stream, fields, maxlen=maxlen) for fields in entries]
+
+    async def xrange(self, stream, start="-", count=None):
+        entries = self._streams.get(stream, [])
+        if start != "-":
+            start_id = _stream_id(start)
+            entries = [e for e in entries if _stream_id(e[0]) >= start_id]
+        return entries[:count] if count is not None else list(entries)
+
+    async def xread(self, stream, last_id, block=None, count=None):
+        last = _stream_id(last_id)
+        deadline = time.monotonic() + (block or 0) / 1000
+        while True:
+            entries = [
+                e for e in self._streams.get(stream, []) if _stream_id(e[0]) > last
+            ]
+            if entries or time.monotonic() >= deadline:
+                return entries[:count] if count is not None else entries
+            await asyncio.sleep(0.05)
+
+    async def xgroup_create(self, stream, group, start="$"):
+        if (stream, group) in self._groups:
+            return False
+        entries = self._streams.setdefault(stream, [])
+        if start == "$":
+            last = _stream_id(entries[-1][0]) if entries else (0, 0)
+        else:
+            last = _stream_id(start)
+        self._groups[(stream, group)] = {"last_id": last, "pending": {}}
+        return True
+
+    async def xreadgroup(
+        self, stream, group, consumer, count=None, block=None, pending=False
+    ):
+        deadline = time.monotonic() + (block or 0) / 1000
+        while True:
+            state = self._groups.get((stream, group))
+            if state is None:
+                raise NoSuchGroup(group)
+            if pending:
+                entries = [
+                    e
+                    for e in self._streams.get(stream, [])
+                    if state["pending"].get(e[0]) == consumer
+                ]
+                return entries[:count] if count is not None else entries
+            entries = [
+                e
+                for e in self._streams.get(stream, [])
+                if _stream_id(e[0]) > state["last_id"]
+            ][:count]
+            if entries or time.monotonic() >= deadline:
+                for entry_id, _ in entries:
+                    state["pending"][entry_id] = consumer
+                if entries:
+                    state["last_id"] = _stream_id(entries[-1][0])
+                return entries
+            await asyncio.sleep(0.05)
+
+    async def xack(self, stream, group, *entry_ids):
+        state = self._groups.get((stream, group))
+        if state is None:
+            return 0
+        return sum(
+            state["pending"].pop(entry_id, None) is not None for entry_id in entry_ids
+        )
+
+
+class NullCacheBackend(CacheBackend):
+    """
+    ``CacheBackend`` which stores nothing: every read misses, counters never
+    grow (so rate limits never trigger) and sets and streams stay empty.
+    """
+
+    async def get(self, key):
+        return None
+
+    async def set(self, key, value, ex=None, nx=False):
+        return True
+
+    async def delete(self, *keys):
+        return 0
+
+    async def exists(self, key):
+        return False
+
+    async def mget(self, *keys):
+        return [None] * len(keys)
+
+    async def incr(self, key, ex=None, amount=1):
+        return 0
+
+    async def ttl(self, key):
+        return -2
+
+    async def hset(self, key, mapping):
+        return 0
+
+    async def hget(self, key, field):
+        return None
+
+    async def hdel(self, key, *fields):
+        return 0
+
+    async def zadd(self, key, mapping):
+        return 0
+
+    async def zrem(self, key, *members):
+        return 0
+
+    async def zrangebyscore(self, key, min, max):
+        return []
+
+    async def zrangebylex(self, key, min, max, start=0, num=None):
+        return []
+
+    async def xadd(self, stream, fields, maxlen=None, minid=None):
+        return "0-0"
+
+    async def xadd_many(self, stream, entries, maxlen=None):
+        return ["0-0"] * len(entries)
+
+    async def xrange(self, stream, start="-", count=None):
+        return []
+
+    async def xread(self, stream, last_id, block=None, count=None):
+        if block:
+            await asyncio.sleep(block / 1000)
+        return []
+
+    async def xgroup_create(self, stream, group, start="$"):
+        return True
+
+    async def xreadgroup(
+        self, stream, group, consumer, count=None, block=None, pending=False
+    ):
+        if block and not pending:
+            await asyncio.sleep(block / 1000)
+        return []
+
+    async def xack(self, stream, group, *entry_ids):
+        return 0
+
+
+CACHE_BACKENDS = {
+    "redis": RedisCacheBackend,
+    "memory": lambda: MemoryCacheBackend(settings.cache_max_entries),
+    "none": NullCacheBackend,
+}
+
+_cache: CacheBackend | None = None
+
+
+def get_cache() -> CacheBackend:
+    """
+    Returns the cache backend selected by ``settings.cache_backend``.
+
+    :return: The shared cache backend.
+    :rtype: CacheBackend
+    """
+    global _cache
+    if _cache is None:
+        _cache = CACHE_BACKENDS[settings.cache_backend]()
+    return _cache
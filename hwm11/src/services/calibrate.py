@@ -0,0 +1,114 @@
+import argparse
+import pathlib
+import re
+import statistics
+import time
+from typing import Dict, Tuple
+
+from passlib.hash import bcrypt
+
+from src.conf.config import settings
+
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+
+
+def measure(rounds: int, samples: int = 3) -> float:
+    """
+    Times bcrypt at a cost on this machine.
+
+    :param rounds: The cost (log2 of the number of rounds).
+    :type rounds: int
+    :param samples: Number of hashes timed.
+    :type samples: int
+    :return: The median latency in milliseconds.
+    :rtype: float
+    """
+    hasher = bcrypt.using(rounds=rounds)
+    latencies = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("calibration password")
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies)
+
+
+def calibrate(
+    target_ms: float,
+    min_rounds: int = MIN_ROUNDS,
+    max_rounds: int = MAX_ROUNDS,
+    samples: int = 3,
+) -> Tuple[int, Dict[int, float]]:
+    """
+    Finds the highest bcrypt cost hashing within ``target_ms``.
+
+    Each step up doubles the work, so costs are timed upwards until one
+    exceeds the target. ``min_rounds`` is chosen even if it is slower than
+    the target: a fast login is no excuse for a weak hash.
+
+    :param target_ms: The latency a hash may take, in milliseconds.
+    :type target_ms: float
+    :param min_rounds: The lowest cost to choose.
+    :type min_rounds: int
+    :param max_rounds: The highest cost to time.
+    :type max_rounds: int
+    :param samples: Hashes timed per cost.
+    :type samples: int
+    :return: The chosen cost and the latency of each cost timed.
+    :rtype: Tuple[int, Dict[int, float]]
+    """
+    latencies = {}
+    chosen = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        latencies[rounds] = measure(rounds, samples)
+        if latencies[rounds] > target_ms:
+            break
+        chosen = rounds
+    return chosen, latencies
+
+
+def write_env(path: pathlib.Path, rounds: int) -> None:
+    """
+    Sets ``BCRYPT_ROUNDS`` in an env file read by ``Settings``.
+
+    :param path: The env file, created if missing.
+    :type path: pathlib.Path
+    :param rounds: The cost.
+    :type rounds: int
+    """
+    line = f"BCRYPT_ROUNDS={rounds}"
+    text = path.read_text() if path.exists() else ""
+    if re.search(r"(?m)^BCRYPT_ROUNDS=.*$", text):
+        text = re.sub(r"(?m)^BCRYPT_ROUNDS=.*$", line, text)
+    else:
+        text += ("" if not text or text.endswith("\n") else "\n") + line + "\n"
+    path.write_text(text)
+
+
+def main() -> None:
+    """
+    Prints the bcrypt latency per cost on this machine and the cost to use.
+
+    Usage: ``python -m src.services.calibrate [--target-ms 250] [--write .env]``
+    """
+    parser = argparse.ArgumentParser(description="Calibrate the bcrypt cost.")
+    parser.add_argument("--target-ms", type=float, default=settings.bcrypt_target_ms)
+    parser.add_argument("--min-rounds", type=int, default=MIN_ROUNDS)
+    parser.add_argument("--max-rounds", type=int, default=MAX_ROUNDS)
+    parser.add_argument("--samples", type=int, default=3)
+    parser.add_argument("--write", type=pathlib.Path, metavar="ENV_FILE")
+    args = parser.parse_args()
+
+    rounds, latencies = calibrate(
+        args.target_ms, args.min_rounds, args.max_rounds, args.samples
+    )
+    for cost, latency in latencies.items():
+        marker = " <- chosen" if cost == rounds else ""
+        print(f"rounds {cost:2d}: {latency:8.1f} ms{marker}")
+    print(f"BCRYPT_ROUNDS={rounds} (currently {settings.bcrypt_rounds})")
+    if args.write:
+        write_env(args.write, rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import re
+from typing import Dict, List, Tuple
+
+from src.conf.config import settings
+from src.services.cache import CacheBackend, get_cache
+from src.services.events import ContactEvent, subscribe
+
+STREAM_ID = re.compile(r"^\d+(-\d+)?$")
+
+
+def is_stream_id(entry_id: str) -> bool:
+    """
+    :return: True for stream entry IDs such as ``1700000000000-0`` or ``0``.
+    :rtype: bool
+    """
+    return bool(STREAM_ID.match(entry_id))
+
+
+def stream_id_order(entry_id: str) -> Tuple[int, int]:
+    """
+    :return: A stream entry ID as a tuple ordered like the entries.
+    :rtype: Tuple[int, int]
+    """
+    milliseconds, _, sequence = entry_id.partition("-")
+    return int(milliseconds), int(sequence or 0)
+
+
+def _role(role) -> str:
+    return getattr(role, "value", role)
+
+
+def render_change(event: ContactEvent) -> Dict[str, str]:
+    """
+    Compact stream entry for a contact change: what happened to which contact
+    and the version it has now. Consumers needing more read the contact.
+
+    :param event: The change.
+    :type event: ContactEvent
+    :return: The entry fields.
+    :rtype: Dict[str, str]
+    """
+    contact = event.contact
+    fields = {
+        "op": event.op,
+        "contact_id": str(contact.id),
+        "version": str(contact.version),
+    }
+    if event.op == ContactEvent.ROLE:
+        fields["roles"] = _role(contact.roles)
+        if event.previous.get("roles") is not None:
+            fields["previous_roles"] = _role(event.previous["roles"])
+    return fields
+
+
+def parse_changes(entries: List[Tuple[str, Dict[str, str]]]) -> List[dict]:
+    """
+    :return: Stream entries as ``ContactChange`` dicts.
+    :rtype: List[dict]
+    """
+    return [{"id": entry_id, **fields} for entry_id, fields in entries]
+
+
+class ContactChangeStream:
+    """
+    Committed contact changes, appended to a stream in the cache backend.
+
+    Downstream systems either replay the stream from the last entry ID they
+    saw, or read it through a consumer group, which hands each entry to one
+    consumer of the group and redelivers it until it is acknowledged. The
+    stream keeps about the last ``maxlen`` changes.
+
+    :param maxlen: Number of changes retained.
+    :type maxlen: int
+    """
+
+    stream = "contacts:changes"
+
+    def __init__(self, maxlen: int, cache: CacheBackend | None = None):
+        self._cache = cache
+        self.maxlen = maxlen
+        self.metrics = {"published": 0}
+
+    @property
+    def cache(self) -> CacheBackend:
+        return self._cache or get_cache()
+
+    async def publish(self, events: List[ContactEvent]) -> None:
+        """
+        Appends contact changes to the stream.
+
+        :param events: The changes, in commit order.
+        :type events: List[ContactEvent]
+        """
+        if len(events) > 1:
+            return await self.publish_many(events)
+        for event in events:
+            await self.cache.xadd(self.stream, render_change(event), maxlen=self.maxlen)
+            self.metrics["published"] += 1
+
+    async def publish_many(self, events: List[ContactEvent]) -> None:
+        """
+        Appends a batch of contact changes, e.g. of an import, to the stream
+        in one round trip.
+
+        :param events: The changes, in commit order.
+        :type events: List[ContactEvent]
+        """
+        await self.cache.xadd_many(
+            self.stream, [render_change(event) for event in events], maxlen=self.maxlen
+        )
+        self.metrics["published"] += len(events)
+
+    async def replay(
+        self, after: str, count: int, block: int | None = None
+    ) -> List[dict]:
+        """
+        Returns the changes after an entry ID.
+
+        :param after: The last entry ID seen, ``0`` for all retained changes.
+        :type after: str
+        :param count: The maximum number of changes.
+        :type count: int
+        :param block: Milliseconds to wait if there are no changes yet.
+        :type block: int | None
+        :return: The changes, oldest first.
+        :rtype: List[dict]
+        """
+        return parse_changes(
+            await self.cache.xread(self.stream, after, block=block, count=count)
+        )
+
+    async def create_group(self, group: str, start: str = "$") -> bool:
+        """
+        Creates a consumer group.
+
+        :param group: The group name.
+        :type group: str
+        :param start: ``$`` to receive new changes only, ``0`` to receive
+            every retained change, or the entry ID to start after.
+        :type start: str
+        :return: False if the group already exists.
+        :rtype: bool
+        """
+        return await self.cache.xgroup_create(self.stream, group, start)
+
+    async def read_group(
+        self,
+        group: str,
+        consumer: str,
+        count: int,
+        block: int | None = None,
+        pending: bool = False,
+    ) -> List[dict]:
+        """
+        Returns changes for one consumer of a group.
+
+        :param group: The group name.
+        :type group: str
+        :param consumer: The consumer name, unique within the group.
+        :type consumer: str
+        :param count: The maximum number of changes.
+        :type count: int
+        :param block: Milliseconds to wait for new changes.
+        :type block: int | None
+        :param pending: Return the consumer's unacknowledged changes instead,
+            e.g. after a restart.
+        :type pending: bool
+        :return: The changes, oldest first.
+        :rtype: List[dict]
+        :raises NoSuchGroup: If the group doesn't exist.
+        """
+        return parse_changes(
+            await self.cache.xreadgroup(
+                self.stream, group, consumer, count=count, block=block, pending=pending
+            )
+        )
+
+    async def ack(self, group: str, entry_ids: List[str]) -> int:
+        """
+        Acknowledges changes processed by a consumer of a group.
+
+        :param group: The group name.
+        :type group: str
+        :param entry_ids: The entry IDs.
+        :type entry_ids: List[str]
+        :return: The number of changes which were pending.
+        :rtype: int
+        """
+        return await self.cache.xack(self.stream, group, *entry_ids)
+
+
+contact_changes = ContactChangeStream(maxlen=settings.contact_changes_maxlen)
+subscribe(contact_changes.publish)
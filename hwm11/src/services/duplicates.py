@@ -0,0 +1,291 @@
+import argparse
+import json
+import time
+import unicodedata
+import zlib
+from collections import defaultdict
+from itertools import combinations
+from typing import Dict, Iterable, List, Set, Tuple
+
+from src.database.connect import SessionLocal
+from src.repository import contacts as repository_contacts
+from src.schemas import DuplicateCandidate, DuplicateCluster, DuplicateReport
+
+MINHASH_PERMUTATIONS = 32
+MINHASH_ROWS_PER_BAND = 4
+MINHASH_SEEDS = [zlib.crc32(b"minhash%d" % i) for i in range(MINHASH_PERMUTATIONS)]
+
+SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def fold(text: str | None) -> str:
+    """
+    :return: The text lowercased and without accents.
+    :rtype: str
+    """
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def normalize_email(email: str | None) -> str:
+    """
+    Normalizes an e-mail for comparison: case and ``+tag`` suffixes of the
+    local part are ignored.
+
+    :param email: The e-mail.
+    :type email: str | None
+    :return: The normalized e-mail.
+    :rtype: str
+    """
+    local, _, domain = fold(email).strip().partition("@")
+    return f"{local.split('+', 1)[0]}@{domain}"
+
+
+def soundex(name: str | None) -> str:
+    """
+    American Soundex code of a name, e.g. ``R163`` for both Robert and Rupert.
+
+    :param name: The name.
+    :type name: str | None
+    :return: The code, or an empty string for names without letters.
+    :rtype: str
+    """
+    letters = [c for c in fold(name) if "a" <= c <= "z"]
+    if not letters:
+        return ""
+    code, previous = letters[0].upper(), SOUNDEX_CODES.get(letters[0], "")
+    for c in letters[1:]:
+        digit = SOUNDEX_CODES.get(c, "")
+        if digit and digit != previous:
+            code += digit
+        if c not in "hw":
+            previous = digit
+    return (code + "000")[:4]
+
+
+def ngrams(text: str, n: int = 3) -> Set[str]:
+    """
+    :return: The character n-grams of the text, padded at both ends.
+    :rtype: Set[str]
+    """
+    padded = f" {text} "
+    return {padded[i : i + n] for i in range(max(1, len(padded) - n + 1))}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def minhash(grams: Set[str]) -> List[int]:
+    """
+    MinHash signature of a set of n-grams; two signatures agree in each
+    position with probability close to the Jaccard similarity of the sets.
+
+    The permutations XOR the n-gram hashes with a seed, which is not exactly
+    min-wise independent but keeps the loop in C.
+
+    :param grams: The n-grams.
+    :type grams: Set[str]
+    :return: ``MINHASH_PERMUTATIONS`` values.
+    :rtype: List[int]
+    """
+    hashes = [zlib.crc32(gram.encode()) for gram in grams]
+    return [min(map(seed.__xor__, hashes)) for seed in MINHASH_SEEDS]
+
+
+class Record:
+    """
+    A contact prepared for duplicate detection.
+    """
+
+    __slots__ = ("contact", "name", "grams", "sound", "email", "email_grams", "phone")
+
+    def __init__(self, contact):
+        self.contact = contact
+        self.name = f"{fold(contact.first_name)} {fold(contact.last_name)}".strip()
+        self.grams = ngrams(self.name)
+        self.sound = f"{soundex(contact.first_name)}:{soundex(contact.last_name)}"
+        self.email = normalize_email(contact.email)
+        self.email_grams = ngrams(self.email.split("@", 1)[0])
+        self.phone = str(contact.phone) if contact.phone is not None else ""
+
+    def blocking_keys(self) -> Iterable[str]:
+        """
+        Keys shared by likely duplicates: only records sharing a key are
+        compared.
+        """
+        if self.contact.email:
+            yield "email:" + self.email
+        if self.phone:
+            yield "phone:" + self.phone
+            # Swapped digits keep the digit multiset.
+            yield "digits:" + "".join(sorted(self.phone))
+        yield "soundex:" + self.sound
+        signature = minhash(self.grams)
+        for band in range(0, MINHASH_PERMUTATIONS, MINHASH_ROWS_PER_BAND):
+            rows = signature[band : band + MINHASH_ROWS_PER_BAND]
+            yield "minhash:%d:%s" % (band, ":".join(map(str, rows)))
+
+
+def score_pair(a: Record, b: Record) -> Tuple[float, List[str]]:
+    """
+    Combines the evidence that two contacts are the same person as
+    independent probabilities (noisy-or).
+
+    :return: The score between 0 and 1 and the reasons behind it.
+    :rtype: Tuple[float, List[str]]
+    """
+    evidence = []
+    if a.contact.email and a.email == b.email:
+        evidence.append((0.9, "same e-mail"))
+    else:
+        similarity = jaccard(a.email_grams, b.email_grams)
+        if similarity >= 0.5:
+            evidence.append((0.5 * similarity, "similar e-mail"))
+    if a.phone and a.phone == b.phone:
+        evidence.append((0.7, "same phone"))
+    elif a.phone and sorted(a.phone) == sorted(b.phone):
+        evidence.append((0.4, "phone with swapped digits"))
+    similarity = jaccard(a.grams, b.grams)
+    if similarity >= 0.3:
+        evidence.append((0.8 * similarity, "similar name"))
+    elif a.sound == b.sound:
+        evidence.append((0.3, "sound-alike name"))
+
+    unlikely = 1.0
+    for probability, _ in evidence:
+        unlikely *= 1 - probability
+    return 1 - unlikely, [reason for _, reason in evidence]
+
+
+class DisjointSet:
+    def __init__(self):
+        self.parent: Dict[int, int] = {}
+
+    def find(self, item: int) -> int:
+        root = self.parent.setdefault(item, item)
+        while root != self.parent[root]:
+            root = self.parent[root]
+        while item != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a: int, b: int) -> None:
+        self.parent[self.find(a)] = self.find(b)
+
+
+def suggest_primary(contacts) -> int:
+    """
+    :return: ID of the contact to keep: confirmed ones first, then the oldest.
+    :rtype: int
+    """
+    return min(contacts, key=lambda c: (not c.confirmed, c.id)).id
+
+
+def find_duplicates(
+    contacts: Iterable, min_score: float = 0.6, max_block_size: int = 100
+) -> DuplicateReport:
+    """
+    Finds clusters of contacts which are likely the same person.
+
+    Contacts are only compared with contacts sharing a blocking key (the
+    normalized e-mail, the phone, its digits, the Soundex codes of the names
+    or a MinHash LSH band of the name's trigrams), so the work grows with the
+    number of contacts rather than with the number of pairs. Pairs scoring at
+    least ``min_score`` are joined into clusters.
+
+    :param contacts: The contacts, e.g. from ``stream_contacts``.
+    :type contacts: Iterable
+    :param min_score: The score above which two contacts are duplicates.
+    :type min_score: float
+    :param max_block_size: Blocks larger than this are too unspecific to
+        compare and are skipped.
+    :type max_block_size: int
+    :return: Clusters, most certain first, with merge suggestions.
+    :rtype: DuplicateReport
+    """
+    start = time.time()
+    records: Dict[int, Record] = {}
+    blocks: Dict[str, List[int]] = defaultdict(list)
+    for contact in contacts:
+        record = Record(contact)
+        records[contact.id] = record
+        for key in set(record.blocking_keys()):
+            blocks[key].append(contact.id)
+
+    scored: Dict[Tuple[int, int], Tuple[float, List[str]]] = {}
+    for ids in blocks.values():
+        if len(ids) > max_block_size:
+            continue
+        for pair in combinations(sorted(ids), 2):
+            if pair not in scored:
+                scored[pair] = score_pair(records[pair[0]], records[pair[1]])
+
+    clusters = DisjointSet()
+    for (a, b), (score, _) in scored.items():
+        if score >= min_score:
+            clusters.union(a, b)
+    members: Dict[int, List[int]] = defaultdict(list)
+    for contact_id in clusters.parent:
+        members[clusters.find(contact_id)].append(contact_id)
+
+    report = []
+    for ids in members.values():
+        ids.sort()
+        pairs = [
+            scored[pair]
+            for pair in combinations(ids, 2)
+            if pair in scored and scored[pair][0] >= min_score
+        ]
+        contacts_in_cluster = [records[i].contact for i in ids]
+        keep = suggest_primary(contacts_in_cluster)
+        report.append(
+            DuplicateCluster(
+                score=round(max(score for score, _ in pairs), 3),
+                reasons=sorted({reason for _, reasons in pairs for reason in reasons}),
+                contacts=[DuplicateCandidate.from_orm(c) for c in contacts_in_cluster],
+                keep=keep,
+                merge=[i for i in ids if i != keep],
+            )
+        )
+    report.sort(key=lambda cluster: (-cluster.score, -len(cluster.contacts)))
+    return DuplicateReport(
+        contacts_scanned=len(records),
+        candidate_pairs=len(scored),
+        clusters=report,
+        elapsed_seconds=round(time.time() - start, 3),
+    )
+
+
+def main() -> None:
+    """
+    Prints the duplicates report of the configured database as JSON.
+
+    Usage: ``python -m src.services.duplicates [--min-score 0.6]``
+    """
+    parser = argparse.ArgumentParser(description="Report duplicate contacts.")
+    parser.add_argument("--min-score", type=float, default=0.6)
+    parser.add_argument("--max-block-size", type=int, default=100)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = find_duplicates(
+            repository_contacts.stream_contacts(db),
+            min_score=args.min_score,
+            max_block_size=args.max_block_size,
+        )
+    finally:
+        db.close()
+    print(json.dumps(json.loads(report.json()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+from fastapi import HTTPException, Response, status
+
+
+def make_etag(version: int) -> str:
+    """
+    Builds a weak ETag for a contact version.
+
+    :param version: The contact's version.
+    :type version: int
+    :return: The ETag header value.
+    :rtype: str
+    """
+    return f'W/"{version}"'
+
+
+def make_list_etag(*parts) -> str:
+    """
+    Builds a weak ETag for a collection from values summarizing its state.
+
+    :param parts: E.g. the row count, highest ID and sum of versions.
+    :return: The ETag header value.
+    :rtype: str
+    """
+    return 'W/"%s"' % "-".join(str(part) for part in parts)
+
+
+def is_not_modified(header: str | None, etag: str) -> bool:
+    """
+    Checks an ``If-None-Match`` header against the current ETag, using weak
+    comparison as RFC 9110 requires for this header.
+
+    :param header: The header value, possibly a list of ETags or ``*``.
+    :type header: str | None
+    :param etag: The current ETag.
+    :type etag: str
+    :return: True if the client's copy is current and 304 may be sent.
+    :rtype: bool
+    """
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in header.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    """
+    :return: A body-less 304 response carrying the ETag.
+    :rtype: Response
+    """
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+def parse_if_match(if_match: str | None) -> int | None:
+    """
+    Extracts the expected contact version from an ``If-Match`` header.
+
+    :param if_match: The header value, e.g. ``W/"3"``.
+    :type if_match: str | None
+    :return: The expected version, or None if any version is acceptable.
+    :rtype: int | None
+    :raises HTTPException: 412 if the header is not an ETag of this API.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Invalid If-Match header",
+        )
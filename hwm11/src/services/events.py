@@ -0,0 +1,71 @@
+from typing import Awaitable, Callable, List
+
+from src.database.models import ContactExportRow
+
+
+class ContactEvent:
+    """
+    A committed change of a contact.
+
+    :param op: The kind of change, one of the ``ContactEvent`` constants.
+    :type op: str
+    :param contact: The contact after the change (before it, for deletes).
+    :type contact: ContactExportRow
+    :param previous: Values the change replaced, where consumers need them.
+    :type previous: dict | None
+    """
+
+    CREATE = "create"
+    UPDATE = "update"
+    ROLE = "role"
+    AVATAR = "avatar"
+    CONFIRM = "confirm"
+    DELETE = "delete"
+
+    __slots__ = ("op", "contact", "previous")
+
+    def __init__(
+        self, op: str, contact: ContactExportRow, previous: dict | None = None
+    ):
+        self.op = op
+        self.contact = contact
+        self.previous = previous or {}
+
+
+ContactEventHandler = Callable[[List[ContactEvent]], Awaitable[None]]
+
+_handlers: List[ContactEventHandler] = []
+
+
+def subscribe(handler: ContactEventHandler) -> ContactEventHandler:
+    """
+    Registers a coroutine function called with every batch of contact events.
+
+    Usable as a decorator.
+
+    :param handler: The handler.
+    :type handler: ContactEventHandler
+    :return: The handler.
+    :rtype: ContactEventHandler
+    """
+    _handlers.append(handler)
+    return handler
+
+
+async def publish(events: List[ContactEvent]) -> None:
+    """
+    Passes committed contact changes to every handler.
+
+    A failing handler is reported and doesn't stop the others: the change is
+    already committed.
+
+    :param events: The changes, in commit order.
+    :type events: List[ContactEvent]
+    """
+    if not events:
+        return
+    for handler in _handlers:
+        try:
+            await handler(events)
+        except Exception as e:
+            print(e)
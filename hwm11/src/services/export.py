@@ -0,0 +1,132 @@
+import csv
+import enum
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Iterable, Iterator
+
+from src.database.models import ContactExportRow
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _export_value(value):
+    """
+    Converts a column value into a JSON/CSV friendly scalar.
+
+    :param value: A value read from the database.
+    :return: The value as str, int, bool or None.
+    """
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _export_record(row: ContactExportRow) -> dict:
+    return {field: _export_value(getattr(row, field)) for field in row.fields}
+
+
+def _chunked(lines: Iterable[str], chunk_size: int) -> Iterator[bytes]:
+    """
+    Joins serialized lines into chunks, so every write to the socket carries
+    many rows instead of one.
+
+    :param lines: Serialized lines.
+    :type lines: Iterable[str]
+    :param chunk_size: Number of lines per chunk.
+    :type chunk_size: int
+    :return: Encoded chunks.
+    :rtype: Iterator[bytes]
+    """
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            yield "".join(chunk).encode("utf-8")
+            chunk = []
+    if chunk:
+        yield "".join(chunk).encode("utf-8")
+
+
+def ndjson_lines(rows: Iterable[ContactExportRow]) -> Iterator[str]:
+    """
+    Serializes contacts as newline delimited JSON.
+
+    :param rows: Contacts to export.
+    :type rows: Iterable[ContactExportRow]
+    :return: One JSON document per line.
+    :rtype: Iterator[str]
+    """
+    for row in rows:
+        yield json.dumps(_export_record(row), separators=(",", ":")) + "\n"
+
+
+def csv_lines(rows: Iterable[ContactExportRow]) -> Iterator[str]:
+    """
+    Serializes contacts as CSV with a header line.
+
+    :param rows: Contacts to export.
+    :type rows: Iterable[ContactExportRow]
+    :return: CSV lines.
+    :rtype: Iterator[str]
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(ContactExportRow.fields)
+    for row in rows:
+        writer.writerow([_export_value(getattr(row, field)) for field in row.fields])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gzip_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Compresses a byte stream into the gzip format on the fly.
+
+    :param chunks: Uncompressed chunks.
+    :type chunks: Iterable[bytes]
+    :return: Gzip compressed chunks.
+    :rtype: Iterator[bytes]
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_contacts(
+    rows: Iterable[ContactExportRow],
+    export_format: str = "ndjson",
+    compress: bool = False,
+    chunk_size: int = 500,
+) -> Iterator[bytes]:
+    """
+    Builds the byte stream of an address book export.
+
+    :param rows: Contacts to export, usually from ``stream_contacts``.
+    :type rows: Iterable[ContactExportRow]
+    :param export_format: Either ``ndjson`` or ``csv``.
+    :type export_format: str
+    :param compress: Whether to gzip the output.
+    :type compress: bool
+    :param chunk_size: Number of rows per written chunk.
+    :type chunk_size: int
+    :return: The encoded export.
+    :rtype: Iterator[bytes]
+    """
+    lines = csv_lines(rows) if export_format == "csv" else ndjson_lines(rows)
+    chunks = _chunked(lines, chunk_size)
+    if compress:
+        chunks = gzip_stream(chunks)
+    return chunks
@@ -0,0 +1,73 @@
+from typing import Any, List
+
+from fastapi import HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from src.schemas import ContactDb
+
+ALLOWED_FIELDS = tuple(ContactDb.__fields__)
+
+fields_query = Query(
+    None,
+    description="Comma separated contact fields to return, e.g. id,email",
+    example="id,email",
+)
+
+
+def sparse_fields(fields: str | None = fields_query) -> List[str] | None:
+    """
+    Parses the ``fields`` query parameter against ``ALLOWED_FIELDS``.
+
+    Fields come back in ``ALLOWED_FIELDS`` order without duplicates, so equal
+    selections are equal lists.
+
+    :param fields: The query parameter.
+    :type fields: str | None
+    :return: The selected fields, or None for full contacts.
+    :rtype: List[str] | None
+    :raises HTTPException: 422 if a field is unknown or none is given.
+    """
+    if fields is None:
+        return None
+    selected = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = selected.difference(ALLOWED_FIELDS)
+    if unknown or not selected:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"fields must be a comma separated subset of: "
+            f"{', '.join(ALLOWED_FIELDS)}",
+        )
+    return [field for field in ALLOWED_FIELDS if field in selected]
+
+
+def pick_fields(contact: Any, fields: List[str]) -> dict:
+    """
+    :return: The selected fields of a contact, ready for JSON encoding.
+    :rtype: dict
+    """
+    return jsonable_encoder({field: getattr(contact, field) for field in fields})
+
+
+def fields_response(
+    found: Any, fields: List[str], headers: dict | None = None
+) -> JSONResponse:
+    """
+    Encodes one contact or a list of contacts reduced to ``fields``.
+
+    Serializing the plain values directly skips validation through the
+    full ``ContactDb`` model.
+
+    :param found: A contact or a list of contacts.
+    :param fields: The selected fields.
+    :type fields: List[str]
+    :param headers: Extra response headers.
+    :type headers: dict | None
+    :return: The response.
+    :rtype: JSONResponse
+    """
+    if isinstance(found, list):
+        content = [pick_fields(contact, fields) for contact in found]
+    else:
+        content = pick_fields(found, fields)
+    return JSONResponse(content, headers=headers)
@@ -0,0 +1,197 @@
+import asyncio
+import hashlib
+import json
+import pickle
+import time
+from typing import Iterable
+
+from src.services.cache import CacheBackend, get_cache
+
+HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+IDEMPOTENT_PATHS = ("/api/auth/signup", "/api/contacts/create")
+
+
+class IdempotencyMiddleware:
+    """
+    Replays the response of a request retried with the same
+    ``Idempotency-Key`` header instead of handling it again.
+
+    The first request with a key takes a lock in the cache backend, runs
+    normally and stores its status, headers and body for ``ttl`` seconds.
+    Retries get the stored response byte for byte, marked with
+    ``Idempotent-Replayed: true``; retries arriving while the first request
+    is still running wait for it. Keys are scoped by path and by the
+    ``Authorization`` header, and reusing one with another body is an error.
+    Server errors and rate limited responses are not stored, so the retry
+    after one runs again.
+
+    :param app: The ASGI application.
+    :param paths: Paths whose POST requests honour the header.
+    :type paths: Iterable[str]
+    :param ttl: Seconds a response is replayed for.
+    :type ttl: int
+    :param lock_ttl: Seconds a request may hold a key; retries give up
+        waiting after that long.
+    :type lock_ttl: int
+    """
+
+    def __init__(
+        self,
+        app,
+        paths: Iterable[str],
+        ttl: int,
+        lock_ttl: int,
+        cache: CacheBackend | None = None,
+    ):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self._cache = cache
+
+    @property
+    def cache(self) -> CacheBackend:
+        return self._cache or get_cache()
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] not in self.paths
+        ):
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        idempotency_key = headers.get(HEADER)
+        if idempotency_key is None:
+            return await self.app(scope, receive, send)
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            return await respond(
+                send, 400, f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"
+            )
+
+        body = await read_body(receive)
+        caller = hashlib.sha256(
+            b"\x00".join(
+                (
+                    scope["path"].encode(),
+                    headers.get(b"authorization", b""),
+                    idempotency_key,
+                )
+            )
+        ).hexdigest()
+        key, lock_key = f"idempotency:{caller}", f"idempotency:{caller}:lock"
+        fingerprint = hashlib.sha256(body).hexdigest()
+
+        deadline = time.monotonic() + self.lock_ttl
+        while True:
+            stored = await self.cache.get(key)
+            if stored is not None:
+                return await self.replay(send, stored, fingerprint)
+            if await self.cache.set(lock_key, b"1", ex=self.lock_ttl, nx=True):
+                break
+            if time.monotonic() >= deadline:
+                return await respond(
+                    send, 409, "A request with this Idempotency-Key is in progress"
+                )
+            await asyncio.sleep(0.05)
+
+        try:
+            await self.app(
+                scope, replay_body(body, receive), self.recorder(send, key, fingerprint)
+            )
+        finally:
+            await self.cache.delete(lock_key)
+
+    def recorder(self, send, key: str, fingerprint: str):
+        """
+        Wraps ``send`` to store the response once its last chunk is sent,
+        before any background task of the route runs.
+        """
+        start, chunks = {}, []
+
+        async def record(message):
+            await send(message)
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if message.get("more_body") or not is_final(start["status"]):
+                    return
+                stored = (
+                    fingerprint,
+                    start["status"],
+                    list(start.get("headers", [])),
+                    b"".join(chunks),
+                )
+                await self.cache.set(key, pickle.dumps(stored), ex=self.ttl)
+
+        return record
+
+    async def replay(self, send, stored: bytes, fingerprint: str):
+        stored_fingerprint, status_code, headers, body = pickle.loads(stored)
+        if stored_fingerprint != fingerprint:
+            return await respond(
+                send, 422, "Idempotency-Key was used with another request body"
+            )
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status_code,
+                "headers": headers + [(b"idempotent-replayed", b"true")],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def is_final(status_code: int) -> bool:
+    """
+    :return: False for responses a retry may get differently.
+    :rtype: bool
+    """
+    return status_code < 500 and status_code != 429
+
+
+async def read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    return b"".join(chunks)
+
+
+def replay_body(body: bytes, receive):
+    """
+    :return: An ASGI ``receive`` returning a request body already read, then
+        the messages of ``receive``, e.g. the client disconnecting.
+    """
+    sent = False
+
+    async def replay():
+        nonlocal sent
+        if sent:
+            return await receive()
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return replay
+
+
+async def respond(send, status_code: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
@@ -0,0 +1,178 @@
+import asyncio
+import codecs
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Iterator, List, Tuple
+
+from libgravatar import Gravatar
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from src.conf.config import settings
+from src.repository import contacts as repository_contacts
+from src.schemas import ContactModel, ImportReport, ImportRowError
+from src.services.auth import hash_password
+
+_hash_pool: ProcessPoolExecutor | None = None
+_hash_workers = settings.import_hash_workers or os.cpu_count() or 1
+
+
+def _get_hash_pool() -> ProcessPoolExecutor:
+    """
+    Returns the process pool used to hash imported passwords, creating it on
+    first use.
+
+    :return: The shared process pool.
+    :rtype: ProcessPoolExecutor
+    """
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ProcessPoolExecutor(max_workers=_hash_workers)
+    return _hash_pool
+
+
+def shutdown_hash_pool() -> None:
+    """
+    Stops the password hashing worker processes.
+    """
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown()
+        _hash_pool = None
+
+
+def _hash_many(passwords: List[str]) -> List[str]:
+    chunksize = max(1, len(passwords) // (_hash_workers * 4))
+    return list(_get_hash_pool().map(hash_password, passwords, chunksize=chunksize))
+
+
+def _read_chunks(file: BinaryIO, chunk_size: int) -> Iterator[List[Tuple[int, dict]]]:
+    """
+    Reads CSV records in chunks, numbering them by their line in the file.
+
+    :param file: The uploaded CSV file.
+    :type file: BinaryIO
+    :param chunk_size: Number of records per chunk.
+    :type chunk_size: int
+    :return: Chunks of (row number, record) pairs.
+    :rtype: Iterator[List[Tuple[int, dict]]]
+    """
+    # TextIOWrapper needs readable(), which SpooledTemporaryFile (the
+    # UploadFile backing) only has since Python 3.11.
+    reader = csv.DictReader(codecs.getreader("utf-8-sig")(file))
+    chunk = []
+    for number, record in enumerate(reader, start=2):
+        chunk.append((number, record))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _validation_detail(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
+
+
+def _gravatar(email: str) -> str | None:
+    try:
+        return Gravatar(email).get_image()
+    except Exception as e:
+        print(e)
+        return None
+
+
+def _parse_chunks(
+    file: BinaryIO, chunk_size: int
+) -> Iterator[Tuple[int, List[Tuple[int, ContactModel, str | None]], List[tuple]]]:
+    """
+    Reads and validates CSV records in chunks.
+
+    :param file: The uploaded CSV file.
+    :type file: BinaryIO
+    :param chunk_size: Number of records per chunk.
+    :type chunk_size: int
+    :return: Chunks of the number of records read, the valid records as
+        (row number, contact, avatar) and the invalid ones as
+        (row number, email, error detail).
+    :rtype: Iterator[Tuple[int, List[tuple], List[tuple]]]
+    """
+    for chunk in _read_chunks(file, chunk_size):
+        valid, errors = [], []
+        for number, record in chunk:
+            try:
+                body = ContactModel(**record)
+            except ValidationError as e:
+                errors.append((number, record.get("email"), _validation_detail(e)))
+                continue
+            valid.append((number, body, _gravatar(body.email)))
+        yield len(chunk), valid, errors
+
+
+async def import_contacts(
+    file: BinaryIO, db: Session, chunk_size: int | None = None
+) -> ImportReport:
+    """
+    Imports contacts from a CSV file with a header line.
+
+    Rows are validated against ``ContactModel`` chunk by chunk, their passwords
+    are hashed across a process pool and each chunk is inserted with a single
+    statement. Rows with an already registered email or phone are reported,
+    not inserted.
+
+    :param file: The CSV file with columns of ``ContactModel``.
+    :type file: BinaryIO
+    :param db: The database session.
+    :type db: Session
+    :param chunk_size: Number of rows validated and inserted at once.
+    :type chunk_size: int | None
+    :return: Per-row errors and throughput of the import.
+    :rtype: ImportReport
+    """
+    chunk_size = chunk_size or settings.import_chunk_size
+    loop = asyncio.get_running_loop()
+    report = ImportReport()
+    started = time.perf_counter()
+
+    def add_error(number: int, email: str | None, detail: str):
+        report.failed += 1
+        if len(report.errors) < settings.import_max_errors:
+            report.errors.append(ImportRowError(row=number, email=email, detail=detail))
+
+    # Reading and validating the file would block the event loop: each chunk
+    # is parsed in the default executor.
+    chunks = _parse_chunks(file, chunk_size)
+    while (parsed := await loop.run_in_executor(None, next, chunks, None)) is not None:
+        received, valid, errors = parsed
+        report.received += received
+        for error in errors:
+            add_error(*error)
+        if not valid:
+            continue
+
+        hashes = await loop.run_in_executor(
+            None, _hash_many, [body.password for _, body, _ in valid]
+        )
+        rows = [
+            {**body.dict(), "password": password, "avatar": avatar}
+            for (_, body, avatar), password in zip(valid, hashes)
+        ]
+        inserted = {
+            contact.email
+            for contact in await repository_contacts.insert_contacts(rows, db)
+        }
+        report.inserted += len(inserted)
+        for number, body, _ in valid:
+            if body.email in inserted:
+                inserted.discard(body.email)
+            else:
+                add_error(number, body.email, "Email or phone already registered")
+
+    report.elapsed_seconds = round(time.perf_counter() - started, 3)
+    if report.elapsed_seconds:
+        report.rows_per_second = round(report.received / report.elapsed_seconds, 1)
+    return report
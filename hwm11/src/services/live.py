@@ -0,0 +1,203 @@
+import asyncio
+import json
+import time
+from typing import AsyncIterator, FrozenSet, List, Set
+
+from src.conf.config import settings
+from src.database.models import Roles
+from src.services.changes import (
+    ContactChangeStream,
+    contact_changes,
+    stream_id_order,
+)
+from src.services.events import ContactEvent
+
+EVERY_OP = frozenset(
+    (
+        ContactEvent.CREATE,
+        ContactEvent.UPDATE,
+        ContactEvent.ROLE,
+        ContactEvent.AVATAR,
+        ContactEvent.CONFIRM,
+        ContactEvent.DELETE,
+    )
+)
+
+# Role and confirmation changes are account administration, which only
+# the roles allowed to change roles get to see.
+VISIBLE_OPS = {
+    Roles.admin: EVERY_OP,
+    Roles.moderator: EVERY_OP,
+    Roles.user: EVERY_OP - {ContactEvent.ROLE, ContactEvent.CONFIRM},
+}
+
+
+def format_event(change: dict) -> str:
+    """
+    :return: A change as a Server-Sent Event named after its operation.
+    :rtype: str
+    """
+    data = json.dumps(change, separators=(",", ":"))
+    return f"id: {change['id']}\nevent: {change['op']}\ndata: {data}\n\n"
+
+
+class Subscriber:
+    """
+    One live client: the operations it may see and the changes waiting to be
+    sent to it.
+    """
+
+    __slots__ = ("ops", "queue", "lagged")
+
+    def __init__(self, ops: FrozenSet[str], queue_size: int):
+        self.ops = ops
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.lagged = False
+
+
+class LiveChanges:
+    """
+    Fans the contact change stream out to Server-Sent Events clients.
+
+    Each worker reads the stream with a single task, started with the first
+    client and ending after the last one leaves, and copies every change into
+    the queues of the clients allowed to see it. An idle client costs a queue
+    and a suspended generator; it never touches the cache or the database.
+
+    A client too slow to drain its queue is disconnected rather than slowing
+    down the others; it reconnects with ``Last-Event-ID`` and catches up from
+    the stream.
+
+    :param heartbeat: Seconds of silence after which a comment is sent, so
+        proxies keep the connection open.
+    :type heartbeat: int
+    :param queue_size: Changes buffered per client.
+    :type queue_size: int
+    """
+
+    def __init__(
+        self,
+        heartbeat: int,
+        queue_size: int,
+        changes: ContactChangeStream | None = None,
+        block: int = 5000,
+    ):
+        self.heartbeat = heartbeat
+        self.queue_size = queue_size
+        self._changes = changes
+        self.block = block
+        self.subscribers: Set[Subscriber] = set()
+        self.last_id = "0"
+        self._task: asyncio.Task | None = None
+        self.metrics = {"delivered": 0, "lagged": 0}
+
+    @property
+    def changes(self) -> ContactChangeStream:
+        return self._changes or contact_changes
+
+    def subscribe(self, role: Roles) -> Subscriber:
+        """
+        Registers a client, starting the stream reader if needed.
+
+        :param role: The client's role.
+        :type role: Roles
+        :return: The subscription.
+        :rtype: Subscriber
+        """
+        subscriber = Subscriber(
+            VISIBLE_OPS.get(role, VISIBLE_OPS[Roles.user]), self.queue_size
+        )
+        self.subscribers.add(subscriber)
+        if self._task is None or self._task.done():
+            # Entry IDs start with the millisecond they were added at.
+            self.last_id = "%d-0" % (time.time() * 1000 - 1)
+            self._task = asyncio.create_task(self.follow())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers.discard(subscriber)
+
+    def dispatch(self, changes: List[dict]) -> None:
+        """
+        Queues changes for the clients allowed to see them.
+
+        :param changes: The changes read from the stream.
+        :type changes: List[dict]
+        """
+        for change in changes:
+            for subscriber in self.subscribers:
+                if subscriber.lagged or change["op"] not in subscriber.ops:
+                    continue
+                try:
+                    subscriber.queue.put_nowait(change)
+                except asyncio.QueueFull:
+                    subscriber.lagged = True
+                    self.metrics["lagged"] += 1
+            self.last_id = change["id"]
+
+    async def follow(self) -> None:
+        """
+        Reads the change stream while there are clients.
+        """
+        while self.subscribers:
+            try:
+                self.dispatch(
+                    await self.changes.replay(self.last_id, 100, block=self.block)
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(e)
+                await asyncio.sleep(1)
+
+    async def stream(
+        self, subscriber: Subscriber, last_event_id: str | None = None
+    ) -> AsyncIterator[str]:
+        """
+        Generates the Server-Sent Events of a client, first replaying what it
+        missed since ``last_event_id``.
+
+        :param subscriber: The client's subscription, registered before the
+            replay so no change falls between the two.
+        :type subscriber: Subscriber
+        :param last_event_id: The last change the client received.
+        :type last_event_id: str | None
+        :return: The events.
+        :rtype: AsyncIterator[str]
+        """
+        try:
+            yield "retry: 3000\n\n"
+            replayed = last_event_id
+            while replayed is not None:
+                changes = await self.changes.replay(replayed, 1000)
+                for change in changes:
+                    if change["op"] in subscriber.ops:
+                        yield format_event(change)
+                    replayed = change["id"]
+                if len(changes) < 1000:
+                    break
+            seen = stream_id_order(replayed) if replayed is not None else (0, 0)
+            while not (subscriber.lagged and subscriber.queue.empty()):
+                try:
+                    change = await asyncio.wait_for(
+                        subscriber.queue.get(), self.heartbeat
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if stream_id_order(change["id"]) <= seen:
+                    continue
+                self.metrics["delivered"] += 1
+                yield format_event(change)
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+
+live_changes = LiveChanges(
+    heartbeat=settings.live_changes_heartbeat,
+    queue_size=settings.live_changes_queue_size,
+)
@@ -0,0 +1,31 @@
+from fastapi import HTTPException, Request, status
+
+from src.services.cache import get_cache
+
+
+class RateLimiter:
+    """
+    Fixed window rate limit per client and path, counted in the cache backend.
+
+    :param times: Requests allowed per window.
+    :type times: int
+    :param seconds: Length of the window.
+    :type seconds: int
+    """
+
+    def __init__(self, times: int = 1, seconds: int = 1):
+        self.times = times
+        self.seconds = seconds
+
+    async def __call__(self, request: Request):
+        forwarded = request.headers.get("X-Forwarded-For")
+        client = forwarded.split(",")[0] if forwarded else request.client.host
+        key = f"rate:{client}:{request.scope['path']}:{self.times}/{self.seconds}"
+        cache = get_cache()
+        if await cache.incr(key, ex=self.seconds) > self.times:
+            retry_after = max(await cache.ttl(key), 1)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too Many Requests",
+                headers={"Retry-After": str(retry_after)},
+            )
@@ -0,0 +1,135 @@
+import hashlib
+import pickle
+import unicodedata
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from fastapi import Response
+
+from src.conf.config import settings
+from src.services.cache import CacheBackend, get_cache
+from src.services.events import ContactEvent, subscribe
+
+Renderer = Callable[[], Awaitable[Tuple[int, bytes]]]
+
+
+def normalize_inquiry(inquiry: str, ignore_case: bool = False) -> str:
+    """
+    Brings equivalent inquiries to one form, so they share a cache entry.
+
+    :param inquiry: User's input.
+    :type inquiry: str
+    :param ignore_case: Also ignore case; only for case-insensitive searches.
+    :type ignore_case: bool
+    :return: The normalized inquiry.
+    :rtype: str
+    """
+    inquiry = unicodedata.normalize("NFC", inquiry)
+    return inquiry.lower() if ignore_case else inquiry
+
+
+class ResponseCache:
+    """
+    Caches serialized responses of contact searches.
+
+    Keys embed the current contacts generation, a counter bumped on every
+    committed contact change. Invalidation is therefore a single ``INCR``:
+    entries of older generations are never read again and simply expire.
+
+    :param ttl: Seconds a response is kept.
+    :type ttl: int
+    """
+
+    generation_key = "contacts:generation"
+
+    def __init__(self, ttl: int, cache: CacheBackend | None = None):
+        self._cache = cache
+        self.ttl = ttl
+        self.metrics: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0}
+        )
+
+    @property
+    def cache(self) -> CacheBackend:
+        return self._cache or get_cache()
+
+    async def generation(self) -> int:
+        value = await self.cache.get(self.generation_key)
+        return int(value) if value is not None else 0
+
+    async def invalidate(self, events: List[ContactEvent] | None = None) -> None:
+        """
+        Makes every cached response stale by starting a new generation.
+
+        :param events: The changes causing the invalidation, unused.
+        :type events: List[ContactEvent] | None
+        """
+        await self.cache.incr(self.generation_key)
+
+    async def key(self, route: str, variant: str, role: str, inquiry: str) -> str:
+        digest = hashlib.sha1(inquiry.encode()).hexdigest()
+        generation = await self.generation()
+        return f"response:{generation}:{route}:{variant}:{role}:{digest}"
+
+    async def fetch(
+        self, route: str, role: str, inquiry: str, render: Renderer, variant: str = ""
+    ) -> Response:
+        """
+        Returns the cached response for an inquiry, rendering and caching it on
+        a miss. Error responses are cached too, so repeated searches for
+        nothing don't reach the database either.
+
+        :param route: Name of the route.
+        :type route: str
+        :param role: Role of the caller.
+        :type role: str
+        :param inquiry: The normalized inquiry.
+        :type inquiry: str
+        :param render: Coroutine function returning the status code and the
+            JSON body.
+        :type render: Renderer
+        :param variant: Distinguishes representations of the same search,
+            e.g. the selected fields.
+        :type variant: str
+        :return: The response.
+        :rtype: Response
+        """
+        key = await self.key(route, variant, role, inquiry)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            self.metrics[route]["hits"] += 1
+            status_code, body = pickle.loads(cached)
+            return self._response(status_code, body, "HIT")
+
+        self.metrics[route]["misses"] += 1
+        status_code, body = await render()
+        await self.cache.set(key, pickle.dumps((status_code, body)), ex=self.ttl)
+        return self._response(status_code, body, "MISS")
+
+    @staticmethod
+    def _response(status_code: int, body: bytes, outcome: str) -> Response:
+        return Response(
+            content=body,
+            status_code=status_code,
+            media_type="application/json",
+            headers={"X-Cache": outcome},
+        )
+
+    def report(self) -> Dict[str, dict]:
+        """
+        Reports hits, misses and hit ratio of every route.
+
+        :return: Counters by route name.
+        :rtype: Dict[str, dict]
+        """
+        return {
+            route: {
+                **counts,
+                "hit_ratio": counts["hits"] / (counts["hits"] + counts["misses"]),
+            }
+            for route, counts in self.metrics.items()
+        }
+
+
+response_cache = ResponseCache(ttl=settings.response_cache_ttl)
+subscribe(response_cache.invalidate)
@@ -0,0 +1,157 @@
+import asyncio
+import math
+import time
+
+from src.conf.config import settings
+from src.services.cache import CacheBackend, get_cache
+
+
+class BloomFilter:
+    """
+    Fixed size Bloom filter over strings.
+
+    Answers "definitely not added" or "possibly added"; the false positive
+    rate stays near ``error_rate`` while at most ``capacity`` keys are added.
+
+    :param capacity: Expected number of keys.
+    :type capacity: int
+    :param error_rate: Target false positive rate.
+    :type error_rate: float
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        # str hashes are salted per process, which is fine for a filter that
+        # never leaves the process and keeps lookups cheap.
+        h = hash(key)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits, size = self.bits, self.size
+        h = hash(key)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class RevocationList:
+    """
+    Revoked access tokens, keyed by their ``jti``.
+
+    The definitive set lives in the cache backend as ``revoked:{jti}`` keys
+    expiring with the tokens. Every revocation is also appended to a stream,
+    which each worker tails to keep an in-process ``BloomFilter`` current.
+    Checking a token therefore costs a filter lookup, and the cache is only
+    asked when the filter reports a possible hit.
+    """
+
+    stream = "revocations"
+
+    def __init__(self, capacity: int, ttl: int, cache: CacheBackend | None = None):
+        self._cache = cache
+        self.capacity = capacity
+        self.ttl = ttl
+        self.bloom = BloomFilter(capacity)
+        self.last_id = "0-0"
+        self.metrics = {"checks": 0, "filter_hits": 0, "revoked": 0}
+
+    @property
+    def cache(self) -> CacheBackend:
+        return self._cache or get_cache()
+
+    async def revoke(self, jti: str, expires_at: int) -> None:
+        """
+        Revokes an access token until it expires.
+
+        :param jti: The token ID.
+        :type jti: str
+        :param expires_at: The token's ``exp`` as a unix timestamp.
+        :type expires_at: int
+        """
+        if expires_at <= time.time():
+            return
+        await self.cache.set(
+            f"revoked:{jti}", b"1", ex=math.ceil(expires_at - time.time())
+        )
+        await self.cache.xadd(
+            self.stream, {"jti": jti}, minid=int((time.time() - self.ttl) * 1000)
+        )
+        self.bloom.add(jti)
+
+    async def is_revoked(self, jti: str) -> bool:
+        """
+        Checks whether an access token was revoked.
+
+        :param jti: The token ID.
+        :type jti: str
+        :return: True if the token is revoked.
+        :rtype: bool
+        """
+        self.metrics["checks"] += 1
+        if jti not in self.bloom:
+            return False
+        self.metrics["filter_hits"] += 1
+        revoked = await self.cache.exists(f"revoked:{jti}")
+        if revoked:
+            self.metrics["revoked"] += 1
+        return revoked
+
+    def _apply(self, entries) -> None:
+        for entry_id, fields in entries:
+            self.bloom.add(fields["jti"])
+            self.last_id = entry_id
+
+    async def rebuild(self) -> None:
+        """
+        Rebuilds the filter from the revocations still in the stream, dropping
+        tokens that have expired since the last rebuild.
+        """
+        self.bloom = BloomFilter(self.capacity)
+        self.last_id = "0-0"
+        self._apply(await self.cache.xrange(self.stream))
+
+    async def follow(self, block: int = 5000, rebuild_every: int | None = None):
+        """
+        Tails the revocation stream forever, adding new entries to the filter.
+
+        :param block: Milliseconds to block on each read.
+        :type block: int
+        :param rebuild_every: Seconds between full rebuilds; defaults to the
+            token lifetime.
+        :type rebuild_every: int | None
+        """
+        rebuild_every = rebuild_every or self.ttl
+        rebuilt_at = time.monotonic()
+        while True:
+            try:
+                if time.monotonic() - rebuilt_at > rebuild_every:
+                    await self.rebuild()
+                    rebuilt_at = time.monotonic()
+                self._apply(
+                    await self.cache.xread(self.stream, self.last_id, block=block)
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(e)
+                await asyncio.sleep(1)
+
+
+revocation_list = RevocationList(
+    capacity=settings.revocation_capacity, ttl=settings.access_token_max_ttl
+)
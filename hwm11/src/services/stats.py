@@ -0,0 +1,193 @@
+import asyncio
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from src.conf.config import settings
+from src.database.models import Roles
+from src.repository import contacts as repository_contacts
+from src.services.cache import CacheBackend, SingleFlight, get_cache
+from src.services.events import ContactEvent, subscribe
+
+
+def _role(role) -> str:
+    return getattr(role, "value", role) or Roles.user.value
+
+
+class ContactStats:
+    """
+    Contact counters kept in the cache backend.
+
+    Contact events adjust the counters, so reading them costs one ``MGET``
+    whatever the size of the table. ``reconcile`` recounts the table and
+    overwrites them, correcting drift from lost events or a flushed cache.
+
+    :param days: Number of days of signups reported.
+    :type days: int
+    """
+
+    ready_key = "stats:ready"
+    total_key = "stats:total"
+    confirmed_key = "stats:confirmed"
+
+    def __init__(self, days: int, cache: CacheBackend | None = None):
+        self._cache = cache
+        self.days = days
+        self.reconciliations = SingleFlight()
+        self.metrics = {"reconciliations": 0, "corrections": 0}
+
+    @property
+    def cache(self) -> CacheBackend:
+        return self._cache or get_cache()
+
+    @staticmethod
+    def role_key(role: str) -> str:
+        return f"stats:role:{role}"
+
+    @staticmethod
+    def signups_key(day: date | str) -> str:
+        return f"stats:signups:{day}"
+
+    @property
+    def signups_ttl(self) -> int:
+        return (self.days + 1) * 24 * 3600
+
+    def _days(self, today: date) -> List[str]:
+        return [str(today - timedelta(days=i)) for i in range(self.days)]
+
+    def deltas(self, events: List[ContactEvent]) -> Dict[str, int]:
+        """
+        Sums up how contact events change the counters.
+
+        :param events: The changes.
+        :type events: List[ContactEvent]
+        :return: Counter adjustments by key.
+        :rtype: Dict[str, int]
+        """
+        deltas = Counter()
+        for event in events:
+            contact = event.contact
+            if event.op in (ContactEvent.CREATE, ContactEvent.DELETE):
+                sign = 1 if event.op == ContactEvent.CREATE else -1
+                deltas[self.total_key] += sign
+                deltas[self.role_key(_role(contact.roles))] += sign
+                if contact.confirmed:
+                    deltas[self.confirmed_key] += sign
+                if contact.created_at is not None:
+                    deltas[self.signups_key(contact.created_at.date())] += sign
+            elif event.op == ContactEvent.ROLE:
+                previous = _role(event.previous.get("roles"))
+                if previous != _role(contact.roles):
+                    deltas[self.role_key(previous)] -= 1
+                    deltas[self.role_key(_role(contact.roles))] += 1
+            elif event.op == ContactEvent.CONFIRM:
+                deltas[self.confirmed_key] += 1
+        return {key: delta for key, delta in deltas.items() if delta}
+
+    async def apply(self, events: List[ContactEvent]) -> None:
+        """
+        Adjusts the counters to contact events. Until the first
+        reconciliation there is nothing to adjust.
+
+        :param events: The changes.
+        :type events: List[ContactEvent]
+        """
+        if not await self.cache.exists(self.ready_key):
+            return
+        for key, delta in self.deltas(events).items():
+            ex = self.signups_ttl if key.startswith("stats:signups:") else None
+            await self.cache.incr(key, ex=ex, amount=delta)
+
+    async def reconcile(self, db: Session) -> dict:
+        """
+        Recounts the contacts table and overwrites the counters.
+
+        :param db: The database session.
+        :type db: Session
+        :return: The counters which were off, with their recounted values.
+        :rtype: dict
+        """
+        today = date.today()
+        since = datetime.combine(
+            today - timedelta(days=self.days - 1), datetime.min.time()
+        )
+        counts = await run_in_threadpool(
+            repository_contacts.get_contacts_stats, db, since
+        )
+        roles = {_role(role): count for role, count in counts["roles"].items()}
+        values = {
+            self.total_key: sum(roles.values()),
+            self.confirmed_key: counts["confirmed"],
+            **{self.role_key(role.value): roles.get(role.value, 0) for role in Roles},
+        }
+        signups = {
+            self.signups_key(day): counts["signups"].get(day, 0)
+            for day in self._days(today)
+        }
+        current = await self.cache.mget(*values, *signups)
+        corrections = {}
+        for (key, value), cached in zip({**values, **signups}.items(), current):
+            if cached is None or int(cached) != value:
+                corrections[key] = value
+        for key, value in values.items():
+            await self.cache.set(key, str(value).encode())
+        for key, value in signups.items():
+            await self.cache.set(key, str(value).encode(), ex=self.signups_ttl)
+        await self.cache.set(self.ready_key, b"1")
+        self.metrics["reconciliations"] += 1
+        self.metrics["corrections"] += len(corrections)
+        return corrections
+
+    async def read(self, db: Session) -> dict:
+        """
+        Returns the counters, reconciling first if there are none.
+
+        :param db: The database session.
+        :type db: Session
+        :return: Total, counts by role, confirmed count and ratio, and signups
+            of the last days.
+        :rtype: dict
+        """
+        if not await self.cache.exists(self.ready_key):
+            await self.reconciliations.do(self.ready_key, lambda: self.reconcile(db))
+        days = self._days(date.today())
+        keys = [
+            self.total_key,
+            self.confirmed_key,
+            *(self.role_key(role.value) for role in Roles),
+            *(self.signups_key(day) for day in days),
+        ]
+        values = [int(value or 0) for value in await self.cache.mget(*keys)]
+        total, confirmed = values[0], values[1]
+        roles = values[2 : 2 + len(Roles)]
+        return {
+            "total": total,
+            "roles": {role.value: count for role, count in zip(Roles, roles)},
+            "confirmed": confirmed,
+            "confirmed_ratio": round(confirmed / total, 4) if total else 0.0,
+            "signups": dict(zip(days, values[2 + len(Roles) :])),
+        }
+
+    async def reconcile_forever(self, session_factory: Callable[[], Session]):
+        """
+        Reconciles every ``settings.stats_reconcile_interval`` seconds.
+
+        :param session_factory: Creates database sessions.
+        :type session_factory: Callable[[], Session]
+        """
+        while True:
+            await asyncio.sleep(settings.stats_reconcile_interval)
+            db = session_factory()
+            try:
+                await self.reconcile(db)
+            except Exception as e:
+                print(e)
+            finally:
+                db.close()
+
+
+contact_stats = ContactStats(days=settings.stats_days)
+subscribe(contact_stats.apply)
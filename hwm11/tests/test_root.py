@@ -1,3 +1,6 @@
+import asyncio
+
+import pytest
 from fastapi.testclient import TestClient
 
 import main
@@ -9,3 +12,9 @@ def test_root():
     response = client.get("/")
     assert response.status_code == 200
     assert response.json() == {"message": "Welcome to Address Book"}
+
+
+def test_startup_refuses_null_cache(monkeypatch):
+    monkeypatch.setattr(main.settings, "cache_backend", "none")
+    with pytest.raises(RuntimeError, match="revocations"):
+        asyncio.run(main.startup())
@@ -1,6 +1,10 @@
 from unittest.mock import MagicMock
 
+from passlib.hash import bcrypt
+
+from src.conf.config import settings
 from src.database.models import Contact
+from src.services.auth import auth_service, hash_cost
 
 
 def test_signup(client, user, monkeypatch):
@@ -16,7 +20,9 @@ def test_signup(client, user, monkeypatch):
     assert "id" in data["contact"]
 
 
-def test_repeat_create_user(client, user):
+def test_repeat_create_user(client, user, monkeypatch):
+    mock_hash = MagicMock()
+    monkeypatch.setattr(auth_service, "get_password_hash", mock_hash)
     response = client.post(
         "/api/auth/signup",
         json=user,
@@ -24,6 +30,39 @@ def test_repeat_create_user(client, user):
     assert response.status_code == 409, response.text
     data = response.json()
     assert data["detail"] == "Account already exists"
+    mock_hash.assert_not_called()
+
+
+def test_signup_duplicate_phone(client, user, monkeypatch):
+    mock_send_email = MagicMock()
+    monkeypatch.setattr("src.routes.auth.send_email", mock_send_email)
+    response = client.post(
+        "/api/auth/signup",
+        json={**user, "email": "wolverine@example.com"},
+    )
+    assert response.status_code == 409, response.text
+    data = response.json()
+    assert data["detail"] == "Phone already registered"
+    mock_send_email.assert_not_called()
+
+
+def test_signup_idempotency_key(client, user, monkeypatch):
+    mock_send_email = MagicMock()
+    monkeypatch.setattr("src.routes.auth.send_email", mock_send_email)
+    body = {**user, "email": "retry@example.com", "phone": 5550101}
+    headers = {"Idempotency-Key": "signup-retry-1"}
+    first = client.post("/api/auth/signup", json=body, headers=headers)
+    assert first.status_code == 201, first.text
+    retry = client.post("/api/auth/signup", json=body, headers=headers)
+    assert retry.status_code == 201, retry.text
+    assert retry.content == first.content
+    assert retry.headers["idempotent-replayed"] == "true"
+    mock_send_email.assert_called_once()
+
+    other = client.post(
+        "/api/auth/signup", json={**body, "first_name": "Other"}, headers=headers
+    )
+    assert other.status_code == 422, other.text
 
 
 def test_login_user_not_confirmed(client, user):
@@ -63,6 +102,68 @@ def test_login_user(client, session, user):
     assert data["token_type"] == "bearer"
 
 
+def test_login_rehashes_other_cost(client, session, user):
+    contact = session.query(Contact).filter(Contact.email == user["email"]).first()
+    contact.password = bcrypt.using(rounds=4).hash(user["password"])
+    session.commit()
+    response = client.post(
+        "/api/auth/login",
+        data={"username": user.get("email"), "password": user.get("password")},
+    )
+    assert response.status_code == 200, response.text
+    session.expire_all()
+    contact = session.query(Contact).filter(Contact.email == user["email"]).first()
+    assert hash_cost(contact.password) == settings.bcrypt_rounds
+    assert auth_service.verify_password(user["password"], contact.password)
+    assert auth_service.password_report()["costs"]["4"]["verifications"] == 1
+
+
+def test_refresh_token_rotation(client, user):
+    response = client.post(
+        "/api/auth/login",
+        data={"username": user.get("email"), "password": user.get("password")},
+    )
+    first_token = response.json()["refresh_token"]
+    response = client.get(
+        "/api/auth/refresh_token",
+        headers={"Authorization": f"Bearer {first_token}"},
+    )
+    assert response.status_code == 200, response.text
+    second_token = response.json()["refresh_token"]
+    assert second_token != first_token
+
+    response = client.get(
+        "/api/auth/refresh_token",
+        headers={"Authorization": f"Bearer {first_token}"},
+    )
+    assert response.status_code == 401, response.text
+    assert response.json()["detail"] == "Invalid refresh token"
+
+    response = client.get(
+        "/api/auth/refresh_token",
+        headers={"Authorization": f"Bearer {second_token}"},
+    )
+    assert response.status_code == 401, response.text
+
+
+def test_refresh_token_per_device(client, session, user):
+    tokens = [
+        client.post(
+            "/api/auth/login",
+            data={"username": user.get("email"), "password": user.get("password")},
+        ).json()["refresh_token"]
+        for _ in range(2)
+    ]
+    for token in tokens:
+        response = client.get(
+            "/api/auth/refresh_token",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert response.status_code == 200, response.text
+    contact = session.query(Contact).filter(Contact.email == user.get("email")).first()
+    assert contact.refresh_token is None
+
+
 def test_login_wrong_password(client, user):
     response = client.post(
         "/api/auth/login",
@@ -0,0 +1,347 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.database.models import Contact, Roles
+from src.services.auth import auth_service
+from src.services.importer import shutdown_hash_pool
+
+
+@pytest.fixture(scope="module")
+def token(client, session, user):
+    monkeypatch = pytest.MonkeyPatch()
+    monkeypatch.setattr("src.routes.auth.send_email", MagicMock())
+    client.post("/api/auth/signup", json=user)
+    monkeypatch.undo()
+    current_user: Contact = (
+        session.query(Contact).filter(Contact.email == user.get("email")).first()
+    )
+    current_user.confirmed = True
+    current_user.roles = Roles.admin
+    session.commit()
+    response = client.post(
+        "/api/auth/login",
+        data={"username": user.get("email"), "password": user.get("password")},
+    )
+    return response.json()["access_token"]
+
+
+def auth_headers(token, **headers):
+    return {"Authorization": f"Bearer {token}", **headers}
+
+
+def test_read_users_me_cached(client, token, user):
+    hits = auth_service.cache_metrics["hits"]
+    for _ in range(2):
+        response = client.get("/api/contacts/me/", headers=auth_headers(token))
+        assert response.status_code == 200, response.text
+        assert response.json()["email"] == user.get("email")
+    assert auth_service.cache_metrics["hits"] == hits + 1
+
+
+def test_create_contact_duplicate_skips_hashing(client, token, user, monkeypatch):
+    mock_hash = MagicMock()
+    monkeypatch.setattr(auth_service, "get_password_hash", mock_hash)
+    response = client.post(
+        "/api/contacts/create", json=user, headers=auth_headers(token)
+    )
+    assert response.status_code == 409, response.text
+    assert response.json()["detail"] == "Such email already registered"
+    mock_hash.assert_not_called()
+
+
+def test_get_contacts(client, token, user):
+    response = client.get("/api/contacts/", headers=auth_headers(token))
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert [contact["email"] for contact in data] == [user.get("email")]
+    assert "password" not in data[0]
+
+
+def test_get_contacts_filtered(client, token, user):
+    month = int(user.get("birthday").split("-")[1])
+    response = client.get(
+        "/api/contacts/",
+        params={"role": "admin", "confirmed": True, "birthday_month": month},
+        headers=auth_headers(token),
+    )
+    assert [contact["email"] for contact in response.json()] == [user.get("email")]
+
+    response = client.get(
+        "/api/contacts/",
+        params={"confirmed": False, "created_to": "2000-01-01T00:00:00"},
+        headers=auth_headers(token),
+    )
+    assert response.json() == []
+
+
+def test_get_contacts_not_modified(client, token):
+    response = client.get("/api/contacts/", headers=auth_headers(token))
+    etag = response.headers["ETag"]
+    response = client.get(
+        "/api/contacts/", headers=auth_headers(token, **{"If-None-Match": etag})
+    )
+    assert response.status_code == 304, response.text
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+
+def test_get_contact_not_modified(client, token):
+    for path in ["/api/contacts/1", "/api/contacts/me/"]:
+        response = client.get(
+            path, headers=auth_headers(token, **{"If-None-Match": 'W/"1", W/"9"'})
+        )
+        assert response.status_code == 304, response.text
+        response = client.get(
+            path, headers=auth_headers(token, **{"If-None-Match": 'W/"9"'})
+        )
+        assert response.status_code == 200, response.text
+        assert response.headers["ETag"] == 'W/"1"'
+
+
+def test_get_contacts_fields(client, token, user):
+    response = client.get(
+        "/api/contacts/", params={"fields": "email,id"}, headers=auth_headers(token)
+    )
+    assert response.status_code == 200, response.text
+    assert response.json() == [{"id": 1, "email": user.get("email")}]
+    assert "ETag" in response.headers
+
+    response = client.get(
+        "/api/contacts/", params={"fields": "id,password"}, headers=auth_headers(token)
+    )
+    assert response.status_code == 422, response.text
+
+
+def test_get_contact_and_search_fields(client, token, user):
+    response = client.get(
+        "/api/contacts/1", params={"fields": "email"}, headers=auth_headers(token)
+    )
+    assert response.status_code == 200, response.text
+    assert response.json() == {"email": user.get("email")}
+    assert response.headers["ETag"] == 'W/"1"'
+
+    response = client.get(
+        f"/api/contacts/search_mail/{user.get('email')}",
+        params={"fields": "id"},
+        headers=auth_headers(token),
+    )
+    assert response.status_code == 200, response.text
+    assert response.json() == {"id": 1}
+
+
+def test_autocomplete(client, token, user):
+    response = client.get(
+        "/api/contacts/autocomplete", params={"q": "DEAD"}, headers=auth_headers(token)
+    )
+    assert response.status_code == 200, response.text
+    assert [suggestion["email"] for suggestion in response.json()] == [
+        user.get("email")
+    ]
+
+
+def test_rate_limit(client, token):
+    statuses = [
+        client.get("/api/contacts/1", headers=auth_headers(token)).status_code
+        for _ in range(3)
+    ]
+    assert statuses == [200, 200, 429]
+
+
+def test_get_contacts_batch(client, token, user):
+    response = client.post(
+        "/api/contacts/batch",
+        json={"ids": [99, 1], "emails": [user.get("email")]},
+        headers=auth_headers(token),
+    )
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert [result["found"] for result in data["results"]] == [False, True, True]
+    assert data["results"][1]["contact"]["email"] == user.get("email")
+    assert data["missing"] == 1
+
+
+def test_update_contact_if_match(client, token, user):
+    body = {**user, "first_name": "wade"}
+    response = client.put(
+        "/api/contacts/update/1",
+        json=body,
+        headers=auth_headers(token, **{"If-Match": 'W/"99"'}),
+    )
+    assert response.status_code == 412, response.text
+
+    response = client.put(
+        "/api/contacts/update/1",
+        json=body,
+        headers=auth_headers(token, **{"If-Match": 'W/"1"'}),
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["first_name"] == "wade"
+    assert response.headers["ETag"] == 'W/"2"'
+
+
+def test_export_contacts(client, token, user):
+    response = client.get("/api/contacts/export", headers=auth_headers(token))
+    assert response.status_code == 200, response.text
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert records[0]["email"] == user.get("email")
+
+
+def test_search_cached_until_contacts_change(client, token, user):
+    outcomes = []
+    for inquiry in ["EXAMPLE", "EXAMPLE", "example"]:
+        response = client.get(
+            f"/api/contacts/search/{inquiry}", headers=auth_headers(token)
+        )
+        assert response.status_code == 200, response.text
+        assert response.json()[0]["email"] == user.get("email")
+        outcomes.append(response.headers["X-Cache"])
+    assert outcomes == ["MISS", "HIT", "HIT"]
+
+    response = client.put(
+        "/api/contacts/update/1",
+        json={**user, "first_name": "wanda"},
+        headers=auth_headers(token),
+    )
+    assert response.status_code == 200, response.text
+    response = client.get("/api/contacts/search/Example", headers=auth_headers(token))
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.json()[0]["first_name"] == "wanda"
+
+
+def test_search_not_found_cached(client, token):
+    for outcome in ["MISS", "HIT"]:
+        response = client.get(
+            "/api/contacts/search_first_name/nobody", headers=auth_headers(token)
+        )
+        assert response.status_code == 404, response.text
+        assert response.json() == {"detail": "Not found"}
+        assert response.headers["X-Cache"] == outcome
+
+
+def test_bdays(client, token, user):
+    response = client.get("/bdays")
+    assert response.status_code == 200, response.text
+    assert [contact["email"] for contact in response.json()] == [user.get("email")]
+
+
+def test_full_text_search(client, token, session, user):
+    contact = Contact(
+        first_name="Dead",
+        last_name="Pool",
+        email="wilson@example.com",
+        phone=778,
+        password="secret",
+        avatar="avatar",
+    )
+    session.add(contact)
+    session.commit()
+
+    response = client.get(
+        "/api/contacts/search", params={"q": "DEAD"}, headers=auth_headers(token)
+    )
+    assert response.status_code == 200, response.text
+    assert [c["email"] for c in response.json()] == [
+        "wilson@example.com",
+        user.get("email"),
+    ]
+    response = client.get(
+        "/api/contacts/search",
+        params={"q": "dead po", "offset": 0, "limit": 5},
+        headers=auth_headers(token),
+    )
+    assert [c["email"] for c in response.json()] == ["wilson@example.com"]
+
+    session.delete(contact)
+    session.commit()
+
+
+def test_find_duplicates(client, token):
+    response = client.get("/api/contacts/duplicates", headers=auth_headers(token))
+    assert response.status_code == 200, response.text
+    assert response.json()["contacts_scanned"] == 1
+    assert response.json()["clusters"] == []
+
+
+def test_contact_stats(client, token):
+    response = client.get("/api/stats", headers=auth_headers(token))
+    assert response.status_code == 200, response.text
+    assert response.json()["total"] == 1
+    assert sum(response.json()["roles"].values()) == 1
+    response = client.post("/api/stats/reconcile", headers=auth_headers(token))
+    assert response.status_code == 200, response.text
+    assert response.json()["corrections"] == {}
+
+
+def test_contact_changes(client, token):
+    headers = auth_headers(token)
+    response = client.put("/api/changes/groups/crm?start=0", headers=headers)
+    assert response.status_code == 201, response.text
+    response = client.put("/api/changes/groups/crm", headers=headers)
+    assert response.status_code == 200, response.text
+    response = client.patch(
+        "/api/contacts/change_role/1", json={"roles": "admin"}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+
+    response = client.get("/api/changes/", headers=headers)
+    assert response.status_code == 200, response.text
+    changes = response.json()["changes"]
+    assert [change["op"] for change in changes] == ["role"]
+    assert changes[0]["roles"] == changes[0]["previous_roles"] == "admin"
+    assert response.json()["last_id"] == changes[-1]["id"]
+    response = client.get(
+        "/api/changes/", params={"after": changes[-1]["id"]}, headers=headers
+    )
+    assert response.json() == {"changes": [], "last_id": changes[-1]["id"]}
+    response = client.get("/api/changes/", params={"after": "x"}, headers=headers)
+    assert response.status_code == 422, response.text
+
+    response = client.get(
+        "/api/changes/groups/crm", params={"consumer": "sync-1"}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["changes"] == changes
+    response = client.post(
+        "/api/changes/groups/crm/ack",
+        json={"ids": [change["id"] for change in changes]},
+        headers=headers,
+    )
+    assert response.json() == {"acknowledged": len(changes)}
+    response = client.get(
+        "/api/changes/groups/missing", params={"consumer": "a"}, headers=headers
+    )
+    assert response.status_code == 404, response.text
+
+
+def test_live_changes_require_login(client):
+    response = client.get("/api/changes/live")
+    assert response.status_code == 401, response.text
+
+
+def test_logout(client, token):
+    response = client.post("/api/auth/logout", headers=auth_headers(token))
+    assert response.status_code == 204, response.text
+    response = client.get("/api/contacts/me/", headers=auth_headers(token))
+    assert response.status_code == 401, response.text
+
+
+def test_import_contacts(client, token):
+    csv = (
+        "first_name,last_name,email,password,phone,birthday\n"
+        "Ann,Brown,testann@test.com,qweasd,9990001,1990-01-04\n"
+        "Kim,Green,not-an-email,qweasd,9990002,1990-01-03\n"
+    )
+    try:
+        response = client.post(
+            "/api/contacts/import",
+            files={"file": ("contacts.csv", csv.encode(), "text/csv")},
+            headers=auth_headers(token),
+        )
+    finally:
+        shutdown_hash_pool()
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert (data["received"], data["inserted"], data["failed"]) == (2, 1, 1)
+    assert data["errors"][0]["row"] == 3
@@ -0,0 +1,35 @@
+import unittest
+
+from src.database.connect import (
+    LazySession,
+    checkout_metrics,
+    engine,
+    start_checkout_tracking,
+    finish_checkout_tracking,
+)
+
+
+class TestLazySession(unittest.TestCase):
+    def test_session_not_created_until_used(self):
+        db = LazySession()
+        self.assertFalse(db.started)
+        db.close()
+        self.assertFalse(db.started)
+
+    def test_session_created_on_first_use(self):
+        db = LazySession()
+        self.assertFalse(db.new)
+        self.assertTrue(db.started)
+        db.close()
+        self.assertFalse(db.started)
+
+    def test_checkout_tracking(self):
+        counter = start_checkout_tracking()
+        requests = checkout_metrics["requests"]
+        engine.pool.dispatch.checkout(None, None, None)
+        self.assertEqual(finish_checkout_tracking(counter), 1)
+        self.assertEqual(checkout_metrics["requests"], requests + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,19 +1,20 @@
 from datetime import date
 
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Session
 
-import src
-from src.database.models import Contact
+from src.database.models import Contact, ContactRow, Roles
 from src.schemas import ContactModel, UpdateContactRoleModel
 from src.repository.contacts import (
     get_contacts,
+    get_contacts_batch,
+    get_contacts_version,
     get_contact,
     create_contact,
-    check_exist_mail,
-    update_token,
+    insert_contacts,
     update_contact,
     change_contact_role,
     delete_contact,
@@ -21,8 +22,12 @@ from src.repository.contacts import (
     search_last_name,
     search_by_mail,
     search_by_mail_ilike_method,
+    search_contacts,
     confirmed_email,
     update_avatar,
+    ContactConflict,
+    ContactVersionConflict,
+    _update_statement,
 )
 
 # python -m unittest -v tests/test_unit_repository_contacts.py
@@ -46,11 +51,53 @@ class TestContacts(unittest.IsolatedAsyncioTestCase):
         result = await get_contact(contact_id=1, db=self.session)
         self.assertEqual(result, contact)
 
+    def assertRowsMatch(self, rows, contacts):
+        self.assertEqual(len(rows), len(contacts))
+        for row, contact in zip(rows, contacts):
+            self.assertIsInstance(row, ContactRow)
+            for field in row.fields:
+                self.assertEqual(getattr(row, field), getattr(contact, field))
+
     async def test_get_contacts(self):
-        contacts = [Contact(), Contact, Contact()]
+        contacts = [Contact(id=1), self.contact, Contact(id=3)]
         self.session.query().all.return_value = contacts
         result = await get_contacts(db=self.session)
-        self.assertEqual(result, contacts)
+        self.assertRowsMatch(result, contacts)
+
+    async def test_get_contacts_fields(self):
+        rows = [(1, "a@test.com")]
+        self.session.query().all.return_value = rows
+        result = await get_contacts(db=self.session, fields=["id", "email"])
+        self.assertEqual(result, rows)
+        self.session.query.assert_called_with(Contact.id, Contact.email)
+
+    async def test_get_contacts_batch(self):
+        contacts = [Contact(id=1), self.contact]
+        self.session.query().filter().all.return_value = contacts
+        result = await get_contacts_batch(
+            ids=[1], emails=[self.contact.email], db=self.session
+        )
+        self.assertRowsMatch(result, contacts)
+
+    async def test_get_contacts_batch_empty(self):
+        result = await get_contacts_batch(ids=[], emails=[], db=self.session)
+        self.assertEqual(result, [])
+        self.session.query.assert_not_called()
+
+    async def test_get_contacts_version(self):
+        self.session.query().one.return_value = (3, 7, 12)
+        result = await get_contacts_version(db=self.session)
+        self.assertEqual(result, (3, 7, 12))
+
+    async def test_search_contacts_without_words(self):
+        result = await search_contacts(inquiry="@-.", db=self.session)
+        self.assertEqual(result, [])
+        self.session.query.assert_not_called()
+
+    def test_contact_row_has_no_secrets(self):
+        row = ContactRow(self.contact)
+        self.assertFalse(hasattr(row, "password"))
+        self.assertFalse(hasattr(row, "__dict__"))
 
     async def test_create_contact(self):
         body = ContactModel(
@@ -62,13 +109,20 @@ class TestContacts(unittest.IsolatedAsyncioTestCase):
             password="qweasd",
             refresh_token="abcd",
         )
-        result = await create_contact(body=body, db=self.session)
-        self.assertEqual(result.first_name, body.first_name)
-        self.assertEqual(result.last_name, body.last_name)
-        self.assertEqual(result.email, body.email)
-        self.assertEqual(result.phone, body.phone)
+        created = Contact(
+            id=1, first_name=body.first_name, last_name=body.last_name, email=body.email
+        )
+        self.session.execute.return_value.first.return_value = created
+        hash_password = MagicMock(return_value="hashed")
+        result = await create_contact(
+            body=body, db=self.session, hash_password=hash_password
+        )
+        self.assertRowsMatch([result], [created])
+        hash_password.assert_called_once_with(body.password)
+        self.assertEqual(self.session.execute.call_count, 2)
+        self.session.commit.assert_called_once()
 
-    def test_check_exist_mail(self):
+    async def test_create_contact_conflict(self):
         body = ContactModel(
             first_name="Nick",
             last_name="White",
@@ -77,16 +131,21 @@ class TestContacts(unittest.IsolatedAsyncioTestCase):
             birthday=date.today(),
             password="qweasd",
         )
-        self.session.query().filter_by(email=body.email).first.return_value = body
-        result = check_exist_mail(body=body, db=self.session)
-        self.assertEqual(result.email, body.email)
+        self.session.execute.return_value.first.return_value = None
+        self.session.query().filter().first.return_value = Contact(email="other@test.com")
+        hash_password = MagicMock()
+        with self.assertRaises(ContactConflict) as e:
+            await create_contact(body=body, db=self.session, hash_password=hash_password)
+        self.assertEqual(e.exception.field, "phone")
+        hash_password.assert_not_called()
+        self.session.rollback.assert_called_once()
 
-    async def test_update_token(self):
-        token = "12345"
-        contact = Contact()
-        contact_refresh_token_before_update = contact.refresh_token
-        result = await update_token(contact=contact, token=token, db=self.session)
-        self.assertNotEqual(contact.refresh_token, contact_refresh_token_before_update)
+    async def test_insert_contacts_rolls_back(self):
+        self.session.execute.side_effect = RuntimeError("database is locked")
+        with self.assertRaises(RuntimeError):
+            await insert_contacts([{"email": "testnick@test.com"}], self.session)
+        self.session.rollback.assert_called_once()
+        self.session.commit.assert_not_called()
 
     async def test_update_contact(self):
         body = ContactModel(
@@ -97,60 +156,107 @@ class TestContacts(unittest.IsolatedAsyncioTestCase):
             birthday=date.today(),
             password="qweasd",
         )
-        contact = ContactModel(
-            first_name="Mike",
-            last_name="Black",
-            email="testmike@test.com",
-            phone=777,
+        updated = Contact(
+            id=1,
+            first_name=body.first_name,
+            last_name=body.last_name,
+            email=body.email,
+            version=2,
+        )
+        self.session.execute().first.return_value = updated
+        result = await update_contact(body=body, contact_id=1, db=self.session)
+        self.assertRowsMatch([result], [updated])
+        self.session.commit.assert_called_once()
+
+    async def test_update_contact_not_found(self):
+        body = ContactModel(
+            first_name="Nick",
+            last_name="White",
+            email="testnick@test.com",
+            phone=555,
             birthday=date.today(),
             password="qweasd",
         )
-        self.session.query().filter_by(id=1).first.return_value = contact
-        self.session.commit.return_value = None
-        result = await update_contact(body=body, contact_id=1, db=self.session)
-        self.assertEqual(result, contact)
-        self.assertEqual(result.first_name, body.first_name)
-        self.assertEqual(result.last_name, body.last_name)
-        self.assertEqual(result.email, body.email)
-        self.assertEqual(result.phone, body.phone)
+        self.session.execute().first.return_value = None
+        self.session.query().filter().first.return_value = None
+        result = await update_contact(
+            body=body, contact_id=1, db=self.session, version=1
+        )
+        self.assertIsNone(result)
+
+    async def test_update_contact_version_conflict(self):
+        body = ContactModel(
+            first_name="Nick",
+            last_name="White",
+            email="testnick@test.com",
+            phone=555,
+            birthday=date.today(),
+            password="qweasd",
+        )
+        self.session.execute().first.return_value = None
+        self.session.query().filter().first.return_value = (1,)
+        with self.assertRaises(ContactVersionConflict):
+            await update_contact(body=body, contact_id=1, db=self.session, version=1)
 
     async def test_change_contact_role(self):
         body = UpdateContactRoleModel(roles="admin")
-        contact = Contact()
-        self.session.query().filter_by(id=1).first.return_value = contact
+        updated = Contact(id=1, roles=Roles.admin, version=2)
+        self.session.execute().first.return_value = updated
         result = await change_contact_role(
             body=body,
-            contact_id=contact.id,
+            contact_id=1,
             db=self.session,
         )
-        self.assertEqual(result.roles, contact.roles)
+        self.assertRowsMatch([result], [updated])
+
+    async def test_change_contact_role_version_changed(self):
+        body = UpdateContactRoleModel(roles="admin")
+        self.session.query().filter().first.return_value = MagicMock(version=2)
+        with self.assertRaises(ContactVersionConflict):
+            await change_contact_role(
+                body=body, contact_id=1, db=self.session, version=1
+            )
+
+    def test_update_statement_returns_previous_values(self):
+        stmt = _update_statement(
+            Contact.id == 1, {"roles": Roles.admin}, previous_columns=[Contact.roles]
+        )
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        self.assertIn("FOR UPDATE) AS \"old\"", sql)
+        self.assertTrue(sql.endswith('"old".role AS previous_roles'))
 
     async def test_delete_contact(self):
-        contact = Contact()
-        self.session.query().filter_by().first.return_value = contact
-        result = await delete_contact(contact_id=contact.id, db=self.session)
-        self.assertEqual(result, contact)
+        deleted = Contact(id=1)
+        self.session.execute().first.return_value = deleted
+        result = await delete_contact(contact_id=1, db=self.session)
+        self.assertRowsMatch([result], [deleted])
+        self.session.commit.assert_called_once()
+
+    async def test_delete_contact_not_found(self):
+        self.session.execute().first.return_value = None
+        result = await delete_contact(contact_id=1, db=self.session)
+        self.assertIsNone(result)
 
     async def test_search_first_name(self):
         inquiry = "Kim"
-        contacts = [Contact(), Contact()]
-        self.session.query().filter_by(first_name=inquiry).all.return_value = contacts
+        contacts = [Contact(first_name=inquiry), Contact(first_name=inquiry)]
+        self.session.query().filter().all.return_value = contacts
         result = await search_first_name(inquiry=inquiry, db=self.session)
-        self.assertEqual(result, contacts)
+        self.assertRowsMatch(result, contacts)
 
     async def test_search_last_name(self):
         inquiry = "White"
-        contacts = [Contact(), Contact()]
-        self.session.query().filter_by(last_name=inquiry).all.return_value = contacts
-        result = await search_first_name(inquiry=inquiry, db=self.session)
-        self.assertEqual(result, contacts)
+        contacts = [Contact(last_name=inquiry), Contact(last_name=inquiry)]
+        self.session.query().filter().all.return_value = contacts
+        result = await search_last_name(inquiry=inquiry, db=self.session)
+        self.assertRowsMatch(result, contacts)
 
     async def test_search_by_mail(self):
         inquiry = "test1@test.com"
-        contacts = [Contact(), Contact()]
-        self.session.query().filter_by(email=inquiry).all.return_value = contacts
-        result = await search_first_name(inquiry=inquiry, db=self.session)
-        self.assertEqual(result, contacts)
+        contact = Contact(email=inquiry)
+        self.session.query().filter_by(email=inquiry).first.return_value = contact
+        result = await search_by_mail(inquiry=inquiry, db=self.session)
+        self.assertEqual(result, contact)
 
     async def test_search_by_mail_ilike_method(self):
         inquiry = "TEST1@test.com"
@@ -159,39 +265,21 @@ class TestContacts(unittest.IsolatedAsyncioTestCase):
             Contact.email.ilike(f"%{inquiry}%")
         ).all.return_value = contacts
         result = await search_by_mail_ilike_method(inquiry=inquiry, db=self.session)
-        self.assertEqual(result, contacts)
+        self.assertRowsMatch(result, contacts)
 
     async def test_confirmed_email(self):
-        with patch.object(src.repository.contacts, "search_by_mail") as search_mock:
-            search_mock.return_value = Contact(
-                first_name="Mike",
-                last_name="Black",
-                email="testmike@test.com",
-                phone=777,
-                birthday=date.today(),
-                password="qweasd",
-                confirmed=None,
-            )
-            contact = search_mock.return_value
-            result = await confirmed_email(email=contact.email, db=self.session)
-            self.assertTrue(contact.confirmed)
+        await confirmed_email(email=self.contact.email, db=self.session)
+        self.session.execute.assert_called_once()
+        self.session.commit.assert_called_once()
 
     async def test_update_avatar(self):
-        with patch.object(src.repository.contacts, "search_by_mail") as search_mock:
-            search_mock.return_value = Contact(
-                first_name="Mike",
-                last_name="Black",
-                email="testmike@test.com",
-                phone=777,
-                birthday=date.today(),
-                password="qweasd",
-                confirmed=None,
-            )
-            new_avatar = "new_avatar"
-            result = await update_avatar(
-                email=search_mock.return_value.email, url=new_avatar, db=self.session
-            )
-            self.assertEqual(search_mock.return_value.avatar, new_avatar)
+        new_avatar = "new_avatar"
+        updated = Contact(id=1, email=self.contact.email, avatar=new_avatar)
+        self.session.execute.return_value.first.return_value = updated
+        result = await update_avatar(
+            email=self.contact.email, url=new_avatar, db=self.session
+        )
+        self.assertEqual(result.avatar, new_avatar)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,70 @@
+import unittest
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Base, Contact, Roles
+from src.repository.contacts import filter_contacts
+
+# Every supported filter combination must be answered through an index; the
+# planner may pick either of two equally good ones.
+SUPPORTED_FILTERS = [
+    {
+        "role": Roles.moderator,
+        "confirmed": False,
+        "created_from": datetime(2023, 1, 1),
+        "created_to": datetime(2023, 2, 1),
+    },
+    {"role": Roles.moderator, "confirmed": False},
+    {"confirmed": False},
+    {"role": Roles.user},
+    {"role": Roles.user, "confirmed": True, "marital_status": False},
+    {"role": Roles.admin, "created_from": datetime(2023, 1, 1)},
+    {"created_from": datetime(2023, 1, 1), "created_to": datetime(2023, 2, 1)},
+    {"created_to": datetime(2023, 2, 1), "marital_status": True},
+    {"birthday_month": 3},
+    {"birthday_month": 3, "confirmed": True},
+]
+
+
+class TestContactFilterIndexes(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=cls.engine)
+        cls.session = sessionmaker(bind=cls.engine)()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.session.close()
+
+    def query_plan(self, filters):
+        query = filter_contacts(
+            self.session.query(Contact.id, Contact.email), **filters
+        )
+        sql = query.statement.compile(
+            self.engine, compile_kwargs={"literal_binds": True}
+        )
+        rows = self.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+        return " ".join(row[-1] for row in rows)
+
+    def test_supported_filters_use_an_index(self):
+        for filters in SUPPORTED_FILTERS:
+            with self.subTest(filters=filters):
+                self.assertRegex(self.query_plan(filters), r"USING INDEX ix_contacts_")
+
+    def test_unconfirmed_filter_uses_partial_index(self):
+        self.assertIn(
+            "ix_contacts_unconfirmed_role_created_at",
+            self.query_plan({"confirmed": False}),
+        )
+
+    def test_birthday_month_uses_expression_index(self):
+        self.assertIn(
+            "ix_contacts_birthday_month", self.query_plan({"birthday_month": 3})
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
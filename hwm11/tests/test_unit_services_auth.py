@@ -0,0 +1,34 @@
+import asyncio
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from src.services.auth import auth_service
+from src.services.cache import get_cache
+
+
+def find_by_mail(email, db):
+    time.sleep(0.05)
+    return SimpleNamespace(email=email)
+
+
+class TestGetCurrentUser(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        get_cache().clear()
+
+    async def test_concurrent_loads_get_their_own_user(self):
+        token = await auth_service.create_access_token({"sub": "ann@example.com"})
+        with patch(
+            "src.repository.contacts.find_by_mail", side_effect=find_by_mail
+        ) as find:
+            users = await asyncio.gather(
+                *(auth_service.get_current_user(token, MagicMock()) for _ in range(3))
+            )
+        find.assert_called_once()
+        self.assertEqual({user.email for user in users}, {"ann@example.com"})
+        self.assertEqual(len({id(user) for user in users}), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
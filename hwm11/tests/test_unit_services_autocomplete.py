@@ -0,0 +1,89 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.database.models import ContactExportRow
+from src.services.autocomplete import AutocompleteIndex
+from src.services.cache import MemoryCacheBackend
+from src.services.events import ContactEvent
+
+
+def contact(contact_id, first_name, last_name, email):
+    row = MagicMock(
+        id=contact_id, first_name=first_name, last_name=last_name, email=email
+    )
+    return ContactExportRow(row)
+
+
+class TestAutocompleteIndex(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.index = AutocompleteIndex(cache=MemoryCacheBackend())
+        self.contacts = [
+            contact(1, "Anna", "Smith", "anna@example.com"),
+            contact(2, "Andrew", "Anderson", "drew@example.com"),
+            contact(3, "Bob", "Annis", "bob@example.com"),
+        ]
+
+    async def suggest(self, prefix, limit=10):
+        with patch(
+            "src.repository.contacts.stream_contacts",
+            return_value=iter(self.contacts),
+        ):
+            suggestions = await self.index.suggest(prefix, limit, MagicMock())
+        return [json.loads(suggestion)["id"] for suggestion in suggestions]
+
+    async def test_prefix_over_all_fields(self):
+        self.assertEqual(await self.suggest("AN"), [2, 1, 3])
+        self.assertEqual(await self.suggest("drew@"), [2])
+        self.assertEqual(await self.suggest("an", limit=2), [2, 1])
+        self.assertEqual(await self.suggest("z"), [])
+        self.assertEqual(self.index.metrics["builds"], 1)
+
+    async def test_events_replace_suggestions(self):
+        await self.suggest("a")
+        await self.index.patch(
+            [
+                ContactEvent(
+                    ContactEvent.UPDATE, contact(1, "Zoe", "Smith", "zoe@example.com")
+                ),
+                ContactEvent(ContactEvent.DELETE, self.contacts[2]),
+                ContactEvent(
+                    ContactEvent.CREATE, contact(4, "Zed", "Young", "zed@example.com")
+                ),
+            ]
+        )
+        self.assertEqual(await self.suggest("an"), [2])
+        self.assertEqual(await self.suggest("z"), [4, 1])
+
+    async def test_changes_during_build_are_kept(self):
+        loop = asyncio.get_running_loop()
+        renamed = contact(1, "Zoe", "Smith", "zoe@example.com")
+
+        def scan(db):
+            # The contact changes after the scan has read it.
+            yield from self.contacts
+            asyncio.run_coroutine_threadsafe(
+                self.index.patch([ContactEvent(ContactEvent.UPDATE, renamed)]), loop
+            ).result()
+
+        with patch("src.repository.contacts.stream_contacts", scan), patch(
+            "src.repository.contacts.get_contacts_batch",
+            AsyncMock(return_value=[renamed]),
+        ):
+            await self.index.suggest("a", 10, MagicMock())
+        self.assertEqual(await self.suggest("z"), [1])
+        self.assertEqual(await self.suggest("an"), [2, 3])
+
+    async def test_stale_index_is_rebuilt(self):
+        await self.suggest("a")
+        old = (await self.index.cache.get(self.index.current_key)).decode()
+        await self.index.cache.delete(self.index.fresh_key)
+        self.contacts.pop()
+        self.assertEqual(await self.suggest("an"), [2, 1])
+        self.assertEqual(self.index.metrics["builds"], 2)
+        self.assertFalse(await self.index.cache.exists(f"autocomplete:{old}"))
+
+
+if __name__ == "__main__":
+    unittest.main()
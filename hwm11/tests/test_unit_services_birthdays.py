@@ -0,0 +1,121 @@
+import asyncio
+import json
+import unittest
+from datetime import date, datetime
+from unittest.mock import MagicMock, patch
+
+from src.database.models import ContactExportRow
+from src.services.birthdays import UpcomingBirthdays, day_score
+from src.services.cache import MemoryCacheBackend
+from src.services.events import ContactEvent
+
+
+def contact(contact_id, birthday, first_name="bob"):
+    row = MagicMock(
+        id=contact_id,
+        first_name=first_name,
+        last_name="smith",
+        email=f"bob{contact_id}@example.com",
+        created_at=datetime(2023, 1, 1),
+        avatar="avatar",
+        version=1,
+        phone=contact_id,
+        birthday=birthday,
+        roles=None,
+        confirmed=True,
+    )
+    return ContactExportRow(row)
+
+
+class TestUpcomingBirthdays(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.cache = MemoryCacheBackend()
+        self.birthdays = UpcomingBirthdays(days=7, cache=self.cache)
+        self.today = date.today()
+
+    async def build(self, *contacts):
+        with patch(
+            "src.repository.contacts.stream_contacts", return_value=iter(contacts)
+        ):
+            return await self.birthdays.upcoming(MagicMock())
+
+    def test_windows_span_new_year(self):
+        self.assertEqual(self.birthdays.windows(date(2023, 3, 1)), [(301, 308)])
+        self.assertEqual(
+            self.birthdays.windows(date(2023, 12, 28)), [(1228, 1231), (101, 104)]
+        )
+
+    async def test_only_upcoming_month_and_day(self):
+        upcoming = contact(1, self.today.replace(year=1990))
+        members = await self.build(upcoming, contact(2, None))
+        self.assertEqual([json.loads(m)["id"] for m in members], [1])
+        self.assertEqual(self.birthdays.metrics["builds"], 1)
+
+        await self.build()
+        self.assertEqual(self.birthdays.metrics["builds"], 1)
+
+    async def test_events_patch_current_set(self):
+        await self.build(contact(1, self.today))
+        await self.birthdays.patch(
+            [
+                ContactEvent(ContactEvent.UPDATE, contact(1, self.today, "wade")),
+                ContactEvent(ContactEvent.CREATE, contact(2, self.today)),
+            ]
+        )
+        members = await self.build()
+        self.assertEqual(
+            sorted((json.loads(m)["id"], json.loads(m)["first_name"]) for m in members),
+            [(1, "wade"), (2, "bob")],
+        )
+
+        await self.birthdays.patch([ContactEvent(ContactEvent.DELETE, contact(1, None))])
+        members = await self.build()
+        self.assertEqual([json.loads(m)["id"] for m in members], [2])
+
+    async def current_key(self):
+        version = await self.cache.get(self.birthdays.current_key)
+        return f"birthdays:{version.decode()}"
+
+    async def test_build_replaces_previous_version(self):
+        with patch(
+            "src.repository.contacts.stream_contacts",
+            return_value=iter([contact(1, self.today), contact(2, None)]),
+        ):
+            self.assertEqual(await self.birthdays.build(MagicMock()), 1)
+        key = await self.current_key()
+        member = await self.cache.hget(f"{key}:members", "1")
+        self.assertEqual(json.loads(member)["id"], 1)
+        self.assertIsNone(await self.cache.hget(f"{key}:members", "2"))
+
+        with patch("src.repository.contacts.stream_contacts", return_value=iter([])):
+            await self.birthdays.build(MagicMock())
+        self.assertNotEqual(await self.current_key(), key)
+        self.assertFalse(await self.cache.exists(key))
+        self.assertFalse(await self.cache.exists(f"{key}:members"))
+
+    async def test_same_day_rebuild_serves_previous_set(self):
+        await self.build(contact(1, self.today))
+        served = []
+
+        def scan(db):
+            # Requests during the scan still get the previous set.
+            served.append(
+                asyncio.run_coroutine_threadsafe(
+                    self.birthdays.upcoming(MagicMock()), loop
+                ).result()
+            )
+            yield contact(1, self.today)
+
+        loop = asyncio.get_running_loop()
+        with patch("src.repository.contacts.stream_contacts", scan):
+            await self.birthdays.build(MagicMock())
+        self.assertEqual([json.loads(m)["id"] for m in served[0]], [1])
+        self.assertEqual([json.loads(m)["id"] for m in await self.build()], [1])
+        self.assertEqual(self.birthdays.metrics["builds"], 2)
+
+    def test_day_score(self):
+        self.assertEqual(day_score(date(2000, 2, 29)), 229)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from redis.exceptions import ConnectionError
+
+from src.services.cache import (
+    MemoryCacheBackend,
+    NullCacheBackend,
+    RedisCacheBackend,
+    SingleFlight,
+    StreamReadersBusy,
+    jittered_ttl,
+)
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_loads_are_coalesced(self):
+        single_flight = SingleFlight()
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "user"
+
+        results = await asyncio.gather(
+            *(single_flight.do("user:a", loader) for _ in range(5))
+        )
+        self.assertEqual(results, ["user"] * 5)
+        self.assertEqual(calls, 1)
+        self.assertEqual(single_flight.metrics, {"loads": 1, "coalesced": 4})
+        self.assertFalse(single_flight.in_flight("user:a"))
+
+    async def test_errors_reach_all_waiters(self):
+        single_flight = SingleFlight()
+
+        async def loader():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            *(single_flight.do("user:a", loader) for _ in range(3)),
+            return_exceptions=True,
+        )
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+
+    async def test_cancelled_caller_does_not_fail_waiters(self):
+        single_flight = SingleFlight()
+
+        async def loader():
+            await asyncio.sleep(0.01)
+            return "user"
+
+        first = asyncio.create_task(single_flight.do("user:a", loader))
+        second = asyncio.create_task(single_flight.do("user:a", loader))
+        await asyncio.sleep(0)
+        first.cancel()
+        self.assertEqual(await second, "user")
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+        self.assertEqual(single_flight.metrics, {"loads": 1, "coalesced": 1})
+        self.assertFalse(single_flight.in_flight("user:a"))
+
+
+class TestMemoryCacheBackend(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.cache = MemoryCacheBackend(max_entries=2)
+
+    async def test_lru_eviction(self):
+        await self.cache.set("user:a", b"1")
+        await self.cache.set("user:b", b"2")
+        await self.cache.get("user:a")
+        await self.cache.set("user:c", b"3")
+        self.assertEqual(await self.cache.get("user:a"), b"1")
+        self.assertIsNone(await self.cache.get("user:b"))
+
+    async def test_state_is_never_evicted(self):
+        await self.cache.set("revoked:jti", b"1", ex=60)
+        await self.cache.incr("stats:total")
+        for i in range(10):
+            await self.cache.set(f"response:{i}", b"1")
+            await self.cache.incr(f"rate:{i}", ex=60)
+        self.assertTrue(await self.cache.exists("revoked:jti"))
+        self.assertEqual(await self.cache.get("stats:total"), b"1")
+        self.assertEqual(len(self.cache._data), 2)
+        self.assertEqual(len(self.cache._state), 2)
+
+    async def test_ttl(self):
+        await self.cache.set("a", b"1", ex=0)
+        self.assertIsNone(await self.cache.get("a"))
+        await self.cache.set("b", b"1", ex=60)
+        self.assertEqual(await self.cache.ttl("b"), 60)
+        self.assertEqual(await self.cache.ttl("c"), -2)
+
+    async def test_set_nx(self):
+        self.assertTrue(await self.cache.set("a", b"1", nx=True))
+        self.assertFalse(await self.cache.set("a", b"2", nx=True))
+        self.assertEqual(await self.cache.get("a"), b"1")
+
+    async def test_incr(self):
+        self.assertEqual(await self.cache.incr("a", ex=60), 1)
+        self.assertEqual(await self.cache.incr("a", ex=60), 2)
+        self.assertEqual(await self.cache.get("a"), b"2")
+        self.assertEqual(await self.cache.incr("a", amount=-3), -1)
+        self.assertEqual(await self.cache.mget("a", "b"), [b"-1", None])
+
+    async def test_sorted_sets(self):
+        self.assertEqual(await self.cache.zadd("z", {b"b": 2, b"a": 2, b"c": 1}), 3)
+        self.assertEqual(await self.cache.zadd("z", {b"c": 3}), 0)
+        self.assertEqual(await self.cache.zrangebyscore("z", 2, 3), [b"a", b"b", b"c"])
+        self.assertEqual(await self.cache.zrem("z", b"a", b"x"), 1)
+        self.assertEqual(await self.cache.zrangebyscore("z", 0, 2), [b"b"])
+
+    async def test_sorted_set_lex_ranges(self):
+        await self.cache.zadd("z", dict.fromkeys([b"ab", b"abc", b"b", b"a"], 0))
+        self.assertEqual(
+            await self.cache.zrangebylex("z", b"[ab", b"[ab\xff"), [b"ab", b"abc"]
+        )
+        self.assertEqual(
+            await self.cache.zrangebylex("z", b"(a", b"(b"), [b"ab", b"abc"]
+        )
+        self.assertEqual(
+            await self.cache.zrangebylex("z", b"-", b"+", 1, 2), [b"ab", b"abc"]
+        )
+
+    async def test_streams(self):
+        first = await self.cache.xadd("s", {"n": "1"})
+        second = await self.cache.xadd("s", {"n": "2"}, maxlen=1)
+        self.assertEqual(await self.cache.xrange("s"), [(second, {"n": "2"})])
+        self.assertEqual(await self.cache.xread("s", first), [(second, {"n": "2"})])
+        self.assertEqual(await self.cache.xread("s", second, block=10), [])
+
+
+class TestRedisCacheBackend(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.shared = MagicMock(xread=AsyncMock(return_value=[]))
+        self.blocking = MagicMock(
+            xread=AsyncMock(return_value=[]), xreadgroup=AsyncMock()
+        )
+        for target, client in (
+            ("src.services.cache.get_redis", self.shared),
+            ("src.services.cache.get_blocking_redis", self.blocking),
+        ):
+            patcher = patch(target, return_value=client)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.cache = RedisCacheBackend()
+
+    async def test_blocking_reads_use_their_own_pool(self):
+        await self.cache.xread("s", "0")
+        self.shared.xread.assert_awaited_once()
+        await self.cache.xread("s", "0", block=5000)
+        self.blocking.xread.assert_awaited_once()
+
+    async def test_exhausted_blocking_pool(self):
+        self.blocking.xreadgroup.side_effect = ConnectionError(
+            "No connection available."
+        )
+        with self.assertRaises(StreamReadersBusy):
+            await self.cache.xreadgroup("s", "crm", "a", block=5000)
+
+
+class TestNullCacheBackend(unittest.IsolatedAsyncioTestCase):
+    async def test_stores_nothing(self):
+        cache = NullCacheBackend()
+        self.assertTrue(await cache.set("a", b"1"))
+        self.assertIsNone(await cache.get("a"))
+        self.assertEqual(await cache.incr("a"), 0)
+
+
+class TestJitteredTtl(unittest.TestCase):
+    def test_jittered_ttl_bounds(self):
+        ttls = {jittered_ttl(900, 0.1) for _ in range(200)}
+        self.assertTrue(all(810 <= ttl <= 990 for ttl in ttls))
+        self.assertGreater(len(ttls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
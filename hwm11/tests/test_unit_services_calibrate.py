@@ -0,0 +1,38 @@
+import pathlib
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.services.auth import hash_cost
+from src.services.calibrate import calibrate, measure, write_env
+
+
+class TestCalibrate(unittest.TestCase):
+    def test_highest_cost_within_target(self):
+        latencies = {10: 60.0, 11: 120.0, 12: 240.0, 13: 480.0}
+        with patch("src.services.calibrate.measure", side_effect=latencies.get):
+            self.assertEqual(calibrate(250, 10, 16, 1), (12, latencies))
+
+    def test_min_rounds_even_if_slow(self):
+        with patch("src.services.calibrate.measure", return_value=500.0):
+            rounds, latencies = calibrate(250, 10, 16, 1)
+        self.assertEqual((rounds, list(latencies)), (10, [10]))
+
+    def test_measure(self):
+        self.assertGreater(measure(4, samples=1), 0)
+
+    def test_write_env(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / ".env"
+            path.write_text("REDIS_HOST=redis")
+            write_env(path, 11)
+            write_env(path, 13)
+            self.assertEqual(path.read_text(), "REDIS_HOST=redis\nBCRYPT_ROUNDS=13\n")
+
+    def test_hash_cost(self):
+        self.assertEqual(hash_cost("$2b$12$" + "a" * 53), 12)
+        self.assertIsNone(hash_cost("!"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.database.models import ContactExportRow, Roles
+from src.services.cache import MemoryCacheBackend, NoSuchGroup
+from src.services.changes import ContactChangeStream, is_stream_id, render_change
+from src.services.events import ContactEvent
+
+
+def contact(contact_id, version=1, roles=Roles.user):
+    return ContactExportRow(MagicMock(id=contact_id, version=version, roles=roles))
+
+
+class TestRenderChange(unittest.TestCase):
+    def test_compact_entries(self):
+        self.assertEqual(
+            render_change(ContactEvent(ContactEvent.UPDATE, contact(1, 2))),
+            {"op": "update", "contact_id": "1", "version": "2"},
+        )
+        event = ContactEvent(
+            ContactEvent.ROLE, contact(1, 3, Roles.admin), {"roles": Roles.user}
+        )
+        self.assertEqual(render_change(event)["roles"], "admin")
+        self.assertEqual(render_change(event)["previous_roles"], "user")
+
+    def test_is_stream_id(self):
+        self.assertTrue(is_stream_id("0"))
+        self.assertTrue(is_stream_id("1700000000000-3"))
+        self.assertFalse(is_stream_id("$"))
+        self.assertFalse(is_stream_id("1-2-3"))
+
+
+class TestContactChangeStream(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.changes = ContactChangeStream(maxlen=3, cache=MemoryCacheBackend())
+
+    async def publish(self, *ids):
+        await self.changes.publish(
+            [ContactEvent(ContactEvent.CREATE, contact(i)) for i in ids]
+        )
+
+    async def test_replay_is_bounded(self):
+        await self.publish(1, 2, 3, 4)
+        changes = await self.changes.replay("0", 10)
+        self.assertEqual([c["contact_id"] for c in changes], ["2", "3", "4"])
+        after = await self.changes.replay(changes[0]["id"], 1)
+        self.assertEqual([c["contact_id"] for c in after], ["3"])
+
+    async def test_batches_are_appended_at_once(self):
+        cache = self.changes.cache
+        with patch.object(cache, "xadd_many", wraps=cache.xadd_many) as xadd_many:
+            await self.publish(1, 2, 3)
+        xadd_many.assert_called_once()
+        self.assertEqual(len(xadd_many.call_args.args[1]), 3)
+        self.assertEqual(self.changes.metrics["published"], 3)
+        self.assertEqual(len(await self.changes.replay("0", 10)), 3)
+
+    async def test_consumer_groups(self):
+        await self.publish(1)
+        self.assertTrue(await self.changes.create_group("crm"))
+        self.assertFalse(await self.changes.create_group("crm"))
+        await self.publish(2, 3)
+
+        first = await self.changes.read_group("crm", "a", 1)
+        second = await self.changes.read_group("crm", "b", 10)
+        self.assertEqual([c["contact_id"] for c in first], ["2"])
+        self.assertEqual([c["contact_id"] for c in second], ["3"])
+        self.assertEqual(await self.changes.read_group("crm", "a", 10), [])
+
+        self.assertEqual(await self.changes.read_group("crm", "a", 10, pending=True), first)
+        self.assertEqual(await self.changes.ack("crm", [first[0]["id"], "1-0"]), 1)
+        self.assertEqual(await self.changes.read_group("crm", "a", 10, pending=True), [])
+
+        await self.changes.create_group("search", "0")
+        everything = await self.changes.read_group("search", "a", 10)
+        self.assertEqual([c["contact_id"] for c in everything], ["1", "2", "3"])
+
+    async def test_missing_group(self):
+        with self.assertRaises(NoSuchGroup):
+            await self.changes.read_group("missing", "a", 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from types import SimpleNamespace
+
+from src.services.duplicates import (
+    Record,
+    find_duplicates,
+    minhash,
+    ngrams,
+    normalize_email,
+    score_pair,
+    soundex,
+)
+
+
+def contact(contact_id, first_name, last_name, email, phone, confirmed=False):
+    return SimpleNamespace(
+        id=contact_id,
+        first_name=first_name,
+        last_name=last_name,
+        email=email,
+        phone=phone,
+        confirmed=confirmed,
+    )
+
+
+class TestKeys(unittest.TestCase):
+    def test_soundex(self):
+        self.assertEqual(soundex("Robert"), "R163")
+        self.assertEqual(soundex("Rupert"), "R163")
+        self.assertEqual(soundex("Ashcraft"), "A261")
+        self.assertEqual(soundex("Tymczak"), "T522")
+        self.assertEqual(soundex("123"), "")
+
+    def test_normalize_email(self):
+        self.assertEqual(normalize_email("Bob+News@Example.COM"), "bob@example.com")
+
+    def test_minhash_agreement_tracks_similarity(self):
+        a = minhash(ngrams("jonathan smith"))
+        b = minhash(ngrams("jonathon smith"))
+        c = minhash(ngrams("mary jones"))
+        agree = lambda x, y: sum(i == j for i, j in zip(x, y))
+        self.assertGreater(agree(a, b), agree(a, c))
+
+
+class TestFindDuplicates(unittest.TestCase):
+    def setUp(self):
+        self.contacts = [
+            contact(1, "Bob", "Smith", "bob@example.com", 501234567),
+            contact(2, "Robert", "Smith", "BOB+shop@example.com", 777001, True),
+            contact(3, "Jonathan", "Miller", "jm@example.com", 502234576),
+            contact(4, "Jonathon", "Miller", "jon.miller@example.com", 502234567),
+            contact(5, "Alice", "Wong", "alice@example.com", 600100200),
+        ]
+
+    def test_clusters_and_merge_suggestions(self):
+        report = find_duplicates(self.contacts)
+        self.assertEqual(report.contacts_scanned, 5)
+        clusters = [[c.id for c in cluster.contacts] for cluster in report.clusters]
+        self.assertEqual(clusters, [[1, 2], [3, 4]])
+        self.assertEqual(report.clusters[0].keep, 2)
+        self.assertEqual(report.clusters[0].merge, [1])
+        self.assertIn("same e-mail", report.clusters[0].reasons)
+        self.assertIn("phone with swapped digits", report.clusters[1].reasons)
+
+    def test_unrelated_contacts_are_not_compared(self):
+        report = find_duplicates(self.contacts)
+        self.assertLess(report.candidate_pairs, 10)
+
+    def test_score_pair(self):
+        score, reasons = score_pair(
+            Record(self.contacts[0]), Record(self.contacts[4])
+        )
+        self.assertLess(score, 0.3)
+        self.assertEqual(reasons, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
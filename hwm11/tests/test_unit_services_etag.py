@@ -0,0 +1,34 @@
+import unittest
+
+from fastapi import HTTPException
+
+from src.services.etag import (
+    is_not_modified,
+    make_etag,
+    make_list_etag,
+    parse_if_match,
+)
+
+
+class TestEtag(unittest.TestCase):
+    def test_make_etags(self):
+        self.assertEqual(make_etag(3), 'W/"3"')
+        self.assertEqual(make_list_etag(2, 5, 9), 'W/"2-5-9"')
+
+    def test_is_not_modified(self):
+        self.assertFalse(is_not_modified(None, 'W/"3"'))
+        self.assertTrue(is_not_modified("*", 'W/"3"'))
+        self.assertTrue(is_not_modified('"3"', 'W/"3"'))
+        self.assertTrue(is_not_modified('W/"1", W/"3"', 'W/"3"'))
+        self.assertFalse(is_not_modified('W/"4"', 'W/"3"'))
+
+    def test_parse_if_match(self):
+        self.assertIsNone(parse_if_match(None))
+        self.assertIsNone(parse_if_match("*"))
+        self.assertEqual(parse_if_match('W/"3"'), 3)
+        with self.assertRaises(HTTPException):
+            parse_if_match("bogus")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import csv
+import gzip
+import io
+import json
+import unittest
+from datetime import date
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Base, Contact, Roles
+from src.repository.contacts import stream_contacts
+from src.services.export import export_contacts
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        self.session = sessionmaker(bind=engine)()
+        for i, role in enumerate([Roles.admin, Roles.user, Roles.user]):
+            self.session.add(
+                Contact(
+                    first_name=f"Name{i}",
+                    last_name="Black",
+                    email=f"test{i}@test.com",
+                    phone=100 + i,
+                    birthday=date(1990, 1, i + 1),
+                    password="qweasd",
+                    roles=role,
+                    confirmed=i == 1,
+                )
+            )
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_stream_contacts_filters(self):
+        rows = list(stream_contacts(self.session, role=Roles.user, batch_size=1))
+        self.assertEqual([row.email for row in rows], ["test1@test.com", "test2@test.com"])
+        rows = list(stream_contacts(self.session, role=Roles.user, confirmed=False))
+        self.assertEqual([row.email for row in rows], ["test2@test.com"])
+
+    def test_export_ndjson(self):
+        body = b"".join(export_contacts(stream_contacts(self.session), chunk_size=2))
+        records = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[0]["roles"], "admin")
+        self.assertEqual(records[0]["birthday"], "1990-01-01")
+        self.assertNotIn("password", records[0])
+
+    def test_export_csv_gzip(self):
+        body = b"".join(
+            export_contacts(stream_contacts(self.session), "csv", compress=True)
+        )
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(body).decode())))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[2]["email"], "test2@test.com")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import json
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+
+from fastapi import HTTPException
+
+from src.services.fields import fields_response, sparse_fields
+
+
+class TestSparseFields(unittest.TestCase):
+    def test_no_selection(self):
+        self.assertIsNone(sparse_fields(None))
+
+    def test_selection_is_canonical(self):
+        self.assertEqual(sparse_fields(" email,id,email "), ["id", "email"])
+
+    def test_unknown_or_empty_selection(self):
+        for fields in ["id,password", ",", ""]:
+            with self.assertRaises(HTTPException) as error:
+                sparse_fields(fields)
+            self.assertEqual(error.exception.status_code, 422)
+
+    def test_fields_response(self):
+        contact = SimpleNamespace(
+            id=1, email="a@test.com", created_at=datetime(2023, 1, 2), avatar=None
+        )
+        response = fields_response([contact], ["id", "created_at"])
+        self.assertEqual(
+            json.loads(response.body), [{"id": 1, "created_at": "2023-01-02T00:00:00"}]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import asyncio
+import json
+import unittest
+
+from src.services.cache import MemoryCacheBackend
+from src.services.idempotency import IdempotencyMiddleware
+
+
+class CountingApp:
+    def __init__(self, status_code=201, delay=0):
+        self.status_code = status_code
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        body = (await receive())["body"]
+        await asyncio.sleep(self.delay)
+        await send({"type": "http.response.start", "status": self.status_code})
+        await send({"type": "http.response.body", "body": b"%d:%s" % (self.calls, body)})
+
+
+class TestIdempotencyMiddleware(unittest.IsolatedAsyncioTestCase):
+    def middleware(self, app):
+        return IdempotencyMiddleware(
+            app, paths=["/create"], ttl=60, lock_ttl=1, cache=MemoryCacheBackend()
+        )
+
+    async def request(self, middleware, key=b"k", body=b"{}", path="/create"):
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": path,
+            "headers": [(b"idempotency-key", key)] if key else [],
+        }
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        await middleware(scope, receive, send)
+        headers = dict(messages[0].get("headers", []))
+        return messages[0]["status"], headers, messages[1]["body"]
+
+    async def test_retries_are_replayed(self):
+        app = CountingApp()
+        middleware = self.middleware(app)
+        first = await self.request(middleware)
+        retry = await self.request(middleware)
+        self.assertEqual(app.calls, 1)
+        self.assertEqual(retry[2], first[2])
+        self.assertEqual(retry[1][b"idempotent-replayed"], b"true")
+
+        status_code, _, body = await self.request(middleware, body=b"[]")
+        self.assertEqual(status_code, 422)
+        self.assertIn("another request body", json.loads(body)["detail"])
+
+    async def test_concurrent_duplicates_wait_for_the_first(self):
+        app = CountingApp(delay=0.2)
+        middleware = self.middleware(app)
+        responses = await asyncio.gather(
+            *(self.request(middleware) for _ in range(3))
+        )
+        self.assertEqual(app.calls, 1)
+        self.assertEqual({body for _, _, body in responses}, {b"1:{}"})
+
+    async def test_errors_and_other_requests_run_again(self):
+        app = CountingApp(status_code=500)
+        middleware = self.middleware(app)
+        await self.request(middleware)
+        await self.request(middleware)
+        await self.request(middleware, key=None)
+        await self.request(middleware, path="/other")
+        self.assertEqual(app.calls, 4)
+        status_code, _, _ = await self.request(middleware, key=b"k" * 256)
+        self.assertEqual(status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
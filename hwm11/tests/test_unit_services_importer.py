@@ -0,0 +1,56 @@
+import io
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Base, Contact
+from src.services.importer import import_contacts, shutdown_hash_pool
+
+CSV = b"""first_name,last_name,email,password,phone,birthday
+Mike,Black,testmike@test.com,qweasd,777,1990-01-01
+Nick,White,testnick@test.com,qweasd,777,1990-01-02
+Kim,Green,not-an-email,qweasd,555,1990-01-03
+Mike,Black,testmike@test.com,qweasd,888,1990-01-01
+Ann,Brown,testann@test.com,qweasd,999,1990-01-04
+"""
+
+
+class TestImporter(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        self.session = sessionmaker(bind=engine)()
+
+    def tearDown(self):
+        self.session.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutdown_hash_pool()
+
+    async def test_import_contacts(self):
+        report = await import_contacts(io.BytesIO(CSV), self.session, chunk_size=2)
+        self.assertEqual(report.received, 5)
+        self.assertEqual(report.inserted, 2)
+        self.assertEqual(report.failed, 3)
+        self.assertEqual([error.row for error in report.errors], [3, 4, 5])
+        self.assertIn("email", report.errors[1].detail)
+
+        emails = [email for (email,) in self.session.query(Contact.email)]
+        self.assertEqual(sorted(emails), ["testann@test.com", "testmike@test.com"])
+        password = self.session.query(Contact.password).filter_by(phone=777).scalar()
+        self.assertTrue(password.startswith("$2b$"))
+
+    async def test_import_from_file_without_readable(self):
+        # Like SpooledTemporaryFile before Python 3.11.
+        class Upload:
+            def __init__(self, data):
+                self.read = io.BytesIO(data).read
+
+        report = await import_contacts(Upload(CSV), self.session)
+        self.assertEqual((report.received, report.inserted), (5, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from src.database.models import ContactExportRow, Roles
+from src.services.cache import MemoryCacheBackend
+from src.services.changes import ContactChangeStream
+from src.services.events import ContactEvent
+from src.services.live import LiveChanges
+
+
+def event(op, contact_id):
+    row = MagicMock(id=contact_id, version=1, roles=Roles.user)
+    return ContactEvent(op, ContactExportRow(row))
+
+
+def parse(chunk):
+    lines = dict(line.split(": ", 1) for line in chunk.strip().split("\n"))
+    return lines["event"], json.loads(lines["data"])["contact_id"]
+
+
+class TestLiveChanges(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.changes = ContactChangeStream(maxlen=100, cache=MemoryCacheBackend())
+        self.live = LiveChanges(
+            heartbeat=1, queue_size=2, changes=self.changes, block=20
+        )
+
+    async def asyncTearDown(self):
+        self.live.stop()
+
+    async def events(self, stream, count):
+        return [parse(await anext(stream)) for _ in range(count)]
+
+    async def test_fan_out_filtered_by_role(self):
+        admin = self.live.stream(self.live.subscribe(Roles.admin))
+        user = self.live.stream(self.live.subscribe(Roles.user))
+        self.assertEqual(await anext(admin), "retry: 3000\n\n")
+        self.assertEqual(await anext(user), "retry: 3000\n\n")
+        await self.changes.publish(
+            [event(ContactEvent.ROLE, 1), event(ContactEvent.UPDATE, 2)]
+        )
+        self.assertEqual(
+            await self.events(admin, 2), [("role", "1"), ("update", "2")]
+        )
+        self.assertEqual(await self.events(user, 1), [("update", "2")])
+        await admin.aclose()
+        await user.aclose()
+        self.assertEqual(self.live.subscribers, set())
+
+    async def test_replay_from_last_event_id(self):
+        await self.changes.publish([event(ContactEvent.CREATE, 1)])
+        first = (await self.changes.replay("0", 1))[0]["id"]
+        await self.changes.publish([event(ContactEvent.DELETE, 1)])
+        stream = self.live.stream(self.live.subscribe(Roles.user), first)
+        await anext(stream)
+        self.assertEqual(await self.events(stream, 1), [("delete", "1")])
+        self.assertEqual(await anext(stream), ": keep-alive\n\n")
+        await stream.aclose()
+
+    async def test_slow_client_is_disconnected(self):
+        subscriber = self.live.subscribe(Roles.admin)
+        stream = self.live.stream(subscriber)
+        await anext(stream)
+        self.live.dispatch(
+            [{"id": f"{i}-0", "op": "update", "contact_id": i} for i in range(1, 4)]
+        )
+        self.assertTrue(subscriber.lagged)
+        self.assertEqual(len([chunk async for chunk in stream]), 2)
+        self.assertEqual(self.live.metrics["lagged"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
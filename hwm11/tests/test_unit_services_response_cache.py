@@ -0,0 +1,46 @@
+import unittest
+
+from src.services.cache import MemoryCacheBackend
+from src.services.response_cache import ResponseCache, normalize_inquiry
+
+
+class TestResponseCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.cache = MemoryCacheBackend()
+        self.responses = ResponseCache(ttl=60, cache=self.cache)
+        self.renders = 0
+
+    async def render(self):
+        self.renders += 1
+        return 200, b"[]"
+
+    async def test_second_fetch_is_a_hit(self):
+        for _ in range(2):
+            response = await self.responses.fetch("search", "user", "a", self.render)
+            self.assertEqual(response.body, b"[]")
+        self.assertEqual(self.renders, 1)
+        self.assertEqual(
+            self.responses.report(),
+            {"search": {"hits": 1, "misses": 1, "hit_ratio": 0.5}},
+        )
+
+    async def test_roles_are_cached_separately(self):
+        await self.responses.fetch("search", "user", "a", self.render)
+        await self.responses.fetch("search", "admin", "a", self.render)
+        self.assertEqual(self.renders, 2)
+
+    async def test_invalidate_starts_new_generation(self):
+        await self.responses.fetch("search", "user", "a", self.render)
+        await self.responses.invalidate()
+        await self.responses.fetch("search", "user", "a", self.render)
+        self.assertEqual(self.renders, 2)
+        self.assertEqual(await self.responses.generation(), 1)
+
+
+class TestNormalizeInquiry(unittest.TestCase):
+    def test_case_kept_unless_ignored(self):
+        self.assertEqual(normalize_inquiry("e\u0301"), "\u00e9")
+        self.assertEqual(normalize_inquiry("Bob", ignore_case=True), "bob")
+
+    def test_unicode_forms_unified(self):
+        self.assertEqual(normalize_inquiry("e\u0301"), "\u00e9")
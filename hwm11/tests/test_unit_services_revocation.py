@@ -0,0 +1,55 @@
+import time
+import unittest
+from src.services.cache import MemoryCacheBackend
+from src.services.revocation import BloomFilter, RevocationList
+
+
+class TestBloomFilter(unittest.TestCase):
+    def test_added_keys_are_found(self):
+        bloom = BloomFilter(capacity=1000)
+        keys = [f"jti-{i}" for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+
+    def test_false_positive_rate(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"jti-{i}")
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class TestRevocationList(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.cache = MemoryCacheBackend()
+        self.revocations = RevocationList(capacity=100, ttl=60, cache=self.cache)
+
+    async def test_unknown_token_skips_cache(self):
+        self.assertFalse(await self.revocations.is_revoked("jti-1"))
+        self.assertEqual(self.revocations.metrics["filter_hits"], 0)
+
+    async def test_revoked_token(self):
+        await self.revocations.revoke("jti-1", int(time.time()) + 60)
+        self.assertTrue(await self.revocations.is_revoked("jti-1"))
+        self.assertEqual(self.revocations.metrics["revoked"], 1)
+
+    async def test_filter_hit_is_confirmed_in_cache(self):
+        self.revocations._apply([("1-0", {"jti": "jti-1"})])
+        self.assertFalse(await self.revocations.is_revoked("jti-1"))
+        self.assertEqual(self.revocations.metrics["filter_hits"], 1)
+        self.assertEqual(self.revocations.last_id, "1-0")
+
+    async def test_other_worker_learns_from_stream(self):
+        await self.revocations.revoke("jti-1", int(time.time()) + 60)
+        other = RevocationList(capacity=100, ttl=60, cache=self.cache)
+        await other.rebuild()
+        self.assertTrue(await other.is_revoked("jti-1"))
+
+    async def test_expired_token_is_not_stored(self):
+        await self.revocations.revoke("jti-1", int(time.time()) - 1)
+        self.assertEqual(await self.cache.xrange(RevocationList.stream), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
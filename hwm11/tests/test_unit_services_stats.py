@@ -0,0 +1,100 @@
+import threading
+import unittest
+from datetime import date, datetime
+from unittest.mock import MagicMock, patch
+
+from src.database.models import ContactExportRow, Roles
+from src.services.cache import MemoryCacheBackend
+from src.services.events import ContactEvent
+from src.services.stats import ContactStats
+
+
+def contact(contact_id, roles=Roles.user, confirmed=False, created_at=None):
+    row = MagicMock(
+        id=contact_id,
+        roles=roles,
+        confirmed=confirmed,
+        created_at=created_at or datetime.now(),
+    )
+    return ContactExportRow(row)
+
+
+class TestContactStats(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.stats = ContactStats(days=3, cache=MemoryCacheBackend())
+        self.today = str(date.today())
+        self.counts = {
+            "roles": {Roles.admin: 1, Roles.user: 2},
+            "confirmed": 1,
+            "signups": {self.today: 2},
+        }
+
+    async def read(self):
+        with patch(
+            "src.repository.contacts.get_contacts_stats", return_value=self.counts
+        ):
+            return await self.stats.read(MagicMock())
+
+    async def test_read_reconciles_once(self):
+        stats = await self.read()
+        self.assertEqual(stats["total"], 3)
+        self.assertEqual(stats["roles"], {"admin": 1, "moderator": 0, "user": 2})
+        self.assertEqual(stats["confirmed_ratio"], 0.3333)
+        self.assertEqual(list(stats["signups"].values()), [2, 0, 0])
+        await self.read()
+        self.assertEqual(self.stats.metrics["reconciliations"], 1)
+
+    async def test_events_adjust_counters(self):
+        await self.read()
+        new = contact(4, confirmed=True)
+        await self.stats.apply(
+            [
+                ContactEvent(ContactEvent.CREATE, new),
+                ContactEvent(ContactEvent.CREATE, contact(5)),
+                ContactEvent(
+                    ContactEvent.ROLE,
+                    contact(5, roles=Roles.moderator),
+                    {"roles": Roles.user},
+                ),
+                ContactEvent(ContactEvent.CONFIRM, contact(5, confirmed=True)),
+                ContactEvent(ContactEvent.DELETE, new),
+            ]
+        )
+        stats = await self.read()
+        self.assertEqual(stats["total"], 4)
+        self.assertEqual(stats["roles"], {"admin": 1, "moderator": 1, "user": 2})
+        self.assertEqual(stats["confirmed"], 2)
+        self.assertEqual(stats["signups"][self.today], 3)
+
+    async def test_reconcile_corrects_drift(self):
+        await self.read()
+        await self.stats.apply([ContactEvent(ContactEvent.CREATE, contact(4))])
+        with patch(
+            "src.repository.contacts.get_contacts_stats", return_value=self.counts
+        ):
+            corrections = await self.stats.reconcile(MagicMock())
+        self.assertEqual(
+            corrections,
+            {
+                "stats:total": 3,
+                "stats:role:user": 2,
+                f"stats:signups:{self.today}": 2,
+            },
+        )
+        self.assertEqual((await self.read())["total"], 3)
+
+    async def test_reconcile_counts_off_the_loop(self):
+        threads = []
+
+        def get_contacts_stats(db, since):
+            threads.append(threading.current_thread())
+            return self.counts
+
+        with patch("src.repository.contacts.get_contacts_stats", get_contacts_stats):
+            await self.stats.reconcile(MagicMock())
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+
+
+if __name__ == "__main__":
+    unittest.main()